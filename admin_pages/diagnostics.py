@@ -0,0 +1,79 @@
+import streamlit as st
+import pandas as pd
+from utils.config import load_instrumentation_config
+from utils.instrumentation import (
+    get_recent_renders,
+    get_query_totals,
+    export_json,
+    reset_instrumentation
+)
+
+def format_rows(rows):
+    """Row count for display; None means the driver did not report it"""
+    return "n/a" if rows is None or pd.isna(rows) else f"{int(rows):,}"
+
+def fingerprint_table(fingerprints):
+    """Per-fingerprint statistics as a display table"""
+    table = pd.DataFrame(fingerprints)
+    if table.empty:
+        return table
+    table['callers'] = table['callers'].map(', '.join)
+    table['avg_ms'] = table['seconds'] / table['count'] * 1000
+    table['total_ms'] = table['seconds'] * 1000
+    table['rows'] = table['rows'].map(format_rows)
+    return table[['sql', 'count', 'total_ms', 'avg_ms', 'rows', 'callers'] +
+                 (['repeated'] if 'repeated' in table.columns else [])]
+
+def diagnostics():
+    st.title("Query Diagnostics")
+    
+    # Only registered in main.py when enabled; also guard running this script directly
+    if not load_instrumentation_config()['diagnostics_page']:
+        st.info("Diagnostics are disabled. Set SHOW_DIAGNOSTICS=true to enable this page.")
+        st.stop()
+    
+    renders = get_recent_renders()
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            label="Export as JSON",
+            data=export_json(),
+            file_name="query_diagnostics.json",
+            mime="application/json"
+        )
+    with col2:
+        if st.button("Reset Statistics"):
+            reset_instrumentation()
+            st.rerun()
+    
+    st.subheader("Recent Page Renders")
+    if not renders:
+        st.info("No page renders recorded yet")
+    else:
+        st.dataframe(pd.DataFrame([{
+            'page': render['page'],
+            'started_at': render['started_at'],
+            'render_ms': render['seconds'] * 1000,
+            'queries': render['query_count'],
+            'query_ms': render['query_seconds'] * 1000,
+            'rows': format_rows(render['rows']),
+            'repeated_queries': sum(stats['repeated'] for stats in render['fingerprints'])
+        } for render in renders]))
+        
+        selected = st.selectbox(
+            "Inspect Render",
+            range(len(renders)),
+            format_func=lambda index: f"{renders[index]['page']} at {renders[index]['started_at']}"
+        )
+        render = renders[selected]
+        repeated = [stats for stats in render['fingerprints'] if stats['repeated']]
+        if repeated:
+            st.warning(f"{len(repeated)} queries ran repeatedly in this render (possible N+1 pattern)")
+        st.dataframe(fingerprint_table(render['fingerprints']))
+    
+    st.subheader("Slowest Queries Since Start")
+    st.dataframe(fingerprint_table(get_query_totals()))
+
+if __name__ == "__main__":
+    diagnostics()
@@ -1,16 +1,23 @@
 import streamlit as st
 import plotly.express as px
 from utils.database import init_db
-from utils.config import load_config
+from utils.config import load_config, load_instrumentation_config
 from utils.calculations import calculate_total_members, calculate_monthly_revenue
+from utils.instrumentation import render_scope
 
-def main():
-    st.set_page_config(
-        page_title="Business Club Dashboard",
-        page_icon="📊",
-        layout="wide"
-    )
-    
+# Sidebar pages after the dashboard, as (script, title)
+PAGES = [
+    ("pages/01_member_management.py", "Member Management"),
+    ("pages/02_financial_planning.py", "Financial Planning"),
+    ("pages/03_reports_and_kpis.py", "Reports & KPIs"),
+    ("pages/04_scenario_planning.py", "Scenario Planning"),
+    ("pages/05_data_management.py", "Data Management")
+]
+
+# Registered only when enabled, so it is neither listed nor reachable otherwise
+DIAGNOSTICS_PAGE = ("admin_pages/diagnostics.py", "Query Diagnostics")
+
+def dashboard():
     # Initialize database
     init_db()
     
@@ -25,11 +32,11 @@ def main():
     with col1:
         total_members = calculate_total_members()
         st.metric("Total Members", total_members)
-        
+    
     with col2:
         monthly_revenue = calculate_monthly_revenue()
         st.metric("Monthly Revenue", f"€{monthly_revenue:,.2f}")
-        
+    
     with col3:
         cash_position = monthly_revenue - config['monthly_expenses']
         st.metric("Cash Position", f"€{cash_position:,.2f}")
@@ -75,5 +82,25 @@ def main():
         if st.button("Scenario Planning"):
             st.switch_page("pages/04_scenario_planning.py")
 
+def render_dashboard():
+    with render_scope("Dashboard"):
+        dashboard()
+
+def main():
+    st.set_page_config(
+        page_title="Business Club Dashboard",
+        page_icon="📊",
+        layout="wide"
+    )
+    
+    pages = [st.Page(render_dashboard, title="Dashboard", icon="📊", default=True)]
+    pages += [st.Page(script, title=title) for script, title in PAGES]
+    # Hidden unless explicitly enabled: SQL text can reveal data shapes
+    if load_instrumentation_config()['diagnostics_page']:
+        script, title = DIAGNOSTICS_PAGE
+        pages.append(st.Page(script, title=title))
+    
+    st.navigation(pages).run()
+
 if __name__ == "__main__":
     main()
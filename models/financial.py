@@ -1,7 +1,12 @@
 from utils.database import get_sqlalchemy_engine
+from utils.dialects import month_start
+from utils.rollups import add_transaction_to_rollup
+from utils.cache import invalidate_metrics
+from utils.telemetry import observed, record_fallback
 import pandas as pd
 from sqlalchemy import text
 
+@observed
 def record_transaction(member_id, amount, transaction_type, transaction_date):
     engine = get_sqlalchemy_engine()
     
@@ -23,23 +28,27 @@ def record_transaction(member_id, amount, transaction_type, transaction_date):
             )
             
             transaction_id = result.scalar()
+            add_transaction_to_rollup(conn, transaction_id, member_id, amount, transaction_date)
             conn.commit()
-            return transaction_id
+        
+        invalidate_metrics('transactions')
+        return transaction_id
     except Exception as e:
-        print(f"Error recording transaction: {str(e)}")
+        record_fallback("Error recording transaction", e)
         return None
 
+@observed
 def get_financial_summary(start_date, end_date):
     try:
         engine = get_sqlalchemy_engine()
-        query = text("""
+        query = text(f"""
             SELECT 
-                DATE_TRUNC('month', transaction_date) as month,
+                {month_start('transaction_date', engine)} as month,
                 transaction_type,
                 SUM(amount) as total_amount
             FROM transactions
             WHERE transaction_date BETWEEN :start_date AND :end_date
-            GROUP BY DATE_TRUNC('month', transaction_date), transaction_type
+            GROUP BY 1, transaction_type
             ORDER BY month, transaction_type
         """)
         
@@ -47,9 +56,10 @@ def get_financial_summary(start_date, end_date):
             summary = pd.read_sql(query, conn, params={"start_date": start_date, "end_date": end_date})
         return summary
     except Exception as e:
-        print(f"Error getting financial summary: {str(e)}")
+        record_fallback("Error getting financial summary", e)
         return pd.DataFrame()
 
+@observed
 def record_event(name, date, country, revenue, costs):
     engine = get_sqlalchemy_engine()
     
@@ -73,7 +83,9 @@ def record_event(name, date, country, revenue, costs):
             
             event_id = result.scalar()
             conn.commit()
-            return event_id
+        
+        invalidate_metrics('events')
+        return event_id
     except Exception as e:
-        print(f"Error recording event: {str(e)}")
+        record_fallback("Error recording event", e)
         return None
@@ -1,7 +1,11 @@
 from utils.database import get_sqlalchemy_engine, get_session
+from utils.rollups import add_members_to_rollup, add_transaction_to_rollup
+from utils.cache import invalidate_metrics
+from utils.telemetry import observed, record_fallback
 import pandas as pd
 from sqlalchemy import text
 
+@observed
 def add_member(name, email, country, join_date, membership_type):
     engine = get_sqlalchemy_engine()
     
@@ -12,7 +16,7 @@ def add_member(name, email, country, join_date, membership_type):
                 text("""
                     INSERT INTO members (name, email, country, join_date, membership_type)
                     VALUES (:name, :email, :country, :join_date, :membership_type)
-                    RETURNING id
+                    RETURNING id, active
                 """),
                 {
                     "name": name,
@@ -22,13 +26,14 @@ def add_member(name, email, country, join_date, membership_type):
                     "membership_type": membership_type
                 }
             )
-            member_id = result.scalar()
+            member_id, active = result.first()
             
             # Add initial membership fee transaction
-            conn.execute(
+            transaction_id = conn.execute(
                 text("""
                     INSERT INTO transactions (member_id, amount, transaction_type, transaction_date)
                     VALUES (:member_id, :amount, :transaction_type, :transaction_date)
+                    RETURNING id
                 """),
                 {
                     "member_id": member_id,
@@ -36,14 +41,19 @@ def add_member(name, email, country, join_date, membership_type):
                     "transaction_type": "membership_fee",
                     "transaction_date": join_date
                 }
-            )
+            ).scalar()
             
+            add_members_to_rollup(conn, join_date, country, 1, int(bool(active)))
+            add_transaction_to_rollup(conn, transaction_id, member_id, 795, join_date)
             conn.commit()
-            return True
+        
+        invalidate_metrics('members', 'transactions')
+        return True
     except Exception as e:
-        print(f"Error adding member: {str(e)}")
+        record_fallback("Error adding member", e)
         return False
 
+@observed
 def get_members_by_country(country):
     try:
         engine = get_sqlalchemy_engine()
@@ -63,24 +73,32 @@ def get_members_by_country(country):
             result = pd.read_sql(query, conn, params={"country": country})
         return result
     except Exception as e:
-        print(f"Error getting members: {str(e)}")
+        record_fallback("Error getting members", e)
         return pd.DataFrame()
 
+@observed
 def update_member_status(member_id, active):
     engine = get_sqlalchemy_engine()
     
     try:
         with engine.connect() as conn:
-            conn.execute(
+            # Only a real status change moves the member between rollup counts
+            changed = conn.execute(
                 text("""
                     UPDATE members
                     SET active = :active
-                    WHERE id = :member_id
+                    WHERE id = :member_id AND active <> :active
+                    RETURNING join_date, country
                 """),
                 {"active": active, "member_id": member_id}
-            )
+            ).first()
+            
+            if changed is not None:
+                add_members_to_rollup(conn, changed.join_date, changed.country, 0, 1 if active else -1)
             conn.commit()
-            return True
+        
+        invalidate_metrics('members')
+        return True
     except Exception as e:
-        print(f"Error updating member status: {str(e)}")
+        record_fallback("Error updating member status", e)
         return False
@@ -3,6 +3,7 @@ import pandas as pd
 import plotly.express as px
 from utils.database import get_sqlalchemy_engine
 from models.member import add_member, get_members_by_country
+from utils.instrumentation import render_scope
 
 def member_management():
     st.title("Member Management")
@@ -61,4 +62,5 @@ def member_management():
             st.plotly_chart(fig)
 
 if __name__ == "__main__":
-    member_management()
+    with render_scope("Member Management"):
+        member_management()
@@ -2,10 +2,13 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 from utils.calculations import (
-    calculate_revenue_forecast,
-    calculate_expenses_forecast,
+    forecast_revenue,
+    forecast_expenses,
     calculate_cashflow
 )
+from utils.club_state import load_club_state
+from utils.config import load_config
+from utils.instrumentation import render_scope
 
 def financial_planning():
     st.title("Financial Planning")
@@ -24,15 +27,22 @@ def financial_planning():
         base_salary = st.number_input("Base Salary per Employee (€)", value=5000)
         num_employees = st.number_input("Number of Employees", value=1)
     
+    # Database inputs of the forecasts, read once per render
+    config = load_config()
+    state = load_club_state(config['starting_members'])
+    
     # Revenue Forecast
     st.subheader("Revenue Forecast")
-    revenue_forecast = calculate_revenue_forecast(annual_fee, event_fee, num_events)
+    revenue_forecast = forecast_revenue(
+        state, config['growth_targets'], annual_fee, event_fee, num_events, ('realistic',)
+    )['realistic']
     fig = px.line(revenue_forecast, title="Revenue Forecast")
     st.plotly_chart(fig)
     
     # Expense Breakdown
     st.subheader("Expense Breakdown")
-    expenses = calculate_expenses_forecast(
+    expenses = forecast_expenses(
+        state,
         marketing_percentage,
         base_salary,
         num_employees,
@@ -63,4 +73,5 @@ def financial_planning():
         st.warning("⚠️ Expenses exceed maximum projected revenue!")
 
 if __name__ == "__main__":
-    financial_planning()
+    with render_scope("Financial Planning"):
+        financial_planning()
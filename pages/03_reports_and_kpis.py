@@ -1,10 +1,7 @@
 import streamlit as st
 import plotly.express as px
-from utils.calculations import (
-    calculate_member_kpis,
-    calculate_financial_kpis,
-    calculate_event_metrics
-)
+from utils.calculations import calculate_report_kpis
+from utils.instrumentation import render_scope
 
 def reports_and_kpis():
     st.title("Reports & KPIs")
@@ -17,8 +14,9 @@ def reports_and_kpis():
     st.subheader("Key Performance Indicators")
     col1, col2, col3, col4 = st.columns(4)
     
-    member_kpis = calculate_member_kpis(period)
-    financial_kpis = calculate_financial_kpis(period)
+    report = calculate_report_kpis(period)
+    member_kpis = report['member_kpis']
+    financial_kpis = report['financial_kpis']
     
     with col1:
         st.metric("Member Growth Rate", 
@@ -66,7 +64,7 @@ def reports_and_kpis():
         st.plotly_chart(fig)
     
     with tab3:
-        event_metrics = calculate_event_metrics(period)
+        event_metrics = report['event_metrics']
         
         # Event Attendance
         fig = px.bar(event_metrics['attendance_data'], 
@@ -79,4 +77,5 @@ def reports_and_kpis():
         st.plotly_chart(fig)
 
 if __name__ == "__main__":
-    reports_and_kpis()
+    with render_scope("Reports & KPIs"):
+        reports_and_kpis()
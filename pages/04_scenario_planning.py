@@ -2,18 +2,24 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 from utils.calculations import (
-    calculate_revenue_forecast,
-    calculate_expenses_forecast,
+    forecast_revenue,
+    forecast_expenses,
     calculate_cashflow
 )
+from utils.club_state import load_club_state
+from utils.monte_carlo import simulate_forecast, triangular_between
+from utils.sensitivity import SWEEP_PARAMETERS, OUTCOMES, run_sweep, tornado, heatmap
+import numpy as np
+import time
 from utils.ml_forecasting import (
     predict_member_growth,
-    predict_churn_probability,
     predict_revenue
 )
+from utils.churn_scoring import score_churn_batch, load_churn_scores, load_churn_distribution
 from utils.config import load_config
 from utils.database import init_db
 import pandas as pd
+from utils.instrumentation import render_scope
 
 def scenario_planning():
     st.title("Scenario Planning")
@@ -42,18 +48,23 @@ def scenario_planning():
     de_growth = st.sidebar.number_input("Germany Monthly New Members", 
                                       value=config['growth_targets']['Germany'])
     
-    # Update config with new values
-    growth_config = config.copy()
-    growth_config['growth_targets']['Netherlands'] = nl_growth
-    growth_config['growth_targets']['Belgium'] = be_growth
-    growth_config['growth_targets']['Germany'] = de_growth
+    growth_targets = {
+        'Netherlands': nl_growth,
+        'Belgium': be_growth,
+        'Germany': de_growth
+    }
+    
+    # Database inputs of every forecast below, read once per render
+    state = load_club_state(config['starting_members'])
     
     # Main content tabs
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
         "Traditional Forecasting",
         "ML Growth Predictions",
         "Churn Analysis",
-        "ML Revenue Forecast"
+        "ML Revenue Forecast",
+        "Monte Carlo Simulation",
+        "Sensitivity Analysis"
     ])
     
     with tab1:
@@ -61,17 +72,16 @@ def scenario_planning():
         scenarios = ['pessimistic', 'realistic', 'optimistic']
         
         try:
-            # Initialize forecast data for all scenarios
-            forecasts = {}
+            # Revenue for all scenarios comes from one vectorized forecast
+            forecasts = forecast_revenue(
+                state, growth_targets, annual_fee, event_fee, num_events, tuple(scenarios)
+            )
             expenses = {}
             cashflows = {}
             
             for scenario in scenarios:
-                forecasts[scenario] = calculate_revenue_forecast(
-                    annual_fee, event_fee, num_events, scenario
-                )
-                expenses[scenario] = calculate_expenses_forecast(
-                    marketing_percentage, 5000, 1,
+                expenses[scenario] = forecast_expenses(
+                    state, marketing_percentage, 5000, 1,
                     num_events, event_fee, scenario
                 )
                 expenses[scenario]['total'] = sum(expenses[scenario].values())
@@ -97,7 +107,7 @@ def scenario_planning():
                 yaxis_title="Number of Members"
             )
             st.plotly_chart(fig, use_container_width=True)
-            
+        
         except Exception as e:
             st.error(f"Error in traditional forecasting: {str(e)}")
     
@@ -155,19 +165,26 @@ def scenario_planning():
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.warning("Insufficient data for ML predictions. Please accumulate more historical data.")
-                
+        
         except Exception as e:
             st.error(f"Error in ML growth predictions: {str(e)}")
     
     with tab3:
         st.subheader("Churn Risk Analysis")
         try:
-            churn_predictions = predict_churn_probability()
+            if st.button("Rescore Members"):
+                with st.spinner("Scoring members..."):
+                    summary = score_churn_batch()
+                if summary is None:
+                    st.warning("Insufficient data for churn predictions. Please accumulate more historical data.")
             
-            if churn_predictions is not None:
-                # Display high-risk members
-                high_risk = churn_predictions[churn_predictions['churn_probability'] > 0.7]
+            high_risk, feature_importance, scored_at = load_churn_scores(min_probability=0.7, limit=500)
+            distribution = load_churn_distribution()
+            
+            if not distribution.empty:
+                st.caption(f"Scores computed at {scored_at}")
                 
+                # Display high-risk members
                 st.write("High Risk Members (>70% churn probability)")
                 if not high_risk.empty:
                     st.dataframe(high_risk)
@@ -175,17 +192,18 @@ def scenario_planning():
                     st.write("No high-risk members identified")
                 
                 # Churn probability distribution
-                fig = px.histogram(
-                    churn_predictions,
-                    x='churn_probability',
-                    nbins=20,
-                    title="Churn Probability Distribution"
+                fig = px.bar(
+                    distribution,
+                    x='probability_from',
+                    y='members',
+                    title="Churn Probability Distribution",
+                    labels={'probability_from': "Churn Probability", 'members': "Members"}
                 )
+                fig.update_traces(width=distribution['probability_to'] - distribution['probability_from'], offset=0)
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Feature importance visualization
-                if len(churn_predictions) > 0:
-                    feature_importance = churn_predictions['feature_importance'].iloc[0]
+                if feature_importance:
                     importance_df = pd.DataFrame({
                         'Feature': feature_importance.keys(),
                         'Importance': feature_importance.values()
@@ -199,8 +217,8 @@ def scenario_planning():
                     )
                     st.plotly_chart(fig, use_container_width=True)
             else:
-                st.warning("Insufficient data for churn predictions. Please accumulate more historical data.")
-                
+                st.info("No churn scores yet. Click Rescore Members to score every member.")
+        
         except Exception as e:
             st.error(f"Error in churn analysis: {str(e)}")
     
@@ -251,9 +269,178 @@ def scenario_planning():
                     st.metric("Forecast Difference", f"{difference:,.1f}%")
             else:
                 st.warning("Insufficient data for ML revenue predictions. Please accumulate more historical data.")
-                
+        
         except Exception as e:
             st.error(f"Error in ML revenue forecast: {str(e)}")
+    
+    with tab5:
+        st.subheader("Monte Carlo Simulation")
+        try:
+            col1, col2 = st.columns(2)
+            with col1:
+                months = st.slider("Forecast Horizon (months)", 12, 36, 12)
+                growth_range = st.slider("Growth Target Multiplier", 0.0, 3.0, (0.5, 1.5))
+                churn_range = st.slider("Monthly Churn (%)", 0.0, 10.0, (0.0, 2.0))
+            with col2:
+                paths = st.select_slider("Simulated Paths", [1000, 5000, 10000, 25000, 50000], value=10000)
+                attendance_range = st.slider("Event Attendance (%)", 0, 100, (60, 100))
+                expense_range = st.slider("Expense Multiplier", 0.5, 2.0, (0.9, 1.2))
+            
+            expenses_realistic = forecast_expenses(
+                state, marketing_percentage, 5000, 1, num_events, event_fee, 'realistic'
+            )
+            simulation = simulate_forecast(
+                state,
+                growth_targets,
+                annual_fee, event_fee, num_events,
+                sum(expenses_realistic.values()),
+                months=months,
+                paths=paths,
+                distributions={
+                    'growth_multiplier': triangular_between(*growth_range, 1.0),
+                    'monthly_churn': {'distribution': 'uniform', 'low': churn_range[0] / 100, 'high': churn_range[1] / 100},
+                    'event_attendance': triangular_between(attendance_range[0] / 100, attendance_range[1] / 100, 0.9),
+                    'expense_multiplier': triangular_between(*expense_range, 1.0)
+                }
+            )
+            st.caption(f"{simulation['paths']:,} paths simulated in {simulation['seconds'] * 1000:.0f} ms")
+            
+            for metric, title, axis_title in [
+                ('members', "Members", "Number of Members"),
+                ('revenue', "Monthly Revenue", "Revenue (€)"),
+                ('cumulative_cashflow', "Cumulative Cash Flow", "Cash Flow (€)")
+            ]:
+                bands = simulation[metric]
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(
+                    x=bands.index, y=bands['p95'], name="P95", mode='lines', line=dict(width=0)
+                ))
+                fig.add_trace(go.Scatter(
+                    x=bands.index, y=bands['p5'], name="P5 - P95", mode='lines', line=dict(width=0),
+                    fill='tonexty'
+                ))
+                fig.add_trace(go.Scatter(
+                    x=bands.index, y=bands['p50'], name="Median (P50)", mode='lines+markers'
+                ))
+                fig.update_layout(title=f"{title} (P5 / P50 / P95)", xaxis_title="Month", yaxis_title=axis_title)
+                st.plotly_chart(fig, use_container_width=True)
+            
+            final = simulation['cumulative_cashflow'].iloc[-1]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Cumulative Cash Flow P5", f"€{final['p5']:,.0f}")
+            with col2:
+                st.metric("Cumulative Cash Flow P50", f"€{final['p50']:,.0f}")
+            with col3:
+                st.metric("Cumulative Cash Flow P95", f"€{final['p95']:,.0f}")
+        
+        except Exception as e:
+            st.error(f"Error in Monte Carlo simulation: {str(e)}")
+    
+    with tab6:
+        st.subheader("Sensitivity Analysis")
+        try:
+            base = {
+                'annual_fee': annual_fee,
+                'event_fee': event_fee,
+                'num_events': num_events,
+                'marketing_percentage': marketing_percentage,
+                'nl_growth': nl_growth,
+                'be_growth': be_growth,
+                'de_growth': de_growth,
+                'base_salary': 5000,
+                'num_employees': 1
+            }
+            default_ranges = {
+                name: (float(value) * 0.75, float(value) * 1.25) for name, value in base.items()
+            }
+            default_ranges.update({
+                'annual_fee': (695.0, 995.0),
+                'marketing_percentage': (5.0, 30.0),
+                'num_employees': (1.0, 5.0)
+            })
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                swept = st.multiselect(
+                    "Parameters to Sweep",
+                    list(SWEEP_PARAMETERS),
+                    default=['annual_fee', 'marketing_percentage'],
+                    format_func=SWEEP_PARAMETERS.get
+                )
+            with col2:
+                outcome = st.selectbox("Outcome", list(OUTCOMES), index=2, format_func=OUTCOMES.get)
+                steps = st.slider("Values per Parameter", 2, 50, 10)
+            with col3:
+                sweep_months = st.slider("Sweep Horizon (months)", 12, 36, 12)
+            
+            ranges = {}
+            for name in swept:
+                low_col, high_col = st.columns(2)
+                with low_col:
+                    low = st.number_input(f"{SWEEP_PARAMETERS[name]} from", value=default_ranges[name][0])
+                with high_col:
+                    high = st.number_input(f"{SWEEP_PARAMETERS[name]} to", value=default_ranges[name][1])
+                ranges[name] = (low, high)
+            
+            if not swept:
+                st.info("Select at least one parameter to sweep")
+            else:
+                axes = {name: np.linspace(low, high, steps) for name, (low, high) in ranges.items()}
+                
+                started = time.perf_counter()
+                results = run_sweep(state, base, axes, months=sweep_months)
+                st.caption(f"{len(results):,} combinations evaluated in {time.perf_counter() - started:.2f}s")
+                
+                swings = tornado(state, base, ranges, outcome, sweep_months)
+                base_outcome = swings['base_outcome'].iloc[0]
+                labels = swings['parameter'].map(SWEEP_PARAMETERS)
+                fig = go.Figure()
+                fig.add_trace(go.Bar(
+                    y=labels, x=swings['outcome_low'] - base_outcome, base=base_outcome,
+                    orientation='h', name="Low End of Range"
+                ))
+                fig.add_trace(go.Bar(
+                    y=labels, x=swings['outcome_high'] - base_outcome, base=base_outcome,
+                    orientation='h', name="High End of Range"
+                ))
+                fig.update_layout(
+                    title=f"{OUTCOMES[outcome]} Sensitivity (Tornado)",
+                    barmode='overlay',
+                    xaxis_title=f"{OUTCOMES[outcome]} (€)"
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                
+                if len(swept) >= 2:
+                    x_col, y_col = st.columns(2)
+                    with x_col:
+                        x_parameter = st.selectbox("Heatmap X Axis", swept, index=0, format_func=SWEEP_PARAMETERS.get)
+                    with y_col:
+                        y_parameter = st.selectbox("Heatmap Y Axis", swept, index=1, format_func=SWEEP_PARAMETERS.get)
+                    
+                    if x_parameter != y_parameter:
+                        grid = heatmap(results, x_parameter, y_parameter, outcome)
+                        fig = px.imshow(
+                            grid,
+                            labels=dict(
+                                x=SWEEP_PARAMETERS[x_parameter],
+                                y=SWEEP_PARAMETERS[y_parameter],
+                                color=OUTCOMES[outcome]
+                            ),
+                            x=grid.columns.round(2),
+                            y=grid.index.round(2),
+                            aspect='auto',
+                            origin='lower',
+                            title=f"{OUTCOMES[outcome]} by {SWEEP_PARAMETERS[x_parameter]} and {SWEEP_PARAMETERS[y_parameter]}"
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
+                
+                st.write(f"Highest {OUTCOMES[outcome]} Combinations")
+                st.dataframe(results.nlargest(10, outcome))
+        
+        except Exception as e:
+            st.error(f"Error in sensitivity analysis: {str(e)}")
 
 if __name__ == "__main__":
-    scenario_planning()
+    with render_scope("Scenario Planning"):
+        scenario_planning()
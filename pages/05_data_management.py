@@ -2,11 +2,41 @@ import streamlit as st
 import pandas as pd
 import io
 from utils.database import (
-    bulk_import_data,
     validate_import_data,
     verify_data_consistency,
     get_data_templates
 )
+from utils.importer import stream_import, validate_source, count_csv_rows
+from utils.validation import report_is_valid, report_errors, summarize_report
+from utils.cache import get_cache_stats, invalidate_metrics
+from utils.consistency import load_consistency_runs
+from utils.instrumentation import render_scope
+
+def show_validation_errors(errors):
+    """Show the capped validation error table with a CSV download"""
+    if errors.empty:
+        return
+    
+    st.write(f"First {len(errors):,} errors:")
+    st.dataframe(errors)
+    st.download_button(
+        label="Download Error Report",
+        data=errors.to_csv(index=False),
+        file_name="import_errors.csv",
+        mime="text/csv"
+    )
+
+def add_entry(table_name, data, label):
+    """Import one manually entered row and report whether it was actually stored"""
+    summary = stream_import(table_name, data)
+    if summary['success'] and summary['inserted']:
+        st.success(f"{label} added successfully!")
+    elif summary['unmatched_rows']:
+        st.error(f"{label} not added: member email {data['member_email'].iloc[0]} "
+                 f"does not match any member.")
+    else:
+        st.error(f"Error adding {label.lower()}: {summary['error'] or 'no row was stored'}")
+        show_validation_errors(summary['validation_errors'])
 
 def data_management():
     st.title("Data Management")
@@ -39,11 +69,7 @@ def data_management():
                     
                     valid, message = validate_import_data('members', data)
                     if valid:
-                        success = bulk_import_data('members', data)
-                        if success:
-                            st.success("Member added successfully!")
-                        else:
-                            st.error("Error adding member.")
+                        add_entry('members', data, "Member")
                     else:
                         st.error(f"Invalid data: {message}")
         
@@ -64,11 +90,7 @@ def data_management():
                     
                     valid, message = validate_import_data('transactions', data)
                     if valid:
-                        success = bulk_import_data('transactions', data)
-                        if success:
-                            st.success("Transaction added successfully!")
-                        else:
-                            st.error("Error adding transaction.")
+                        add_entry('transactions', data, "Transaction")
                     else:
                         st.error(f"Invalid data: {message}")
         
@@ -91,11 +113,7 @@ def data_management():
                     
                     valid, message = validate_import_data('events', data)
                     if valid:
-                        success = bulk_import_data('events', data)
-                        if success:
-                            st.success("Event added successfully!")
-                        else:
-                            st.error("Error adding event.")
+                        add_entry('events', data, "Event")
                     else:
                         st.error(f"Invalid data: {message}")
     
@@ -104,29 +122,82 @@ def data_management():
         
         import_type = st.selectbox("Select Import Type", ["Members", "Transactions", "Events"], key="bulk_import")
         
+        import_mode = st.radio(
+            "Import Mode",
+            ["upsert", "append"],
+            format_func=lambda mode: {
+                'upsert': "Upsert (update existing rows, skip rows already imported, safe to re-run)",
+                'append': "Append (insert every row)"
+            }[mode]
+        )
+        
         uploaded_file = st.file_uploader("Upload CSV file", type="csv")
         
         if uploaded_file is not None:
             try:
-                df = pd.read_csv(uploaded_file)
-                st.write("Preview of uploaded data:")
-                st.dataframe(df.head())
+                preview = pd.read_csv(uploaded_file, nrows=5)
+                uploaded_file.seek(0)
+                total_rows = count_csv_rows(uploaded_file)
+                
+                st.write(f"Preview of uploaded data ({total_rows:,} rows):")
+                st.dataframe(preview)
                 
-                valid, message = validate_import_data(import_type.lower(), df)
+                valid, message = validate_import_data(import_type.lower(), preview)
                 if valid:
                     if st.button("Import Data"):
-                        success = bulk_import_data(import_type.lower(), df)
-                        if success:
-                            st.success(f"{len(df)} records imported successfully!")
+                        progress = st.progress(0.0, text="Importing...")
+                        
+                        def report_progress(chunk_stats):
+                            done = chunk_stats['rows_done']
+                            progress.progress(
+                                min(done / total_rows, 1.0) if total_rows else 1.0,
+                                text=f"Chunk {chunk_stats['chunk']}: {done:,} of {total_rows:,} rows "
+                                     f"({chunk_stats['rows_per_second']:,.0f} rows/s)"
+                            )
+                        
+                        summary = stream_import(
+                            import_type.lower(),
+                            uploaded_file,
+                            progress_callback=report_progress,
+                            total_rows=total_rows,
+                            mode=import_mode
+                        )
+                        if summary['success']:
+                            st.success(f"{summary['rows_read']} records processed in {summary['elapsed']:.1f}s: "
+                                       f"{summary['inserted']} inserted, {summary['updated']} updated, "
+                                       f"{summary['skipped']} skipped")
+                            st.dataframe(pd.DataFrame(summary['chunks'])[
+                                ['chunk', 'rows', 'seconds', 'rows_per_second']
+                            ])
                             
-                            # Verify data consistency
-                            consistency_issues = verify_data_consistency()
+                            if summary['unmatched_rows']:
+                                st.warning(f"{summary['unmatched_rows']} rows skipped because their "
+                                           f"member email does not match any member:")
+                                st.dataframe(summary['unmatched_emails'].rename(columns={
+                                    'member_email': 'Member Email',
+                                    'row_count': 'Rows'
+                                }))
+                            
+                            # Verify data consistency of just the imported rows
+                            consistency_issues = verify_data_consistency(
+                                import_batch_id=summary['import_batch_id']
+                            )
                             if consistency_issues:
                                 st.warning("Some consistency issues were found:")
                                 for issue in consistency_issues:
                                     st.write(f"- {issue}")
                         else:
-                            st.error("Error importing data.")
+                            st.error(f"Error importing data: {summary['error']}")
+                            show_validation_errors(summary['validation_errors'])
+                    
+                    if st.button("Validate Entire File"):
+                        report = validate_source(import_type.lower(), uploaded_file)
+                        uploaded_file.seek(0)
+                        if report_is_valid(report):
+                            st.success(f"All {report['rows_checked']:,} rows passed validation")
+                        else:
+                            st.error(summarize_report(report, import_type.lower()))
+                            show_validation_errors(report_errors(report))
                 else:
                     st.error(f"Invalid data format: {message}")
             except Exception as e:
@@ -174,6 +245,40 @@ def data_management():
         - **revenue**: Decimal number
         - **costs**: Decimal number
         """)
+    
+    with st.expander("Metric Cache"):
+        cache_stats = get_cache_stats()
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Cached Entries", cache_stats['entries'])
+        with col2:
+            st.metric("Hits / Misses", f"{cache_stats['hits']} / {cache_stats['misses']}")
+        with col3:
+            st.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+        
+        if cache_stats['functions']:
+            st.dataframe(pd.DataFrame.from_dict(cache_stats['functions'], orient='index'))
+        
+        if st.button("Clear Metric Cache"):
+            invalidate_metrics()
+            st.success("Metric cache cleared")
+    
+    with st.expander("Consistency Checks"):
+        if st.button("Run Full Consistency Check"):
+            consistency_issues = verify_data_consistency()
+            if consistency_issues:
+                st.warning("Some consistency issues were found:")
+                for issue in consistency_issues:
+                    st.write(f"- {issue}")
+            else:
+                st.success("No consistency issues found")
+        
+        runs = load_consistency_runs()
+        if not runs.empty:
+            st.dataframe(runs[[
+                'id', 'mode', 'import_batch_id', 'finished_at', 'rows_checked', 'issue_count', 'seconds'
+            ]])
 
 if __name__ == "__main__":
-    data_management()
+    with render_scope("Data Management"):
+        data_management()
@@ -0,0 +1,22 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def sqlite_database(tmp_path, monkeypatch):
+    """Point the app at a fresh, migrated SQLite database for one test"""
+    from utils import schema
+    from utils.cache import clear_cache
+    from utils.database import dispose_engine, init_db
+    
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'club.db'}")
+    monkeypatch.delenv('ANALYTICS_DATABASE_URL', raising=False)
+    monkeypatch.setattr(schema, '_schema_checked', False)
+    dispose_engine()
+    clear_cache()
+    init_db()
+    yield
+    dispose_engine()
+    clear_cache()
@@ -0,0 +1,24 @@
+from sqlalchemy import text
+from utils.churn_scoring import score_churn_batch
+from utils.database import get_sqlalchemy_engine
+from utils.synthetic import generate_sample_data
+
+def stored_runs():
+    with get_sqlalchemy_engine().connect() as conn:
+        return conn.execute(text("SELECT run_id, COUNT(*) FROM member_churn_scores GROUP BY run_id")).all()
+
+def test_batch_scoring_upserts_every_member_per_chunk(sqlite_database):
+    generate_sample_data(members=250, months=12, seed=7, end_date='2024-12-31')
+    
+    first = score_churn_batch(batch_size=64, training_sample=100)
+    assert first['members_scored'] == 250
+    assert stored_runs() == [(first['run_id'], 250)]
+    
+    # A rescore replaces every score instead of adding rows
+    second = score_churn_batch(batch_size=100, training_sample=100)
+    assert second['members_scored'] == 250
+    assert stored_runs() == [(second['run_id'], 250)]
+    
+    with get_sqlalchemy_engine().connect() as conn:
+        unfinished = conn.execute(text("SELECT COUNT(*) FROM churn_scoring_runs WHERE finished_at IS NULL")).scalar()
+    assert unfinished == 0
@@ -0,0 +1,47 @@
+import threading
+from utils.concurrent_loading import load_concurrently, submit_load
+
+def test_loads_run_concurrently():
+    # Every load waits for the other two, so the barrier only opens when all run at once
+    barrier = threading.Barrier(3, timeout=5)
+    calls = []
+    
+    def together(value):
+        calls.append(value)
+        barrier.wait()
+        return value
+    
+    results = load_concurrently(
+        {'first': (together, (1,)), 'second': (together, (2,)), 'third': (together, (3,))},
+        {'first': int, 'second': int, 'third': int},
+        timeout=10
+    )
+    assert results == {'first': 1, 'second': 2, 'third': 3}
+    assert sorted(calls) == [1, 2, 3]
+
+def test_timed_out_load_falls_back_and_is_not_started_twice():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    
+    def blocked(value):
+        calls.append(value)
+        started.set()
+        release.wait(5)
+        return value
+    
+    for _ in range(3):
+        results = load_concurrently({'part': (blocked, ('x',))}, {'part': dict}, timeout=0.05)
+        assert results == {'part': {}}
+    assert started.wait(5)
+    assert calls == ['x']
+    
+    # Joins the load that is still running instead of starting another one
+    running = submit_load(blocked, ('x',), 5)
+    assert calls == ['x']
+    release.set()
+    assert running.result(timeout=5) == 'x'
+    
+    # A finished load is forgotten, so the next render loads again
+    assert load_concurrently({'part': (blocked, ('x',))}, {'part': dict}, timeout=5) == {'part': 'x'}
+    assert calls == ['x', 'x']
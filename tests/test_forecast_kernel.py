@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from utils.calculations import calculate_cashflow
+from utils.club_state import ClubState
+from utils.forecast_kernel import (
+    COUNTRIES,
+    SCENARIO_GROWTH_MULTIPLIERS,
+    growth_rates,
+    project_members,
+    forecast_scenarios
+)
+from utils.sensitivity import evaluate
+
+STARTING_MEMBERS = {'Netherlands': 135, 'Belgium': 26, 'Germany': 0}
+GROWTH_TARGETS = {'Netherlands': 10, 'Belgium': 15, 'Germany': 63}
+
+def legacy_members(starting_members, growth_targets, multiplier, months=12, churn=0.0):
+    """Month-by-month member projection of the original calculate_revenue_forecast,
+    with churn applied to the members at the end of each month"""
+    projected = {}
+    for country in COUNTRIES:
+        members = float(starting_members.get(country, 0))
+        monthly_members = []
+        for _ in range(months):
+            if country == 'Germany':
+                # Absolute growth for Germany
+                growth = float(growth_targets[country]) * multiplier
+            else:
+                # Percentage growth for Netherlands and Belgium
+                growth = members * float(growth_targets[country]) / 100 * multiplier
+            members = (members + growth) * (1 - churn)
+            monthly_members.append(members)
+        projected[country] = monthly_members
+    return projected
+
+@pytest.mark.parametrize('churn', [0.0, 0.015, 0.1])
+@pytest.mark.parametrize('months', [1, 12, 36])
+def test_project_members_matches_legacy_loop(churn, months):
+    multipliers = list(SCENARIO_GROWTH_MULTIPLIERS.values())
+    members = project_members(
+        [STARTING_MEMBERS[country] for country in COUNTRIES],
+        growth_rates(GROWTH_TARGETS, multipliers),
+        months,
+        churn
+    )
+    
+    for position, multiplier in enumerate(multipliers):
+        expected = legacy_members(STARTING_MEMBERS, GROWTH_TARGETS, multiplier, months, churn)
+        for column, country in enumerate(COUNTRIES):
+            np.testing.assert_allclose(members[position, column], expected[country], rtol=1e-12)
+
+def test_project_members_applies_churn_per_scenario():
+    churn = np.array([0.0, 0.02, 0.05])
+    members = project_members(
+        [STARTING_MEMBERS[country] for country in COUNTRIES],
+        growth_rates(GROWTH_TARGETS, [1.0, 1.0, 1.0]),
+        12,
+        churn
+    )
+    
+    for position, scenario_churn in enumerate(churn):
+        expected = legacy_members(STARTING_MEMBERS, GROWTH_TARGETS, 1.0, 12, scenario_churn)
+        for column, country in enumerate(COUNTRIES):
+            np.testing.assert_allclose(members[position, column], expected[country], rtol=1e-12)
+
+def test_forecast_scenarios_matches_legacy_revenue():
+    frames = forecast_scenarios(STARTING_MEMBERS, GROWTH_TARGETS, 795, 50, 4)
+    
+    for scenario, multiplier in SCENARIO_GROWTH_MULTIPLIERS.items():
+        expected = legacy_members(STARTING_MEMBERS, GROWTH_TARGETS, multiplier)
+        total_members = np.sum([expected[country] for country in COUNTRIES], axis=0)
+        frame = frames[scenario]
+        
+        np.testing.assert_allclose(frame['total_members'], total_members, rtol=1e-12)
+        np.testing.assert_allclose(frame['membership_revenue'], total_members * 795 / 12, rtol=1e-12)
+        np.testing.assert_allclose(frame['event_revenue'], total_members * 50 * 4 / 12, rtol=1e-12)
+        np.testing.assert_allclose(
+            frame['total_revenue'], frame['membership_revenue'] + frame['event_revenue'], rtol=1e-12
+        )
+
+def test_sweep_evaluation_matches_forecast_and_cashflow():
+    state = ClubState(
+        active_members=tuple(STARTING_MEMBERS.items()),
+        monthly_revenue=12000.0,
+        total_members=161
+    )
+    outcomes = evaluate(state, {
+        'annual_fee': 795,
+        'event_fee': 50,
+        'num_events': 4,
+        'marketing_percentage': 15,
+        'nl_growth': GROWTH_TARGETS['Netherlands'],
+        'be_growth': GROWTH_TARGETS['Belgium'],
+        'de_growth': GROWTH_TARGETS['Germany'],
+        'base_salary': 5000,
+        'num_employees': 2
+    })
+    
+    revenue = forecast_scenarios(STARTING_MEMBERS, GROWTH_TARGETS, 795, 50, 4, ('realistic',))['realistic']
+    # Expense formulas of the original calculate_expenses_forecast
+    expenses = {
+        'Marketing': 12000.0 * 12 * 15 / 100,
+        'Salaries': 5000 * 2 * 12,
+        'Events': 161 * 50 * 4,
+        'Operations': 180000
+    }
+    cashflow = calculate_cashflow(revenue, expenses)
+    
+    assert outcomes['total_revenue'] == pytest.approx(revenue['total_revenue'].sum())
+    assert outcomes['total_expenses'] == pytest.approx(sum(expenses.values()))
+    assert outcomes['cumulative_cashflow'] == pytest.approx(cashflow['cumulative_cashflow'].iloc[-1])
@@ -0,0 +1,94 @@
+import pandas as pd
+from sqlalchemy import text
+from utils.database import get_sqlalchemy_engine
+from utils.importer import stream_import
+
+MEMBERS = pd.DataFrame({
+    'name': ['Anna', 'Bram'],
+    'email': ['anna@example.com', 'bram@example.com'],
+    'country': ['Netherlands', 'Belgium'],
+    'join_date': ['2024-01-15', '2024-02-01'],
+    'membership_type': ['Standard', 'Premium']
+})
+
+def event_fees(copies):
+    """Identical event fee payments of one member, e.g. for two tickets"""
+    return pd.DataFrame({
+        'member_email': ['anna@example.com'] * copies,
+        'amount': [50.0] * copies,
+        'transaction_type': ['event_fee'] * copies,
+        'transaction_date': ['2024-03-10'] * copies
+    })
+
+def counts(summary):
+    return {key: summary[key] for key in ('rows_imported', 'inserted', 'updated', 'skipped')}
+
+def transaction_count():
+    with get_sqlalchemy_engine().connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM transactions")).scalar()
+
+def test_member_upsert_updates_changed_rows_and_skips_unchanged(sqlite_database):
+    assert counts(stream_import('members', MEMBERS, mode='upsert')) == {
+        'rows_imported': 2, 'inserted': 2, 'updated': 0, 'skipped': 0
+    }
+    assert counts(stream_import('members', MEMBERS, mode='upsert')) == {
+        'rows_imported': 0, 'inserted': 0, 'updated': 0, 'skipped': 2
+    }
+    
+    moved = MEMBERS.assign(country=['Germany', 'Belgium'])
+    assert counts(stream_import('members', moved, mode='upsert')) == {
+        'rows_imported': 1, 'inserted': 0, 'updated': 1, 'skipped': 1
+    }
+
+def test_transaction_upsert_keeps_identical_payments(sqlite_database):
+    stream_import('members', MEMBERS, mode='upsert')
+    
+    assert counts(stream_import('transactions', event_fees(2), mode='upsert')) == {
+        'rows_imported': 2, 'inserted': 2, 'updated': 0, 'skipped': 0
+    }
+    assert transaction_count() == 2
+
+def test_transaction_upsert_rerun_inserts_nothing(sqlite_database):
+    stream_import('members', MEMBERS, mode='upsert')
+    stream_import('transactions', event_fees(2), mode='upsert')
+    
+    assert counts(stream_import('transactions', event_fees(2), mode='upsert')) == {
+        'rows_imported': 0, 'inserted': 0, 'updated': 0, 'skipped': 2
+    }
+    assert transaction_count() == 2
+
+def test_transaction_upsert_inserts_only_additional_copies(sqlite_database):
+    stream_import('members', MEMBERS, mode='upsert')
+    stream_import('transactions', event_fees(2), mode='upsert')
+    
+    assert counts(stream_import('transactions', event_fees(3), mode='upsert')) == {
+        'rows_imported': 1, 'inserted': 1, 'updated': 0, 'skipped': 2
+    }
+    assert transaction_count() == 3
+
+def test_transaction_append_inserts_every_row(sqlite_database):
+    stream_import('members', MEMBERS, mode='upsert')
+    stream_import('transactions', event_fees(2), mode='append')
+    
+    assert counts(stream_import('transactions', event_fees(2), mode='append')) == {
+        'rows_imported': 2, 'inserted': 2, 'updated': 0, 'skipped': 0
+    }
+    assert transaction_count() == 4
+
+def test_unmatched_emails_are_capped_but_fully_counted(sqlite_database, monkeypatch):
+    monkeypatch.setenv('IMPORT_MAX_ERRORS', '2')
+    stream_import('members', MEMBERS, mode='upsert')
+    orphans = pd.DataFrame({
+        'member_email': ['x@example.com', 'x@example.com', 'y@example.com', 'z@example.com', 'anna@example.com'],
+        'amount': [10.0, 20.0, 30.0, 40.0, 50.0],
+        'transaction_type': ['event_fee'] * 5,
+        'transaction_date': ['2024-03-10'] * 5
+    })
+    
+    summary = stream_import('transactions', orphans, mode='append')
+    assert summary['unmatched_rows'] == 4
+    assert summary['unmatched_emails'].to_dict('records') == [
+        {'member_email': 'x@example.com', 'row_count': 2},
+        {'member_email': 'y@example.com', 'row_count': 1}
+    ]
+    assert summary['inserted'] == 1
@@ -0,0 +1,14 @@
+from sqlalchemy import text
+from utils.database import get_sqlalchemy_engine
+from utils.instrumentation import render_scope, summarize_render
+
+def test_unreported_select_row_counts_stay_unknown(sqlite_database):
+    with render_scope('test') as render:
+        with get_sqlalchemy_engine().connect() as conn:
+            conn.execute(text("SELECT COUNT(*) FROM members")).scalar()
+    
+    # SQLite reports rowcount -1 for SELECTs, which is no measurement of 0 rows
+    assert [record['rows'] for record in render['queries']] == [None]
+    summary = summarize_render(render)
+    assert summary['rows'] is None
+    assert summary['fingerprints'][0]['rows'] is None
@@ -0,0 +1,42 @@
+import pandas as pd
+from sqlalchemy import text
+from models.financial import record_transaction
+from models.member import add_member, update_member_status
+from utils.database import get_sqlalchemy_engine
+from utils.rollups import rebuild_rollups
+
+def rollup_rows():
+    with get_sqlalchemy_engine().connect() as conn:
+        return {
+            table: pd.read_sql(text(f"SELECT * FROM {table} ORDER BY 1, 2, 3"), conn).astype(str)
+            for table in ('monthly_transaction_rollup', 'monthly_member_rollup')
+        }
+
+def member_id(email):
+    with get_sqlalchemy_engine().connect() as conn:
+        return conn.execute(text("SELECT id FROM members WHERE email = :email"), {"email": email}).scalar()
+
+def test_single_row_deltas_match_a_full_rebuild(sqlite_database):
+    assert add_member('Anna', 'anna@example.com', 'Netherlands', '2024-01-15', 'Standard')
+    assert add_member('Bram', 'bram@example.com', 'Netherlands', '2024-01-20', 'Standard')
+    assert add_member('Clara', 'clara@example.com', 'Belgium', '2024-02-01', 'Premium')
+    anna, bram = member_id('anna@example.com'), member_id('bram@example.com')
+    
+    # Repeat payments, a refund and a month without earlier transactions
+    record_transaction(anna, 50.0, 'event_fee', '2024-01-25')
+    record_transaction(anna, -20.0, 'refund', '2024-02-03')
+    record_transaction(anna, 50.0, 'event_fee', '2024-02-10')
+    record_transaction(bram, -10.0, 'refund', '2024-03-01')
+    record_transaction(None, 30.0, 'event_fee', '2024-03-02')
+    
+    assert update_member_status(bram, False)
+    assert update_member_status(bram, False)  # Unchanged status leaves the counts alone
+    assert update_member_status(anna, False)
+    assert update_member_status(anna, True)
+    
+    incremental = rollup_rows()
+    assert rebuild_rollups()
+    rebuilt = rollup_rows()
+    
+    for table, frame in rebuilt.items():
+        pd.testing.assert_frame_equal(incremental[table], frame)
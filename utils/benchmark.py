@@ -0,0 +1,224 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import text
+from utils.database import get_sqlalchemy_engine, bulk_import_data
+from utils.cache import clear_cache
+from utils.model_registry import clear_loaded_models
+from utils.calculations import calculate_financial_kpis, calculate_revenue_forecast
+from utils.ml_forecasting import predict_member_growth, predict_churn_probability
+from utils.synthetic import generate_sample_data
+from utils.instrumentation import render_scope, sum_rows
+from utils.telemetry import fallback_scope
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_REPEAT = 3
+DEFAULT_IMPORT_ROWS = 10000
+DEFAULT_MONTHS = 36
+
+# Average transactions the synthetic generator creates per member over DEFAULT_MONTHS
+TRANSACTIONS_PER_MEMBER = 5.5
+
+# Tables emptied before each dataset size, children first
+BENCHMARK_TABLES = [
+    'member_churn_scores',
+    'churn_scoring_runs',
+    'consistency_runs',
+    'transactions',
+    'events',
+    'members',
+    'import_batches',
+    'monthly_transaction_rollup',
+    'monthly_member_rollup'
+]
+
+def import_sample(rows, members):
+    """Build a transactions import frame referencing existing synthetic members"""
+    member_ids = pd.Series(range(1, rows + 1)) % max(members, 1) + 1
+    return pd.DataFrame({
+        'member_email': 'member' + member_ids.astype(str) + '@example.com',
+        'amount': 50.0,
+        'transaction_type': 'event_fee',
+        'transaction_date': pd.Timestamp.today().normalize() - pd.to_timedelta(member_ids % 365, unit='D')
+    })
+
+BENCHMARKS = {
+    'calculate_financial_kpis': lambda context: calculate_financial_kpis('Last Year'),
+    'calculate_revenue_forecast': lambda context: calculate_revenue_forecast(795, 50, 4),
+    'predict_member_growth': lambda context: predict_member_growth(),
+    'predict_churn_probability': lambda context: predict_churn_probability(),
+    'bulk_import_data': lambda context: bulk_import_data(
+        'transactions', import_sample(context['import_rows'], context['members'])
+    )
+}
+
+def reset_database(engine):
+    """Empty every benchmark table"""
+    with engine.begin() as conn:
+        if conn.dialect.name == 'postgresql':
+            conn.execute(text(f"TRUNCATE {', '.join(BENCHMARK_TABLES)} RESTART IDENTITY CASCADE"))
+        else:
+            for table in BENCHMARK_TABLES:
+                conn.execute(text(f"DELETE FROM {table}"))
+
+def run_once(benchmark, context, trace_memory=False):
+    """Run one benchmark cold (no metric cache or loaded models) and measure it
+    
+    Benchmarked functions catch their own errors and return defaults, so a run that fell
+    back (see utils.telemetry.record_fallback) counts as failed: it timed the fallback path.
+    rows_fetched is None when the driver reports no row counts for SELECTs (SQLite and
+    DuckDB), see utils.instrumentation.sum_rows.
+    """
+    clear_cache()
+    clear_loaded_models()
+    if trace_memory:
+        tracemalloc.start()
+    
+    with render_scope('benchmark') as render, fallback_scope() as scope:
+        started = time.perf_counter()
+        error = None
+        try:
+            result = benchmark(context)
+        except Exception as e:
+            result, error = None, str(e)
+        seconds = time.perf_counter() - started
+    
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    
+    if error is None and scope['fallback']:
+        error = "fell back to default values (see the log)"
+    return {
+        'seconds': seconds,
+        'queries': len(render['queries']),
+        'rows_fetched': sum_rows(render['queries']),
+        'peak_memory_bytes': peak,
+        'returned_result': result is not None and result is not False,
+        'failed': error is not None,
+        'error': error
+    }
+
+def run_benchmarks(sizes=None, repeat=DEFAULT_REPEAT, import_rows=DEFAULT_IMPORT_ROWS, names=None, seed=42):
+    """Load a synthetic dataset per transaction count and time each benchmark on it
+    
+    Wall times come from `repeat` untraced runs; peak memory from one extra run under
+    tracemalloc, which would otherwise inflate the timings. Model persistence is disabled
+    so forecasts are measured with a full refit. Returns one result dict per size and benchmark.
+    """
+    os.environ['MODEL_CACHE_ENABLED'] = 'false'
+    os.environ['QUERY_INSTRUMENTATION'] = 'true'
+    engine = get_sqlalchemy_engine()
+    results = []
+    
+    for size in sizes or DEFAULT_SIZES:
+        reset_database(engine)
+        members = max(1, round(size / TRANSACTIONS_PER_MEMBER))
+        loaded = generate_sample_data(members=members, months=DEFAULT_MONTHS, seed=seed)
+        context = {'members': members, 'import_rows': import_rows}
+        print(f"Loaded {loaded['transactions']:,} transactions for {members:,} members "
+              f"in {loaded['seconds']:.1f}s")
+        
+        for name in names or BENCHMARKS:
+            runs = [run_once(BENCHMARKS[name], context) for _ in range(repeat)]
+            traced = run_once(BENCHMARKS[name], context, trace_memory=True)
+            timings = [run['seconds'] for run in runs]
+            
+            results.append({
+                'benchmark': name,
+                'size': size,
+                'transactions': loaded['transactions'],
+                'members': members,
+                'runs': repeat,
+                'min_seconds': min(timings),
+                'median_seconds': statistics.median(timings),
+                'queries': runs[-1]['queries'],
+                'rows_fetched': runs[-1]['rows_fetched'],
+                'peak_memory_mb': traced['peak_memory_bytes'] / 2 ** 20,
+                'returned_result': all(run['returned_result'] for run in runs),
+                'failed_runs': sum(run['failed'] for run in runs + [traced]),
+                'error': next((run['error'] for run in runs + [traced] if run['error']), None)
+            })
+            print(f"  {name}: {results[-1]['median_seconds']:.3f}s, {results[-1]['queries']} queries, "
+                  f"{results[-1]['peak_memory_mb']:.1f} MB"
+                  + (f", FAILED: {results[-1]['error']}" if results[-1]['error'] else ""))
+    
+    return results
+
+def current_commit():
+    """Get the checked out git commit, if any"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def save_results(results, path):
+    """Write benchmark results with enough context to compare runs between commits"""
+    with open(path, 'w') as file:
+        json.dump({
+            'commit': current_commit(),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'dialect': get_sqlalchemy_engine().dialect.name,
+            'python': platform.python_version(),
+            'results': results
+        }, file, indent=2)
+
+def compare_results(baseline_path, results):
+    """Compare results against a saved baseline as new/old ratios per benchmark and size"""
+    with open(baseline_path) as file:
+        baseline = pd.DataFrame(json.load(file)['results'])
+    
+    current = pd.DataFrame(results)
+    merged = current.merge(baseline, on=['benchmark', 'size'], suffixes=('', '_baseline'))
+    for column in ['median_seconds', 'queries', 'rows_fetched', 'peak_memory_mb']:
+        baseline_values = pd.to_numeric(merged[f"{column}_baseline"])
+        merged[f"{column}_ratio"] = pd.to_numeric(merged[column]) / baseline_values.where(baseline_values > 0)
+    return merged[[
+        'benchmark', 'size',
+        'median_seconds_baseline', 'median_seconds', 'median_seconds_ratio',
+        'queries_ratio', 'rows_fetched_ratio', 'peak_memory_mb_ratio'
+    ]]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark calculations, forecasts and imports on synthetic data. "
+                    "This empties the club tables of the DATABASE_URL database."
+    )
+    parser.add_argument("--sizes", default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="comma-separated transaction counts, e.g. 1000,100000,10000000")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per benchmark")
+    parser.add_argument("--import-rows", type=int, default=DEFAULT_IMPORT_ROWS, help="rows per import benchmark")
+    parser.add_argument("--only", help="comma-separated benchmark names")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file to write results to")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--reset-database", action="store_true",
+                        help="confirm that the database may be emptied and refilled")
+    args = parser.parse_args()
+    
+    if not args.reset_database:
+        parser.error("benchmarks empty the database; pass --reset-database against a scratch database")
+    
+    from utils.database import init_db
+    init_db()
+    
+    results = run_benchmarks(
+        sizes=[int(size) for size in args.sizes.split(',')],
+        repeat=args.repeat,
+        import_rows=args.import_rows,
+        names=args.only.split(',') if args.only else None
+    )
+    save_results(results, args.output)
+    print(f"Results written to {args.output}")
+    
+    if args.compare:
+        print(compare_results(args.compare, results).to_string(index=False))
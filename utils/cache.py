@@ -0,0 +1,111 @@
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+from utils.config import load_cache_config
+from utils.telemetry import fallback_scope
+
+# Process-wide metric cache: key -> (expires_at, tables, value)
+_entries = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {}
+
+def _function_stats(name):
+    if name not in _stats:
+        _stats[name] = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+    return _stats[name]
+
+def _freeze(value):
+    """Make dict and list arguments (e.g. injected config) usable in a cache key"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _make_key(name, args, kwargs):
+    key = (name, _freeze(args), _freeze(kwargs))
+    try:
+        hash(key)
+    except TypeError:
+        return None  # Unhashable arguments (e.g. DataFrames) are never cached
+    return key
+
+def cached_metric(ttl=None, tables=()):
+    """Cache a metric function by arguments with TTL, LRU eviction and table-based invalidation
+    
+    Calls that fell back to default values (see utils.telemetry.record_fallback) are not cached.
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__name__}"
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            config = load_cache_config()
+            key = _make_key(name, args, kwargs)
+            if not config['enabled'] or key is None:
+                return func(*args, **kwargs)
+            
+            now = time.monotonic()
+            with _cache_lock:
+                entry = _entries.get(key)
+                if entry is not None and entry[0] > now:
+                    _entries.move_to_end(key)
+                    _function_stats(name)['hits'] += 1
+                    return copy.deepcopy(entry[2])
+                _function_stats(name)['misses'] += 1
+            
+            with fallback_scope() as scope:
+                value = func(*args, **kwargs)
+            if scope['fallback']:
+                # Defaults returned after an error would outlive the outage; retry next call
+                return value
+            expires_at = now + (ttl if ttl is not None else config['ttl'])
+            
+            with _cache_lock:
+                _entries[key] = (expires_at, frozenset(tables), copy.deepcopy(value))
+                _entries.move_to_end(key)
+                while len(_entries) > config['max_entries']:
+                    evicted_key, _ = _entries.popitem(last=False)
+                    _function_stats(evicted_key[0])['evictions'] += 1
+            
+            return value
+        
+        wrapper.cache_name = name
+        return wrapper
+    return decorator
+
+def invalidate_metrics(*tables):
+    """Drop cached metrics that depend on any of the given tables (all metrics when none given)"""
+    with _cache_lock:
+        if not tables:
+            stale = list(_entries)
+        else:
+            stale = [key for key, entry in _entries.items() if entry[1] & set(tables)]
+        for key in stale:
+            del _entries[key]
+            _function_stats(key[0])['invalidations'] += 1
+    return len(stale)
+
+def get_cache_stats():
+    """Get per-function hit/miss counters and the current cache size"""
+    with _cache_lock:
+        functions = {name: dict(counters) for name, counters in _stats.items()}
+        size = len(_entries)
+    
+    hits = sum(counters['hits'] for counters in functions.values())
+    misses = sum(counters['misses'] for counters in functions.values())
+    return {
+        'entries': size,
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / (hits + misses) if hits + misses else 0,
+        'functions': functions
+    }
+
+def clear_cache():
+    """Drop every cached entry and reset the counters"""
+    with _cache_lock:
+        _entries.clear()
+        _stats.clear()
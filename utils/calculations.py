@@ -1,85 +1,200 @@
 import pandas as pd
 import numpy as np
-from utils.database import get_sqlalchemy_engine
+from utils.database import get_analytics_engine
+from utils.dialects import current_month_start
+from utils.forecast_kernel import (
+    forecast_scenarios,
+    project_expenses,
+    FORECAST_COLUMNS,
+    SCENARIO_GROWTH_MULTIPLIERS,
+    SCENARIO_EXPENSE_MULTIPLIERS
+)
+from utils.cache import cached_metric
+from utils.concurrent_loading import load_concurrently
+from utils.telemetry import observed, record_fallback
 from datetime import datetime
 from sqlalchemy import text
 
+@cached_metric(tables=('members',))
+@observed
 def calculate_total_members():
     try:
-        engine = get_sqlalchemy_engine()
+        engine = get_analytics_engine()
         with engine.connect() as conn:
-            result = conn.execute(text("SELECT COUNT(*) FROM members WHERE active = TRUE"))
+            result = conn.execute(text(TOTAL_MEMBERS_QUERY))
             total = result.scalar()
             return total
     except Exception as e:
-        print(f"Error calculating total members: {str(e)}")
+        record_fallback("Error calculating total members", e)
         return 0
 
+@cached_metric(tables=('transactions',))
+@observed
 def calculate_monthly_revenue():
     try:
-        engine = get_sqlalchemy_engine()
+        engine = get_analytics_engine()
         with engine.connect() as conn:
-            result = conn.execute(text("""
-                SELECT COALESCE(SUM(amount), 0)
-                FROM transactions 
-                WHERE transaction_date >= DATE_TRUNC('month', CURRENT_DATE)
-            """))
+            result = conn.execute(text(monthly_revenue_query(conn)))
             revenue = result.scalar() or 0
             return float(revenue)
     except Exception as e:
-        print(f"Error calculating monthly revenue: {str(e)}")
+        record_fallback("Error calculating monthly revenue", e)
         return 0.0
 
+# Monthly aggregates are read from the rollup tables maintained by utils.rollups
+TOTAL_MEMBERS_QUERY = "SELECT COALESCE(SUM(active_members), 0) FROM monthly_member_rollup"
+
+def monthly_revenue_query(bind):
+    """Net revenue of the current month"""
+    return f"""
+        SELECT COALESCE(SUM(revenue - expenses), 0)
+        FROM monthly_transaction_rollup
+        WHERE month >= {current_month_start(bind)}
+    """
+
+MEMBER_AGGREGATES_QUERY = """
+    SELECT month, country, new_members, active_members
+    FROM monthly_member_rollup
+    ORDER BY month
+"""
+
+TRANSACTION_AGGREGATES_QUERY = """
+    SELECT 
+        month,
+        SUM(revenue) as revenue,
+        SUM(paying_members) as paying_members,
+        SUM(expenses) as expenses
+    FROM monthly_transaction_rollup
+    GROUP BY month
+    ORDER BY month
+"""
+
+ACTIVE_MEMBERS_BY_COUNTRY_QUERY = """
+    SELECT country, SUM(active_members) as count
+    FROM monthly_member_rollup
+    GROUP BY country
+    HAVING SUM(active_members) > 0
+"""
+
+EVENT_METRICS_QUERY = """
+    SELECT 
+        name,
+        date,
+        revenue,
+        costs,
+        revenue - costs as profit,
+        revenue / NULLIF(50, 0) as attendance
+    FROM events
+    ORDER BY date
+"""
+
+def empty_member_kpis():
+    return {
+        'growth_rate': 0,
+        'growth_rate_change': 0,
+        'retention_rate': 0,
+        'retention_rate_change': 0,
+        'growth_data': pd.DataFrame(),
+        'distribution_data': pd.DataFrame()
+    }
+
+def empty_financial_kpis():
+    return {
+        'revenue_per_member': 0,
+        'revenue_per_member_change': 0,
+        'operating_margin': 0,
+        'operating_margin_change': 0,
+        'financial_data': pd.DataFrame(),
+        'cash_flow_data': pd.DataFrame()
+    }
+
+def empty_event_metrics():
+    return {
+        'attendance_data': pd.DataFrame(),
+        'revenue_data': pd.DataFrame()
+    }
+
+def build_member_kpis(member_data):
+    """Derive growth, retention and distribution from monthly per-country member counts"""
+    growth_data = member_data.groupby('month', as_index=False)['new_members'].sum()
+    
+    total_members = member_data['new_members'].sum()
+    active_members = member_data['active_members'].sum()
+    retention_rate = (active_members * 100.0 / total_members) if total_members else 0
+    
+    distribution_data = (
+        member_data.groupby('country', as_index=False)['active_members'].sum()
+        .rename(columns={'active_members': 'count'})
+    )
+    distribution_data = distribution_data[distribution_data['count'] > 0].reset_index(drop=True)
+    
+    return {
+        'growth_rate': calculate_growth_rate(growth_data),
+        'growth_rate_change': calculate_growth_rate_change(growth_data),
+        'retention_rate': retention_rate,
+        'retention_rate_change': 0,
+        'growth_data': growth_data,
+        'distribution_data': distribution_data
+    }
+
+def build_financial_kpis(transaction_data):
+    """Derive revenue per member, margin and cash flow from monthly transaction totals"""
+    transaction_data = transaction_data.astype({'revenue': float, 'expenses': float})
+    revenue_data = transaction_data.loc[
+        transaction_data['revenue'] > 0, ['month', 'revenue', 'paying_members']
+    ].reset_index(drop=True)
+    
+    if revenue_data.empty:
+        return empty_financial_kpis()
+    
+    # Calculate revenue per member
+    revenue_data['revenue_per_member'] = revenue_data['revenue'] / revenue_data['paying_members'].replace(0, 1)
+    current_rpm = revenue_data['revenue_per_member'].iloc[-1]
+    prev_rpm = revenue_data['revenue_per_member'].iloc[-2] if len(revenue_data) > 1 else current_rpm
+    
+    # Calculate operating margin from the same monthly totals
+    total_revenue = transaction_data['revenue'].sum()
+    total_expenses = transaction_data['expenses'].sum()
+    current_margin = ((total_revenue - total_expenses) / total_revenue) * 100 if total_revenue else 0
+    
+    # Prepare financial data for visualization
+    expense_data = transaction_data.loc[
+        transaction_data['expenses'] > 0, ['month', 'expenses']
+    ]
+    financial_data = pd.merge(revenue_data, expense_data, on='month', how='outer').fillna(0)
+    financial_data['profit'] = financial_data['revenue'] - financial_data['expenses']
+    
+    # Calculate cash flow trend
+    cash_flow_data = financial_data.copy()
+    cash_flow_data['cumulative_cash'] = cash_flow_data['profit'].cumsum()
+    
+    return {
+        'revenue_per_member': current_rpm,
+        'revenue_per_member_change': ((current_rpm - prev_rpm) / prev_rpm * 100) if prev_rpm != 0 else 0,
+        'operating_margin': current_margin,
+        'operating_margin_change': 0,  # Could be calculated if historical margin is needed
+        'financial_data': financial_data,
+        'cash_flow_data': cash_flow_data
+    }
+
+def build_event_metrics(event_data):
+    """Split the single events read into attendance and revenue views"""
+    return {
+        'attendance_data': event_data[['name', 'date', 'attendance']],
+        'revenue_data': event_data[['name', 'date', 'revenue', 'costs', 'profit']]
+    }
+
+@cached_metric(tables=('members',))
+@observed
 def calculate_member_kpis(period):
     try:
-        engine = get_sqlalchemy_engine()
-        
-        # Calculate growth rate
-        growth_query = """
-            SELECT 
-                DATE_TRUNC('month', join_date) as month,
-                COUNT(*) as new_members
-            FROM members
-            GROUP BY DATE_TRUNC('month', join_date)
-            ORDER BY month
-        """
-        growth_data = pd.read_sql(text(growth_query), engine)
-        
-        # Calculate retention rate
-        retention_query = """
-            WITH member_counts AS (
-                SELECT 
-                    COUNT(*) as total_members,
-                    COUNT(*) FILTER (WHERE active = TRUE) as active_members
-                FROM members
-            )
-            SELECT 
-                CASE 
-                    WHEN total_members = 0 THEN 0
-                    ELSE (active_members * 100.0 / total_members)
-                END as retention_rate
-            FROM member_counts
-        """
-        retention_data = pd.read_sql(text(retention_query), engine)
-        
-        return {
-            'growth_rate': calculate_growth_rate(growth_data),
-            'growth_rate_change': calculate_growth_rate_change(growth_data),
-            'retention_rate': retention_data['retention_rate'].iloc[0] if not retention_data.empty else 0,
-            'retention_rate_change': 0,
-            'growth_data': growth_data,
-            'distribution_data': calculate_member_distribution()
-        }
+        engine = get_analytics_engine()
+        with engine.connect() as conn:
+            member_data = pd.read_sql(text(MEMBER_AGGREGATES_QUERY), conn)
+        return build_member_kpis(member_data)
     except Exception as e:
-        print(f"Error calculating member KPIs: {str(e)}")
-        return {
-            'growth_rate': 0,
-            'growth_rate_change': 0,
-            'retention_rate': 0,
-            'retention_rate_change': 0,
-            'growth_data': pd.DataFrame(),
-            'distribution_data': pd.DataFrame()
-        }
+        record_fallback("Error calculating member KPIs", e)
+        return empty_member_kpis()
 
 def calculate_growth_rate(data):
     if len(data) < 2:
@@ -96,252 +211,133 @@ def calculate_growth_rate_change(data):
     previous_growth = calculate_growth_rate(data.iloc[-3:-1])
     return current_growth - previous_growth
 
+@cached_metric(tables=('members',))
+@observed
 def calculate_member_distribution():
     try:
-        engine = get_sqlalchemy_engine()
-        query = """
-            SELECT country, COUNT(*) as count
-            FROM members
-            WHERE active = TRUE
-            GROUP BY country
-        """
-        distribution = pd.read_sql(text(query), engine)
+        engine = get_analytics_engine()
+        distribution = pd.read_sql(text(ACTIVE_MEMBERS_BY_COUNTRY_QUERY), engine)
         return distribution
     except Exception as e:
-        print(f"Error calculating member distribution: {str(e)}")
+        record_fallback("Error calculating member distribution", e)
         return pd.DataFrame(columns=['country', 'count'])
 
+@cached_metric(tables=('transactions',))
+@observed
 def calculate_operating_margin():
     try:
-        engine = get_sqlalchemy_engine()
-        
-        # Get total revenue
-        revenue_query = "SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE amount > 0"
-        with engine.connect() as conn:
-            total_revenue = conn.execute(text(revenue_query)).scalar() or 0
+        engine = get_analytics_engine()
         
-        # Get total expenses
-        expenses_query = "SELECT COALESCE(SUM(ABS(amount)), 0) FROM transactions WHERE amount < 0"
+        # Revenue and expenses in a single pass over the monthly rollup
+        query = """
+            SELECT 
+                COALESCE(SUM(revenue), 0) as total_revenue,
+                COALESCE(SUM(expenses), 0) as total_expenses
+            FROM monthly_transaction_rollup
+        """
         with engine.connect() as conn:
-            total_expenses = conn.execute(text(expenses_query)).scalar() or 0
+            total_revenue, total_expenses = conn.execute(text(query)).one()
         
-        if total_revenue == 0:
+        if not total_revenue:
             return 0
         
         return ((total_revenue - total_expenses) / total_revenue) * 100
     except Exception as e:
-        print(f"Error calculating operating margin: {str(e)}")
+        record_fallback("Error calculating operating margin", e)
         return 0
 
+@cached_metric(tables=('events',))
+@observed
 def calculate_event_metrics(period):
     try:
-        engine = get_sqlalchemy_engine()
-        
-        attendance_query = """
-            SELECT 
-                name,
-                date,
-                revenue / NULLIF(50, 0) as attendance
-            FROM events
-            ORDER BY date
-        """
-        attendance_data = pd.read_sql(text(attendance_query), engine)
-        
-        revenue_query = """
-            SELECT 
-                name,
-                date,
-                revenue,
-                costs,
-                revenue - costs as profit
-            FROM events
-            ORDER BY date
-        """
-        revenue_data = pd.read_sql(text(revenue_query), engine)
-        
-        return {
-            'attendance_data': attendance_data,
-            'revenue_data': revenue_data
-        }
+        engine = get_analytics_engine()
+        with engine.connect() as conn:
+            event_data = pd.read_sql(text(EVENT_METRICS_QUERY), conn)
+        return build_event_metrics(event_data)
     except Exception as e:
-        print(f"Error calculating event metrics: {str(e)}")
-        return {
-            'attendance_data': pd.DataFrame(),
-            'revenue_data': pd.DataFrame()
-        }
+        record_fallback("Error calculating event metrics", e)
+        return empty_event_metrics()
 
+@cached_metric(tables=('transactions',))
+@observed
 def calculate_financial_kpis(period):
     """Calculate financial KPIs for the given period"""
     try:
-        engine = get_sqlalchemy_engine()
-        
-        # Calculate revenue metrics
-        revenue_query = """
-            SELECT 
-                DATE_TRUNC('month', transaction_date) as month,
-                SUM(amount) as revenue,
-                COUNT(DISTINCT member_id) as paying_members
-            FROM transactions
-            WHERE amount > 0
-            GROUP BY DATE_TRUNC('month', transaction_date)
-            ORDER BY month
-        """
-        revenue_data = pd.read_sql(text(revenue_query), engine)
-        
-        if revenue_data.empty:
-            return {
-                'revenue_per_member': 0,
-                'revenue_per_member_change': 0,
-                'operating_margin': 0,
-                'operating_margin_change': 0,
-                'financial_data': pd.DataFrame(),
-                'cash_flow_data': pd.DataFrame()
-            }
-        
-        # Calculate revenue per member
-        revenue_data['revenue_per_member'] = revenue_data['revenue'] / revenue_data['paying_members'].replace(0, 1)
-        current_rpm = revenue_data['revenue_per_member'].iloc[-1]
-        prev_rpm = revenue_data['revenue_per_member'].iloc[-2] if len(revenue_data) > 1 else current_rpm
-        
-        # Calculate operating margin
-        current_margin = calculate_operating_margin()
-        
-        # Get expense data for visualizations
-        expense_query = """
-            SELECT 
-                DATE_TRUNC('month', transaction_date) as month,
-                SUM(ABS(amount)) as expenses
-            FROM transactions
-            WHERE amount < 0
-            GROUP BY DATE_TRUNC('month', transaction_date)
-            ORDER BY month
-        """
-        expense_data = pd.read_sql(text(expense_query), engine)
-        
-        # Prepare financial data for visualization
-        financial_data = pd.merge(revenue_data, expense_data, on='month', how='outer').fillna(0)
-        financial_data['profit'] = financial_data['revenue'] - financial_data['expenses']
-        
-        # Calculate cash flow trend
-        cash_flow_data = financial_data.copy()
-        cash_flow_data['cumulative_cash'] = cash_flow_data['profit'].cumsum()
-        
-        return {
-            'revenue_per_member': current_rpm,
-            'revenue_per_member_change': ((current_rpm - prev_rpm) / prev_rpm * 100) if prev_rpm != 0 else 0,
-            'operating_margin': current_margin,
-            'operating_margin_change': 0,  # Could be calculated if historical margin is needed
-            'financial_data': financial_data,
-            'cash_flow_data': cash_flow_data
-        }
+        engine = get_analytics_engine()
+        with engine.connect() as conn:
+            transaction_data = pd.read_sql(text(TRANSACTION_AGGREGATES_QUERY), conn)
+        return build_financial_kpis(transaction_data)
     except Exception as e:
-        print(f"Error calculating financial KPIs: {str(e)}")
-        return {
-            'revenue_per_member': 0,
-            'revenue_per_member_change': 0,
-            'operating_margin': 0,
-            'operating_margin_change': 0,
-            'financial_data': pd.DataFrame(),
-            'cash_flow_data': pd.DataFrame()
+        record_fallback("Error calculating financial KPIs", e)
+        return empty_financial_kpis()
+
+@observed
+def calculate_report_kpis(period):
+    """Calculate all Reports page metrics, loading members, transactions and events concurrently
+    
+    Each part is cached on its own, so one that times out falls back to empty values
+    for this render only.
+    """
+    return load_concurrently(
+        {
+            'member_kpis': (calculate_member_kpis, (period,)),
+            'financial_kpis': (calculate_financial_kpis, (period,)),
+            'event_metrics': (calculate_event_metrics, (period,))
+        },
+        {
+            'member_kpis': empty_member_kpis,
+            'financial_kpis': empty_financial_kpis,
+            'event_metrics': empty_event_metrics
         }
+    )
 
-def calculate_revenue_forecast(annual_fee, event_fee, num_events, scenario='realistic'):
-    """Calculate revenue forecast based on different growth scenarios"""
+@cached_metric()
+@observed
+def forecast_revenue(state, growth_targets, annual_fee, event_fee, num_events,
+                     scenarios=tuple(SCENARIO_GROWTH_MULTIPLIERS)):
+    """Revenue forecasts for several growth scenarios from a ClubState, without database access"""
     try:
-        growth_multipliers = {
-            'pessimistic': 0.5,
-            'realistic': 1.0,
-            'optimistic': 1.5
-        }
-        
-        multiplier = growth_multipliers[scenario]
-        
-        # Initialize with default values
-        current_members = {'Netherlands': 135, 'Belgium': 26, 'Germany': 0}
-        
-        try:
-            # Try to get actual numbers from database
-            engine = get_sqlalchemy_engine()
-            with engine.connect() as conn:
-                member_query = """
-                    SELECT country, COUNT(*) as count
-                    FROM members
-                    WHERE active = TRUE
-                    GROUP BY country
-                """
-                result = conn.execute(text(member_query))
-                db_members = dict(result.fetchall())
-            
-            # Update defaults with actual values if available
-            current_members.update(db_members)
-        except Exception as e:
-            print(f"Warning: Using default member counts due to database error: {str(e)}")
-        
-        # Get growth rates from config
-        from utils.config import load_config
-        config = load_config()
-        growth_targets = config['growth_targets']
-        
-        # Calculate 12-month forecast using ME (month end) frequency
-        months = pd.date_range(pd.Timestamp.now(), periods=12, freq='ME')
-        forecast = pd.DataFrame(index=months)
-        
-        for country in ['Netherlands', 'Belgium', 'Germany']:
-            members = float(current_members.get(country, 0))
-            monthly_growth = []
-            
-            for _ in range(12):
-                if country == 'Germany':
-                    # Absolute growth for Germany
-                    growth = float(growth_targets[country]) * multiplier
-                else:
-                    # Percentage growth for Netherlands and Belgium
-                    growth_rate = float(growth_targets[country]) / 100
-                    growth = members * growth_rate * multiplier
-                
-                members += growth
-                monthly_growth.append(members)
-            
-            forecast[f'{country}_members'] = monthly_growth
-        
-        # Calculate revenue components
-        forecast['total_members'] = forecast[[f'{c}_members' for c in ['Netherlands', 'Belgium', 'Germany']]].sum(axis=1)
-        forecast['membership_revenue'] = forecast['total_members'] * (annual_fee / 12)
-        forecast['event_revenue'] = forecast['total_members'] * event_fee * (num_events / 12)
-        forecast['total_revenue'] = forecast['membership_revenue'] + forecast['event_revenue']
-        
-        return forecast
+        return forecast_scenarios(
+            state.members_by_country, growth_targets, annual_fee, event_fee, num_events, tuple(scenarios)
+        )
     except Exception as e:
-        print(f"Error in revenue forecast calculation: {str(e)}")
-        return pd.DataFrame(columns=['total_members', 'membership_revenue', 'event_revenue', 'total_revenue'])
+        record_fallback("Error in revenue forecast calculation", e)
+        return {scenario: pd.DataFrame(columns=FORECAST_COLUMNS) for scenario in scenarios}
 
-def calculate_expenses_forecast(marketing_percentage, base_salary, num_employees, num_events, event_fee, scenario='realistic'):
-    """Calculate expense forecast based on different scenarios"""
+@cached_metric()
+@observed
+def forecast_expenses(state, marketing_percentage, base_salary, num_employees, num_events, event_fee,
+                      scenario='realistic'):
+    """Yearly expenses per category for a scenario from a ClubState, without database access"""
     try:
-        expense_multipliers = {
-            'pessimistic': 1.2,  # Higher expenses
-            'realistic': 1.0,
-            'optimistic': 0.9    # Lower expenses
-        }
-        
-        multiplier = expense_multipliers[scenario]
-        
-        # Get current revenue for marketing budget calculation
-        revenue = max(calculate_monthly_revenue() * 12, 1000)  # Minimum 1000 to avoid zero
-        total_members = max(calculate_total_members(), 1)  # Minimum 1 to avoid zero
-        
-        expenses = {
-            'Marketing': (revenue * marketing_percentage / 100) * multiplier,
-            'Salaries': (base_salary * num_employees * 12) * multiplier,
-            'Events': (total_members * event_fee * num_events) * multiplier,
-            'Operations': 180000 * multiplier  # Base yearly operational costs
-        }
-        
-        return expenses
+        return project_expenses(
+            state.yearly_revenue, state.expense_members, marketing_percentage, base_salary,
+            num_employees, num_events, event_fee, SCENARIO_EXPENSE_MULTIPLIERS[scenario]
+        )
     except Exception as e:
-        print(f"Error in expenses forecast calculation: {str(e)}")
+        record_fallback("Error in expenses forecast calculation", e)
         return {'Marketing': 0, 'Salaries': 0, 'Events': 0, 'Operations': 0}
 
+def calculate_revenue_forecasts(annual_fee, event_fee, num_events, scenarios=tuple(SCENARIO_GROWTH_MULTIPLIERS),
+                                growth_targets=None):
+    """Calculate revenue forecasts for several growth scenarios (configured growth targets unless given)"""
+    from utils.club_state import load_club_state
+    from utils.config import load_config
+    growth_targets = growth_targets or load_config()['growth_targets']
+    return forecast_revenue(load_club_state(), growth_targets, annual_fee, event_fee, num_events, tuple(scenarios))
+
+def calculate_revenue_forecast(annual_fee, event_fee, num_events, scenario='realistic', growth_targets=None):
+    """Calculate revenue forecast based on different growth scenarios"""
+    return calculate_revenue_forecasts(annual_fee, event_fee, num_events, (scenario,), growth_targets)[scenario]
+
+def calculate_expenses_forecast(marketing_percentage, base_salary, num_employees, num_events, event_fee, scenario='realistic'):
+    """Calculate expense forecast based on different scenarios"""
+    from utils.club_state import load_club_state
+    return forecast_expenses(
+        load_club_state(), marketing_percentage, base_salary, num_employees, num_events, event_fee, scenario
+    )
+
+@observed
 def calculate_cashflow(revenue_forecast, expenses):
     """Calculate cash flow based on revenue and expense forecasts"""
     try:
@@ -355,5 +351,5 @@ def calculate_cashflow(revenue_forecast, expenses):
         
         return cashflow
     except Exception as e:
-        print(f"Error in cashflow calculation: {str(e)}")
+        record_fallback("Error in cashflow calculation", e)
         return pd.DataFrame(columns=['expenses', 'net_cashflow', 'cumulative_cashflow'])
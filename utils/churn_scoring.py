@@ -0,0 +1,192 @@
+import argparse
+import json
+import pandas as pd
+from sqlalchemy import text
+from utils.database import get_sqlalchemy_engine, get_analytics_engine, get_db_data
+from utils.dialects import bulk_insert, floor_sql
+from utils.config import load_churn_config
+from utils.telemetry import observed, record_fallback
+from utils.ml_forecasting import (
+    CHURN_COLUMNS,
+    CHURN_DATA_QUERY,
+    CHURN_FEATURES,
+    fit_churn_model,
+    score_churn,
+    validate_data_requirements
+)
+
+def load_training_sample(sample_size):
+    """Load an evenly spaced, deterministic sample of members to fit the churn model on"""
+    total = get_db_data("SELECT COUNT(*) as count FROM members")
+    total = int(total['count'].iloc[0]) if not total.empty else 0
+    stride = max(1, -(-total // sample_size))  # Ceiling division
+    
+    return get_db_data(
+        CHURN_DATA_QUERY.format(where="WHERE m.id % :stride = 0" if stride > 1 else ""),
+        {"stride": stride} if stride > 1 else None
+    )
+
+def store_churn_scores(conn, scores, run_id):
+    """Upsert a chunk of scores through a bulk-loaded staging table and one set-based merge"""
+    conn.execute(text("DROP TABLE IF EXISTS staging_churn_scores"))
+    conn.execute(text("""
+        CREATE TEMPORARY TABLE staging_churn_scores AS
+        SELECT member_id, churn_probability
+        FROM member_churn_scores
+        WHERE 1 = 0
+    """))
+    bulk_insert(conn, 'staging_churn_scores', scores)
+    
+    # WHERE TRUE keeps SQLite from reading ON CONFLICT as a join constraint
+    conn.execute(
+        text("""
+            INSERT INTO member_churn_scores (member_id, churn_probability, run_id, scored_at)
+            SELECT member_id, churn_probability, CAST(:run_id AS INTEGER), CURRENT_TIMESTAMP
+            FROM staging_churn_scores
+            WHERE TRUE
+            ON CONFLICT (member_id) DO UPDATE SET
+                churn_probability = EXCLUDED.churn_probability,
+                run_id = EXCLUDED.run_id,
+                scored_at = EXCLUDED.scored_at
+        """),
+        {"run_id": run_id}
+    )
+    conn.execute(text("DROP TABLE staging_churn_scores"))
+
+@observed
+def score_churn_batch(batch_size=None, training_sample=None):
+    """Score every member in chunks with a pre-fitted model and store the results
+    
+    Each chunk is committed on its own; the run only gets its finished_at once every
+    member is scored. Returns a summary with the run id, number of members scored and
+    feature importance.
+    """
+    config = load_churn_config()
+    batch_size = batch_size or config['batch_size']
+    training_data = load_training_sample(training_sample or config['training_sample'])
+    
+    valid, message = validate_data_requirements(
+        training_data, min_rows=10, required_columns=CHURN_COLUMNS
+    )
+    if not valid:
+        record_fallback(f"Churn scoring skipped: {message}")
+        return None
+    
+    try:
+        scaler, model = fit_churn_model(training_data)
+        feature_importance = {
+            feature: float(importance)
+            for feature, importance in zip(CHURN_FEATURES, model.feature_importances_)
+        }
+        
+        engine = get_sqlalchemy_engine()
+        members_scored = 0
+        
+        with engine.begin() as conn:
+            run_id = conn.execute(
+                text("INSERT INTO churn_scoring_runs (feature_importance) VALUES (:importance) RETURNING id"),
+                {"importance": json.dumps(feature_importance)}
+            ).scalar()
+        
+        # Keyset pages of members: each chunk is read, scored and upserted in one short
+        # transaction on one connection, so a long run never pins a transaction
+        page_query = text(CHURN_DATA_QUERY.format(where="WHERE m.id > :after_id") + " LIMIT :batch_size")
+        after_id = 0
+        while True:
+            with engine.begin() as conn:
+                chunk = pd.read_sql(page_query, conn, params={"after_id": after_id, "batch_size": batch_size})
+                if chunk.empty:
+                    break
+                scores = pd.DataFrame({
+                    'member_id': chunk['id'].astype('int64'),
+                    'churn_probability': score_churn(scaler, model, chunk)
+                })
+                store_churn_scores(conn, scores, run_id)
+            members_scored += len(scores)
+            after_id = int(chunk['id'].iloc[-1])
+        
+        with engine.begin() as conn:
+            conn.execute(
+                text("""
+                    UPDATE churn_scoring_runs
+                    SET finished_at = CURRENT_TIMESTAMP, members_scored = :members_scored
+                    WHERE id = :run_id
+                """),
+                {"members_scored": members_scored, "run_id": run_id}
+            )
+        
+        return {
+            'run_id': run_id,
+            'members_scored': members_scored,
+            'feature_importance': feature_importance
+        }
+    
+    except Exception as e:
+        record_fallback("Error in batch churn scoring", e)
+        return None
+
+def load_churn_scores(min_probability=None, limit=None):
+    """Load precomputed churn scores, most at risk first, and the feature importance of their run
+    
+    Only scores above min_probability and at most limit rows are read. Returns
+    (scores, feature_importance, scored_at); scores is empty when nothing matched.
+    """
+    params = {"min_probability": min_probability, "limit": limit}
+    scores = get_db_data(
+        f"""
+            SELECT member_id, churn_probability, scored_at
+            FROM member_churn_scores
+            {"WHERE churn_probability > :min_probability" if min_probability is not None else ""}
+            ORDER BY churn_probability DESC
+            {"LIMIT :limit" if limit is not None else ""}
+        """,
+        {key: value for key, value in params.items() if value is not None} or None
+    )
+    
+    latest_run = get_db_data("""
+        SELECT feature_importance, finished_at
+        FROM churn_scoring_runs
+        WHERE finished_at IS NOT NULL
+        ORDER BY id DESC
+        LIMIT 1
+    """)
+    if latest_run.empty:
+        return scores, {}, None
+    
+    return scores, json.loads(latest_run['feature_importance'].iloc[0]), latest_run['finished_at'].iloc[0]
+
+def load_churn_distribution(bins=20):
+    """Count scored members per churn probability bin, computed in the database
+    
+    Returns one row per non-empty bin with its lower and upper probability bound.
+    """
+    bucket = floor_sql("churn_probability * :bins", get_analytics_engine())
+    counts = get_db_data(
+        f"""
+            SELECT {bucket} as bin, COUNT(*) as members
+            FROM member_churn_scores
+            GROUP BY 1
+            ORDER BY 1
+        """,
+        {"bins": bins}
+    )
+    if counts.empty:
+        return pd.DataFrame(columns=['probability_from', 'probability_to', 'members'])
+    
+    # A probability of exactly 1 belongs in the top bin
+    counts = counts.assign(bin=counts['bin'].clip(upper=bins - 1)).groupby('bin', as_index=False)['members'].sum()
+    return pd.DataFrame({
+        'probability_from': counts['bin'] / bins,
+        'probability_to': (counts['bin'] + 1) / bins,
+        'members': counts['members']
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score every member's churn risk into member_churn_scores")
+    parser.add_argument("--batch-size", type=int, help="members per scoring chunk (CHURN_BATCH_SIZE)")
+    args = parser.parse_args()
+    
+    from utils.database import init_db
+    init_db()
+    summary = score_churn_batch(batch_size=args.batch_size)
+    print(f"Scored {summary['members_scored']:,} members in run {summary['run_id']}" if summary else "Churn scoring failed")
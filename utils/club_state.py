@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from sqlalchemy import text
+from utils.database import get_analytics_engine
+from utils.cache import cached_metric
+from utils.telemetry import observed, record_fallback
+from utils.forecast_kernel import COUNTRIES
+from utils.calculations import (
+    ACTIVE_MEMBERS_BY_COUNTRY_QUERY,
+    TOTAL_MEMBERS_QUERY,
+    monthly_revenue_query
+)
+
+@dataclass(frozen=True)
+class ClubState:
+    """Database-derived inputs of the forecasts, loaded once per page render
+    
+    Frozen and hashable, so forecasts taking a state can be memoized on it.
+    """
+    active_members: tuple  # (country, members) pairs
+    monthly_revenue: float  # Net revenue of the current month
+    total_members: int
+    
+    @property
+    def members_by_country(self):
+        return dict(self.active_members)
+    
+    @property
+    def starting_members(self):
+        """Active members in forecast country order"""
+        members = self.members_by_country
+        return [float(members.get(country, 0)) for country in COUNTRIES]
+    
+    @property
+    def yearly_revenue(self):
+        """Current revenue run rate for the marketing budget, at least 1000 to avoid zero"""
+        return max(self.monthly_revenue * 12, 1000)
+    
+    @property
+    def expense_members(self):
+        """Members the event costs scale with, at least 1 to avoid zero"""
+        return max(self.total_members, 1)
+
+def default_club_state(starting_members):
+    """State from the configured starting members, used when the database is unavailable"""
+    return ClubState(
+        active_members=tuple(starting_members.items()),
+        monthly_revenue=0.0,
+        total_members=0
+    )
+
+@cached_metric(tables=('members', 'transactions'))
+@observed
+def load_club_state(starting_members=None):
+    """Read every forecast input on one connection
+    
+    Countries without active members keep their starting members (from load_config
+    unless given).
+    """
+    if starting_members is None:
+        from utils.config import load_config
+        starting_members = load_config()['starting_members']
+    try:
+        engine = get_analytics_engine()
+        with engine.connect() as conn:
+            members = dict(starting_members)
+            members.update(conn.execute(text(ACTIVE_MEMBERS_BY_COUNTRY_QUERY)).fetchall())
+            total_members = conn.execute(text(TOTAL_MEMBERS_QUERY)).scalar()
+            monthly_revenue = conn.execute(text(monthly_revenue_query(conn))).scalar()
+        
+        return ClubState(
+            active_members=tuple((country, int(count)) for country, count in members.items()),
+            monthly_revenue=float(monthly_revenue or 0),
+            total_members=int(total_members or 0)
+        )
+    except Exception as e:
+        record_fallback("Using default club state due to database error", e)
+        return default_club_state(starting_members)
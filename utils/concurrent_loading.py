@@ -0,0 +1,76 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.config import load_report_config
+from utils.database import statement_timeout
+from utils.telemetry import record_fallback
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Loads still running, by (function, arguments), so slow ones are never started twice
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+def get_loading_pool():
+    """Return the shared thread pool for page data loads, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=load_report_config()['max_workers'],
+                    thread_name_prefix='page-loader'
+                )
+    return _pool
+
+def run_load(load_key, func, args, timeout):
+    try:
+        with statement_timeout(timeout):
+            return func(*args)
+    finally:
+        # Before the result is set, so once a load is done the next one starts afresh
+        forget_load(load_key)
+
+def forget_load(load_key):
+    with _in_flight_lock:
+        _in_flight.pop(load_key, None)
+
+def submit_load(func, args, timeout):
+    """Start a load, or join the identical one that is still running"""
+    load_key = (f"{func.__module__}.{func.__qualname__}", args)
+    with _in_flight_lock:
+        future = _in_flight.get(load_key)
+        if future is not None:
+            return future
+        # Registered under the lock, which the load needs to forget itself
+        future = get_loading_pool().submit(
+            contextvars.copy_context().run, run_load, load_key, func, args, timeout
+        )
+        _in_flight[load_key] = future
+    return future
+
+def load_concurrently(calls, defaults, timeout=None):
+    """Run independent loads concurrently and collect their results by key
+    
+    calls maps keys to (function, arguments) pairs, defaults maps the same keys to
+    factories of the value used when a load has not finished within timeout seconds
+    (load_report_config unless given). Every load runs in a copy of the caller's
+    context, so its queries and telemetry count towards the current render and observed
+    call. PostgreSQL cancels a load's statements at the timeout; on other backends a
+    load that overruns keeps running, and later renders wait on it instead of starting
+    the same load again.
+    """
+    timeout = timeout if timeout is not None else load_report_config()['query_timeout']
+    futures = {key: submit_load(func, tuple(args), timeout) for key, (func, args) in calls.items()}
+    deadline = time.monotonic() + timeout
+    
+    results = {}
+    for key, future in futures.items():
+        try:
+            results[key] = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except TimeoutError as e:
+            record_fallback(f"Loading {key.replace('_', ' ')} timed out after {timeout}s", e)
+            results[key] = defaults[key]()
+    return results
@@ -1,3 +1,5 @@
+import os
+
 def load_config():
     """
     Load application configuration settings
@@ -20,3 +22,127 @@ def load_config():
             'Germany': 63  # Absolute number per month
         }
     }
+
+def load_pool_config():
+    """
+    Load database connection pool settings from the environment
+    """
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),  # Seconds
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    }
+
+def load_analytics_config():
+    """
+    Load the optional DuckDB analytics engine settings from the environment
+    """
+    return {
+        'url': os.environ.get('ANALYTICS_DATABASE_URL')  # e.g. duckdb:///:memory:
+    }
+
+def load_cache_config():
+    """
+    Load dashboard metric cache settings from the environment
+    """
+    return {
+        'enabled': os.environ.get('METRIC_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+        'ttl': float(os.environ.get('METRIC_CACHE_TTL', 300)),  # Seconds
+        'max_entries': int(os.environ.get('METRIC_CACHE_MAX_ENTRIES', 256))
+    }
+
+def load_model_registry_config():
+    """
+    Load fitted model persistence settings from the environment
+    """
+    return {
+        'enabled': os.environ.get('MODEL_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+        'directory': os.environ.get('MODEL_CACHE_DIR', '.model_cache'),
+        'keep_per_model': int(os.environ.get('MODEL_CACHE_KEEP', 3))  # Fitted versions kept on disk
+    }
+
+def load_training_config():
+    """
+    Load model training executor settings from the environment
+    """
+    return {
+        'executor': os.environ.get('TRAINING_EXECUTOR', 'thread'),  # 'thread' or 'process'
+        'max_workers': int(os.environ.get('TRAINING_WORKERS', os.cpu_count() or 1)),
+        'model_n_jobs': int(os.environ.get('TRAINING_MODEL_JOBS', 1))  # Threads per forest
+    }
+
+def load_simulation_config():
+    """
+    Load Monte Carlo scenario simulation settings from the environment
+    """
+    return {
+        'paths': int(os.environ.get('SIMULATION_PATHS', 10000)),
+        'chunk_size': int(os.environ.get('SIMULATION_CHUNK_SIZE', 5000)),  # Paths per vectorized batch
+        'executor': os.environ.get('SIMULATION_EXECUTOR', 'inline'),  # 'inline' or 'process'
+        'max_workers': int(os.environ.get('SIMULATION_WORKERS', os.cpu_count() or 1)),
+        'seed': int(os.environ.get('SIMULATION_SEED', 42))
+    }
+
+def load_sensitivity_config():
+    """
+    Load parameter sweep settings from the environment
+    """
+    return {
+        'chunk_size': int(os.environ.get('SENSITIVITY_CHUNK_SIZE', 20000)),  # Combinations per batch
+        'executor': os.environ.get('SENSITIVITY_EXECUTOR', 'thread'),  # 'inline', 'thread' or 'process'
+        'max_workers': int(os.environ.get('SENSITIVITY_WORKERS', os.cpu_count() or 1)),
+        'max_combinations': int(os.environ.get('SENSITIVITY_MAX_COMBINATIONS', 1000000))
+    }
+
+def load_report_config():
+    """
+    Load concurrent page data loading settings from the environment
+    """
+    return {
+        'query_timeout': float(os.environ.get('REPORT_QUERY_TIMEOUT', 10)),  # Seconds per load
+        'max_workers': int(os.environ.get('REPORT_WORKERS', 6))
+    }
+
+def load_churn_config():
+    """
+    Load batch churn scoring settings from the environment
+    """
+    return {
+        'batch_size': int(os.environ.get('CHURN_BATCH_SIZE', 10000)),  # Members per scoring chunk
+        'training_sample': int(os.environ.get('CHURN_TRAINING_SAMPLE', 50000))  # Max members to fit on
+    }
+
+def load_import_config():
+    """
+    Load bulk import settings from the environment
+    """
+    return {
+        'chunk_size': int(os.environ.get('IMPORT_CHUNK_SIZE', 50000)),  # CSV rows per chunk
+        'max_errors': int(os.environ.get('IMPORT_MAX_ERRORS', 1000))  # Error rows kept for the report
+    }
+
+def load_instrumentation_config():
+    """
+    Load query instrumentation and diagnostics page settings from the environment
+    """
+    return {
+        'enabled': os.environ.get('QUERY_INSTRUMENTATION', 'true').lower() in ('1', 'true', 'yes'),
+        'render_history': int(os.environ.get('QUERY_RENDER_HISTORY', 50)),  # Page renders kept
+        'repeat_threshold': int(os.environ.get('QUERY_REPEAT_THRESHOLD', 10)),  # Same query per render
+        'diagnostics_page': os.environ.get('SHOW_DIAGNOSTICS', 'false').lower() in ('1', 'true', 'yes')
+    }
+
+def load_telemetry_config():
+    """
+    Load structured logging and metrics export settings from the environment
+    """
+    return {
+        'log_level': os.environ.get('LOG_LEVEL', 'INFO').upper(),
+        'log_file': os.environ.get('LOG_FILE'),  # JSON lines; stderr when unset
+        'metrics_file': os.environ.get('METRICS_FILE'),  # Prometheus text format
+        'metrics_host': os.environ.get('METRICS_HOST', '127.0.0.1'),  # 0.0.0.0 exposes it on every interface
+        'metrics_port': int(os.environ['METRICS_PORT']) if os.environ.get('METRICS_PORT') else None,
+        'metrics_flush_seconds': float(os.environ.get('METRICS_FLUSH_SECONDS', 15))
+    }
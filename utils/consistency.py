@@ -0,0 +1,155 @@
+import json
+import time
+from datetime import datetime
+from sqlalchemy import text
+from utils.database import get_sqlalchemy_engine, get_db_data
+
+# One combined scan per table; {where} limits it to a single import batch in incremental mode
+TABLE_CHECKS = {
+    'members': """
+        SELECT COALESCE(SUM(row_count), 0) as rows_checked,
+               COALESCE(SUM(future_count), 0) as future_members,
+               COUNT(*) FILTER (WHERE row_count > 1) as duplicate_emails
+        FROM (
+            SELECT m.email,
+                   COUNT(*) as row_count,
+                   COUNT(*) FILTER (WHERE m.join_date > CURRENT_DATE) as future_count
+            FROM members m
+            {where}
+            GROUP BY m.email
+        ) per_email
+    """,
+    'transactions': """
+        SELECT COUNT(*) as rows_checked,
+               COUNT(*) FILTER (WHERE m.id IS NULL) as orphan_transactions,
+               COUNT(*) FILTER (
+                   WHERE t.transaction_type = 'membership_fee' AND t.amount != 795.00
+               ) as incorrect_fees,
+               COUNT(*) FILTER (WHERE t.transaction_date > CURRENT_DATE) as future_transactions
+        FROM transactions t
+        LEFT JOIN members m ON t.member_id = m.id
+        {where}
+    """
+}
+
+TABLE_ALIASES = {
+    'members': 'm',
+    'transactions': 't'
+}
+
+ISSUE_MESSAGES = {
+    'orphan_transactions': "Found {count} transactions with invalid member references",
+    'incorrect_fees': "Found {count} membership fee transactions with incorrect amounts",
+    'future_members': "Found {count} members with future join dates",
+    'future_transactions': "Found {count} transactions with future dates"
+}
+
+def latest_import_batch(conn):
+    """Get (id, table_name) of the most recent finished import batch, or None"""
+    return conn.execute(text("""
+        SELECT id, table_name FROM import_batches
+        WHERE finished_at IS NOT NULL
+        ORDER BY id DESC
+        LIMIT 1
+    """)).one_or_none()
+
+def duplicate_member_emails(conn, where, params):
+    """List the duplicated emails; only queried when the combined scan found any"""
+    rows = conn.execute(text(f"""
+        SELECT m.email FROM members m
+        {where}
+        GROUP BY m.email
+        HAVING COUNT(*) > 1
+        ORDER BY m.email
+    """), params).fetchall()
+    return [row[0] for row in rows]
+
+def run_consistency_checks(incremental=False, import_batch_id=None):
+    """Run the consistency checks and record the run in consistency_runs
+    
+    Full mode scans members and transactions once each. Incremental mode only checks
+    the rows of one import batch (the latest one unless import_batch_id is given).
+    Duplicate emails across batches are already prevented by the unique constraint.
+    Returns a dict with the run id, issues, rows checked and per-table timings.
+    """
+    engine = get_sqlalchemy_engine()
+    started_at = datetime.now()
+    incremental = incremental or import_batch_id is not None
+    issues = []
+    timings = {}
+    rows_checked = 0
+    
+    with engine.begin() as conn:
+        tables = list(TABLE_CHECKS)
+        if incremental:
+            if import_batch_id is None:
+                batch = latest_import_batch(conn)
+                import_batch_id = batch[0] if batch else None
+                batch_table = batch[1] if batch else None
+            else:
+                batch_table = conn.execute(
+                    text("SELECT table_name FROM import_batches WHERE id = :batch_id"),
+                    {"batch_id": import_batch_id}
+                ).scalar()
+            tables = [batch_table] if batch_table in TABLE_CHECKS else []
+        
+        params = {"batch_id": import_batch_id} if incremental else {}
+        
+        for table in tables:
+            where = f"WHERE {TABLE_ALIASES[table]}.import_batch_id = :batch_id" if incremental else ""
+            check_started = time.perf_counter()
+            counts = conn.execute(text(TABLE_CHECKS[table].format(where=where)), params).mappings().one()
+            
+            for check, message in ISSUE_MESSAGES.items():
+                if counts.get(check, 0) > 0:
+                    issues.append(message.format(count=counts[check]))
+            
+            if counts.get('duplicate_emails', 0) > 0:
+                duplicates = duplicate_member_emails(conn, where, params)
+                issues.append(f"Found duplicate member emails: {', '.join(duplicates)}")
+            
+            timings[table] = time.perf_counter() - check_started
+            rows_checked += int(counts['rows_checked'])
+        
+        run_id = conn.execute(
+            text("""
+                INSERT INTO consistency_runs
+                    (mode, import_batch_id, started_at, finished_at, rows_checked, issue_count, issues, timings)
+                VALUES
+                    (:mode, :batch_id, :started_at, :finished_at, :rows_checked, :issue_count, :issues, :timings)
+                RETURNING id
+            """),
+            {
+                "mode": 'incremental' if incremental else 'full',
+                "batch_id": import_batch_id,
+                "started_at": started_at,
+                "finished_at": datetime.now(),
+                "rows_checked": rows_checked,
+                "issue_count": len(issues),
+                "issues": json.dumps(issues),
+                "timings": json.dumps(timings)
+            }
+        ).scalar()
+    
+    return {
+        'run_id': run_id,
+        'issues': issues,
+        'rows_checked': rows_checked,
+        'timings': timings
+    }
+
+def load_consistency_runs(limit=20):
+    """Load the most recent consistency runs, newest first"""
+    runs = get_db_data(
+        """
+            SELECT id, mode, import_batch_id, started_at, finished_at, rows_checked, issue_count, timings
+            FROM consistency_runs
+            ORDER BY id DESC
+            LIMIT :limit
+        """,
+        {"limit": limit}
+    )
+    if not runs.empty:
+        runs['timings'] = runs['timings'].map(json.loads)
+        runs['seconds'] = runs['timings'].map(lambda timings: sum(timings.values()))
+    return runs
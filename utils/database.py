@@ -1,222 +1,194 @@
+import contextlib
 import os
 import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-from sqlalchemy import create_engine, text, MetaData, Table
+from sqlalchemy import create_engine, event, text, MetaData, Table
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 import re
+import threading
+from contextvars import ContextVar
+from utils.config import load_pool_config, load_analytics_config
+from utils.dialects import SUPPORTED_DIALECTS, attach_statements
+from utils.instrumentation import install_instrumentation
+from utils.telemetry import record_fallback
+from utils.validation import validate_frame, report_is_valid, summarize_report
+
+# Process-wide engine shared by every module and Streamlit session
+_engine = None
+_analytics_engine = None
+_session_factory = None
+_engine_lock = threading.Lock()
+
+# Statement timeout in seconds for queries of the current thread (or copied context), if any
+_statement_timeout = ContextVar('statement_timeout', default=None)
+
+@contextlib.contextmanager
+def statement_timeout(seconds):
+    """Make PostgreSQL cancel statements of the block that run longer than seconds"""
+    token = _statement_timeout.set(seconds)
+    try:
+        yield
+    finally:
+        _statement_timeout.reset(token)
+
+def apply_statement_timeout(conn, cursor, statement, parameters, context, executemany):
+    seconds = _statement_timeout.get()
+    if seconds is not None:
+        # Scoped to the statement's transaction, so pooled connections keep no timeout
+        cursor.execute(f"SET LOCAL statement_timeout = {max(int(seconds * 1000), 1)}")
+
+def create_backend_engine(url):
+    """Create an engine for a PostgreSQL, SQLite or DuckDB URL"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in SUPPORTED_DIALECTS:
+        raise ValueError(f"Unsupported database backend '{backend}', expected one of {', '.join(SUPPORTED_DIALECTS)}")
+    
+    if backend == 'duckdb':
+        try:
+            import duckdb_engine  # noqa: F401 registers the duckdb:// dialect
+        except ImportError:
+            raise ImportError(
+                "DuckDB support needs the optional packages: pip install duckdb duckdb-engine"
+            ) from None
+    
+    if backend != 'postgresql':
+        # Embedded databases live in this process; SQLAlchemy's default pools suit them
+        return create_engine(url)
+    
+    pool_config = load_pool_config()
+    engine = create_engine(
+        url,
+        pool_size=pool_config['pool_size'],
+        max_overflow=pool_config['max_overflow'],
+        pool_timeout=pool_config['pool_timeout'],
+        pool_recycle=pool_config['pool_recycle'],
+        pool_pre_ping=pool_config['pool_pre_ping']
+    )
+    event.listen(engine, 'before_cursor_execute', apply_statement_timeout)
+    return engine
 
 def get_sqlalchemy_engine():
-    return create_engine(os.environ['DATABASE_URL'])
+    """Return the shared pooled engine, creating it on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_backend_engine(os.environ['DATABASE_URL'])
+                install_instrumentation(_engine)
+    return _engine
+
+def get_analytics_engine():
+    """Return the engine for read-only aggregate queries
+    
+    With ANALYTICS_DATABASE_URL pointing at DuckDB, every connection attaches the
+    primary database read-only, so dashboard aggregations run on DuckDB's vectorized
+    engine against live data. Otherwise this is the primary engine.
+    """
+    global _analytics_engine
+    analytics_url = load_analytics_config()['url']
+    primary_url = make_url(os.environ['DATABASE_URL'])
+    if not analytics_url or primary_url.get_backend_name() == 'duckdb':
+        return get_sqlalchemy_engine()
+    
+    if _analytics_engine is None:
+        with _engine_lock:
+            if _analytics_engine is None:
+                engine = create_backend_engine(analytics_url)
+                if engine.dialect.name != 'duckdb':
+                    raise ValueError("ANALYTICS_DATABASE_URL must be a duckdb:// URL")
+                statements = attach_statements(primary_url)
+                
+                @event.listens_for(engine, "connect")
+                def attach_primary(dbapi_connection, connection_record):
+                    cursor = dbapi_connection.cursor()
+                    for statement in statements:
+                        cursor.execute(statement)
+                    cursor.close()
+                
+                install_instrumentation(engine)
+                _analytics_engine = engine
+    return _analytics_engine
 
 def get_session():
-    engine = get_sqlalchemy_engine()
-    Session = sessionmaker(bind=engine)
-    return Session()
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(bind=get_sqlalchemy_engine())
+    return _session_factory()
 
-def init_db():
-    engine = get_sqlalchemy_engine()
+def get_pool_stats():
+    """Get connection pool statistics for monitoring"""
+    if _engine is None:
+        return {
+            'pool_size': 0,
+            'checked_in': 0,
+            'checked_out': 0,
+            'overflow': 0,
+            'status': 'Engine not created'
+        }
     
-    # Create tables
-    with engine.connect() as conn:
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS members (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(100) NOT NULL,
-                email VARCHAR(100) UNIQUE NOT NULL,
-                country VARCHAR(50) NOT NULL,
-                join_date DATE NOT NULL,
-                membership_type VARCHAR(20) NOT NULL,
-                active BOOLEAN DEFAULT TRUE
-            )
-        """))
-        
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS transactions (
-                id SERIAL PRIMARY KEY,
-                member_id INTEGER REFERENCES members(id),
-                amount DECIMAL(10,2) NOT NULL,
-                transaction_type VARCHAR(50) NOT NULL,
-                transaction_date DATE NOT NULL
-            )
-        """))
-        
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS events (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(100) NOT NULL,
-                date DATE NOT NULL,
-                country VARCHAR(50) NOT NULL,
-                revenue DECIMAL(10,2) NOT NULL,
-                costs DECIMAL(10,2) NOT NULL
-            )
-        """))
-        conn.commit()
+    pool = _engine.pool
+    if not hasattr(pool, 'checkedout'):
+        # Embedded backends use pools without checkout accounting
+        return {
+            'pool_size': 0,
+            'checked_in': 0,
+            'checked_out': 0,
+            'overflow': 0,
+            'status': pool.status()
+        }
+    
+    return {
+        'pool_size': pool.size(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+        'status': pool.status()
+    }
+
+def dispose_engine():
+    """Close all pooled connections and drop the shared engine"""
+    global _engine, _analytics_engine, _session_factory
+    with _engine_lock:
+        for engine in (_engine, _analytics_engine):
+            if engine is not None:
+                engine.dispose()
+        _engine = None
+        _analytics_engine = None
+        _session_factory = None
+
+def init_db():
+    """Create or upgrade the database schema (memoized per process)"""
+    from utils.schema import ensure_schema
+    ensure_schema()
 
 def validate_import_data(table_name, data):
     """Validate imported data before insertion"""
     if data.empty:
         return False, "No data provided"
     
-    if table_name == 'members':
-        required_columns = ['name', 'email', 'country', 'join_date', 'membership_type']
-        if not all(col in data.columns for col in required_columns):
-            return False, f"Missing required columns. Required: {', '.join(required_columns)}"
-        
-        # Validate email format
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        invalid_emails = data[~data['email'].str.match(email_pattern)]['email'].tolist()
-        if invalid_emails:
-            return False, f"Invalid email format: {', '.join(invalid_emails)}"
-        
-        # Validate country
-        valid_countries = ['Netherlands', 'Belgium', 'Germany']
-        invalid_countries = data[~data['country'].isin(valid_countries)]['country'].unique()
-        if len(invalid_countries) > 0:
-            return False, f"Invalid countries: {', '.join(invalid_countries)}"
-        
-        # Validate membership type
-        valid_types = ['Standard', 'Premium']
-        invalid_types = data[~data['membership_type'].isin(valid_types)]['membership_type'].unique()
-        if len(invalid_types) > 0:
-            return False, f"Invalid membership types: {', '.join(invalid_types)}"
-    
-    elif table_name == 'transactions':
-        required_columns = ['member_email', 'amount', 'transaction_type', 'transaction_date']
-        if not all(col in data.columns for col in required_columns):
-            return False, f"Missing required columns. Required: {', '.join(required_columns)}"
-        
-        # Validate transaction types
-        valid_types = ['membership_fee', 'event_fee']
-        invalid_types = data[~data['transaction_type'].isin(valid_types)]['transaction_type'].unique()
-        if len(invalid_types) > 0:
-            return False, f"Invalid transaction types: {', '.join(invalid_types)}"
-        
-        # Validate amounts
-        if (data['amount'] <= 0).any():
-            return False, "All amounts must be positive"
-    
-    elif table_name == 'events':
-        required_columns = ['name', 'date', 'country', 'revenue', 'costs']
-        if not all(col in data.columns for col in required_columns):
-            return False, f"Missing required columns. Required: {', '.join(required_columns)}"
-        
-        # Validate country
-        valid_countries = ['Netherlands', 'Belgium', 'Germany']
-        invalid_countries = data[~data['country'].isin(valid_countries)]['country'].unique()
-        if len(invalid_countries) > 0:
-            return False, f"Invalid countries: {', '.join(invalid_countries)}"
-        
-        # Validate amounts
-        if (data['revenue'] < 0).any() or (data['costs'] < 0).any():
-            return False, "Revenue and costs must not be negative"
-    
-    return True, "Data validation passed"
+    report = validate_frame(table_name, data)
+    return report_is_valid(report), summarize_report(report, table_name)
 
 def bulk_import_data(table_name, data):
     """Import data in bulk with proper error handling"""
-    engine = get_sqlalchemy_engine()
-    
-    try:
-        if table_name == 'members':
-            data['join_date'] = pd.to_datetime(data['join_date']).dt.date
-            if 'active' not in data.columns:
-                data['active'] = True
-            data.to_sql('members', engine, if_exists='append', index=False)
-        
-        elif table_name == 'transactions':
-            # Get member IDs from emails
-            with engine.connect() as conn:
-                member_query = text("""
-                    SELECT id, email FROM members
-                    WHERE email IN :emails
-                """)
-                member_results = conn.execute(
-                    member_query,
-                    {"emails": tuple(data['member_email'].unique())}
-                ).fetchall()
-                
-                member_ids = {row[1]: row[0] for row in member_results}
-            
-            # Replace email with member_id
-            data['member_id'] = data['member_email'].map(member_ids)
-            data['transaction_date'] = pd.to_datetime(data['transaction_date']).dt.date
-            
-            # Drop email column and import
-            data = data.drop('member_email', axis=1)
-            data = data[~data['member_id'].isna()]  # Remove rows with invalid member emails
-            data.to_sql('transactions', engine, if_exists='append', index=False)
-        
-        elif table_name == 'events':
-            data['date'] = pd.to_datetime(data['date']).dt.date
-            data.to_sql('events', engine, if_exists='append', index=False)
-        
-        return True
-    
-    except SQLAlchemyError as e:
-        print(f"Error importing data: {str(e)}")
-        return False
+    from utils.importer import stream_import
+    return stream_import(table_name, data)['success']
 
-def verify_data_consistency():
-    """Check for data consistency issues"""
-    engine = get_sqlalchemy_engine()
-    issues = []
+def verify_data_consistency(incremental=False, import_batch_id=None):
+    """Check for data consistency issues
+    
+    With incremental=True (or an import_batch_id) only the rows of that import batch
+    are checked instead of the whole tables.
+    """
+    from utils.consistency import run_consistency_checks
     
     try:
-        with engine.connect() as conn:
-            # Check for transactions without valid members
-            orphan_transactions = conn.execute(text("""
-                SELECT COUNT(*) FROM transactions t
-                LEFT JOIN members m ON t.member_id = m.id
-                WHERE m.id IS NULL
-            """)).scalar()
-            
-            if orphan_transactions > 0:
-                issues.append(f"Found {orphan_transactions} transactions with invalid member references")
-            
-            # Check for membership fee consistency
-            incorrect_fees = conn.execute(text("""
-                SELECT COUNT(*) FROM transactions
-                WHERE transaction_type = 'membership_fee'
-                AND amount != 795.00
-            """)).scalar()
-            
-            if incorrect_fees > 0:
-                issues.append(f"Found {incorrect_fees} membership fee transactions with incorrect amounts")
-            
-            # Check for duplicate member emails
-            duplicate_emails = conn.execute(text("""
-                SELECT email, COUNT(*) as count
-                FROM members
-                GROUP BY email
-                HAVING COUNT(*) > 1
-            """)).fetchall()
-            
-            if duplicate_emails:
-                issues.append(f"Found duplicate member emails: {', '.join(row[0] for row in duplicate_emails)}")
-            
-            # Check for future dates
-            future_members = conn.execute(text("""
-                SELECT COUNT(*) FROM members
-                WHERE join_date > CURRENT_DATE
-            """)).scalar()
-            
-            if future_members > 0:
-                issues.append(f"Found {future_members} members with future join dates")
-            
-            future_transactions = conn.execute(text("""
-                SELECT COUNT(*) FROM transactions
-                WHERE transaction_date > CURRENT_DATE
-            """)).scalar()
-            
-            if future_transactions > 0:
-                issues.append(f"Found {future_transactions} transactions with future dates")
-        
-        return issues
+        return run_consistency_checks(incremental, import_batch_id)['issues']
     
     except SQLAlchemyError as e:
-        print(f"Error checking data consistency: {str(e)}")
+        record_fallback("Error checking data consistency", e)
         return ["Error performing consistency checks"]
 
 def get_data_templates(template_type):
@@ -251,9 +223,9 @@ def get_data_templates(template_type):
     return pd.DataFrame()
 
 def get_db_data(query, params=None):
-    """Unified function to get data from database using SQLAlchemy"""
+    """Unified function to get data from database using SQLAlchemy (on the analytics engine)"""
     try:
-        engine = get_sqlalchemy_engine()
+        engine = get_analytics_engine()
         with engine.connect() as conn:
             if params:
                 result = pd.read_sql(text(query), conn, params=params)
@@ -261,88 +233,17 @@ def get_db_data(query, params=None):
                 result = pd.read_sql(text(query), conn)
         return result
     except SQLAlchemyError as e:
-        print(f"Database error: {str(e)}")
+        record_fallback("Database error", e)
         return pd.DataFrame()
 
-def seed_sample_data():
+def seed_sample_data(members=400, months=12, seed=None):
     """Generate and insert sample historical data for ML training"""
-    engine = get_sqlalchemy_engine()
+    from utils.synthetic import generate_sample_data
     
     try:
-        # Generate sample member data
-        countries = ['Netherlands', 'Belgium', 'Germany']
-        membership_types = ['Standard', 'Premium']
-        start_date = datetime.now() - timedelta(days=365)
-        
-        # Generate member data
-        members_data = []
-        email_counter = 1
-        
-        for country in countries:
-            num_members = np.random.randint(50, 200)
-            for _ in range(num_members):
-                join_date = start_date + timedelta(days=np.random.randint(0, 365))
-                active = np.random.choice([True, True, True, False])  # 75% active rate
-                members_data.append({
-                    'name': f'Member {email_counter}',
-                    'email': f'member{email_counter}@example.com',
-                    'country': country,
-                    'join_date': join_date,
-                    'membership_type': np.random.choice(membership_types),
-                    'active': active
-                })
-                email_counter += 1
-        
-        # Insert member data
-        members_df = pd.DataFrame(members_data)
-        members_df.to_sql('members', engine, if_exists='append', index=False)
-        
-        # Get member IDs for transactions
-        with engine.connect() as conn:
-            member_ids = pd.read_sql("SELECT id FROM members", conn)['id'].tolist()
-        
-        # Generate transaction data
-        transactions_data = []
-        for member_id in member_ids:
-            num_transactions = np.random.randint(3, 12)
-            for _ in range(num_transactions):
-                transaction_date = start_date + timedelta(days=np.random.randint(0, 365))
-                transaction_type = np.random.choice(['membership_fee', 'event_fee'])
-                amount = 795.0 if transaction_type == 'membership_fee' else 50.0
-                transactions_data.append({
-                    'member_id': member_id,
-                    'amount': amount,
-                    'transaction_type': transaction_type,
-                    'transaction_date': transaction_date
-                })
-        
-        # Insert transaction data
-        transactions_df = pd.DataFrame(transactions_data)
-        transactions_df.to_sql('transactions', engine, if_exists='append', index=False)
-        
-        # Generate event data
-        events_data = []
-        for country in countries:
-            num_events = np.random.randint(4, 8)
-            for i in range(num_events):
-                event_date = start_date + timedelta(days=np.random.randint(0, 365))
-                num_attendees = np.random.randint(20, 100)
-                revenue = num_attendees * 50.0
-                costs = revenue * np.random.uniform(0.4, 0.6)
-                events_data.append({
-                    'name': f'{country} Event {i+1}',
-                    'date': event_date,
-                    'country': country,
-                    'revenue': revenue,
-                    'costs': costs
-                })
-        
-        # Insert event data
-        events_df = pd.DataFrame(events_data)
-        events_df.to_sql('events', engine, if_exists='append', index=False)
-        
+        generate_sample_data(members=members, months=months, seed=seed)
         return True
-        
+    
     except SQLAlchemyError as e:
-        print(f"Error seeding sample data: {str(e)}")
+        record_fallback("Error seeding sample data", e)
         return False
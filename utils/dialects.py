@@ -0,0 +1,157 @@
+import csv
+import io
+import re
+from sqlalchemy import text
+
+# Backends the schema and queries are written for; PostgreSQL is the reference dialect
+SUPPORTED_DIALECTS = ('postgresql', 'sqlite', 'duckdb')
+
+def dialect_of(bind):
+    """Get the dialect name of an engine or connection"""
+    return bind.dialect.name
+
+def month_start(column, bind):
+    """SQL for the first day of the month of a date column, as a DATE"""
+    if dialect_of(bind) == 'sqlite':
+        return f"date({column}, 'start of month')"
+    return f"CAST(DATE_TRUNC('month', {column}) AS DATE)"
+
+def current_month_start(bind):
+    """SQL for the first day of the current month"""
+    return month_start('CURRENT_DATE', bind)
+
+def floor_sql(expression, bind):
+    """SQL for a non-negative expression rounded down to an INTEGER"""
+    if dialect_of(bind) == 'sqlite':
+        return f"CAST({expression} AS INTEGER)"  # Truncates, the floor for non-negative values
+    return f"CAST(FLOOR({expression}) AS INTEGER)"
+
+def advisory_lock(conn, key, shared=False):
+    """Serialize a critical section across processes for the rest of the transaction
+    
+    Shared holders run side by side and only exclude exclusive ones. SQLite and DuckDB
+    allow a single writer at a time, so only PostgreSQL needs the lock.
+    """
+    if dialect_of(conn) == 'postgresql':
+        function = 'pg_advisory_xact_lock_shared' if shared else 'pg_advisory_xact_lock'
+        conn.execute(text(f"SELECT {function}(:key)"), {"key": key})
+
+def row_lock(bind):
+    """SQL clause locking the selected rows against other writers until commit
+    
+    NO KEY UPDATE still lets other transactions insert rows referencing the locked ones.
+    """
+    if dialect_of(bind) == 'postgresql':
+        return "FOR NO KEY UPDATE"
+    return ""
+
+def translate_ddl(statement, bind):
+    """Rewrite a PostgreSQL migration statement for the connected backend
+    
+    Returns the statements to run instead, which is empty for DDL the backend has no
+    equivalent for (constraints added after the fact, and partial indexes on DuckDB).
+    """
+    dialect = dialect_of(bind)
+    sql = statement.strip()
+    if dialect == 'postgresql':
+        return [sql]
+    
+    if re.match(r"ALTER TABLE \w+ ADD CONSTRAINT", sql):
+        return []
+    
+    if dialect == 'sqlite':
+        sql = sql.replace("SERIAL PRIMARY KEY", "INTEGER PRIMARY KEY AUTOINCREMENT")
+        return [sql.replace("ADD COLUMN IF NOT EXISTS", "ADD COLUMN")]
+    
+    if dialect == 'duckdb':
+        if sql.startswith("CREATE INDEX"):
+            # Column segments carry min/max zone maps, which cover the range filters
+            return []
+        sql = re.sub(r"\s+REFERENCES \w+\(\w+\)", "", sql) if "ADD COLUMN" in sql else sql
+        match = re.match(r"CREATE TABLE IF NOT EXISTS (\w+)", sql)
+        if match and "SERIAL PRIMARY KEY" in sql:
+            sequence = f"{match.group(1)}_id_seq"
+            return [
+                f"CREATE SEQUENCE IF NOT EXISTS {sequence}",
+                sql.replace("SERIAL PRIMARY KEY", f"INTEGER PRIMARY KEY DEFAULT nextval('{sequence}')")
+            ]
+        return [sql]
+    
+    raise ValueError(f"Unsupported database dialect: {dialect}")
+
+def affected_rows(result):
+    """Rows changed by an INSERT, UPDATE or DELETE
+    
+    DuckDB leaves rowcount at -1 and returns the count as a single result row instead.
+    """
+    if result.rowcount >= 0 or not result.returns_rows:
+        return result.rowcount
+    return result.scalar()
+
+def sync_id_sequence(conn, table_name):
+    """Move a table's id sequence past ids that were inserted explicitly"""
+    dialect = dialect_of(conn)
+    if dialect == 'postgresql':
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), (SELECT MAX(id) FROM {table_name}))"
+        ))
+    elif dialect == 'duckdb':
+        # DuckDB sequences cannot be set, only advanced
+        next_id = conn.execute(text(f"SELECT nextval('{table_name}_id_seq')")).scalar()
+        max_id = conn.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {table_name}")).scalar()
+        if max_id >= next_id:
+            conn.execute(text(f"SELECT MAX(nextval('{table_name}_id_seq')) FROM range({max_id - next_id + 1})"))
+    # SQLite AUTOINCREMENT already continues after the largest id
+
+def bulk_insert(conn, table_name, frame):
+    """Load a DataFrame with the fastest path of the backend
+    
+    PostgreSQL streams CSV through COPY and DuckDB scans the DataFrame in place, both
+    on the connection's own transaction; SQLite uses a multi-row executemany.
+    """
+    columns = ', '.join(frame.columns)
+    dialect = dialect_of(conn)
+    
+    if dialect == 'postgresql':
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False, quoting=csv.QUOTE_MINIMAL)
+        buffer.seek(0)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    
+    elif dialect == 'duckdb':
+        duckdb_conn = conn.connection.driver_connection
+        duckdb_conn.register('bulk_insert_frame', frame)
+        try:
+            duckdb_conn.execute(f"INSERT INTO {table_name} ({columns}) SELECT {columns} FROM bulk_insert_frame")
+        finally:
+            duckdb_conn.unregister('bulk_insert_frame')
+    
+    else:
+        placeholders = ', '.join(f":{column}" for column in frame.columns)
+        dates = frame.select_dtypes('datetime').columns
+        frame = frame.assign(**{column: frame[column].dt.date for column in dates})
+        records = frame.astype(object).where(frame.notna(), None).to_dict('records')
+        conn.execute(text(f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"), records)
+
+def attach_statements(url):
+    """DuckDB statements attaching the primary database read-only as the default catalog"""
+    if url.get_backend_name() == 'postgresql':
+        uri = url.set(drivername='postgresql').render_as_string(hide_password=False)
+        return [
+            "INSTALL postgres",
+            "LOAD postgres",
+            f"ATTACH '{uri}' AS club (TYPE postgres, READ_ONLY)",
+            "USE club"
+        ]
+    if url.get_backend_name() == 'sqlite':
+        return [
+            "INSTALL sqlite",
+            "LOAD sqlite",
+            f"ATTACH '{url.database}' AS club (TYPE sqlite, READ_ONLY)",
+            "USE club"
+        ]
+    raise ValueError(f"DuckDB cannot attach a {url.get_backend_name()} database")
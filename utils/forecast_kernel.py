@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+COUNTRIES = ['Netherlands', 'Belgium', 'Germany']
+
+# Growth targets of Netherlands and Belgium are monthly percentages (compound growth),
+# Germany's is an absolute number of new members per month (additive growth)
+COMPOUND_GROWTH = np.array([True, True, False])
+
+SCENARIO_GROWTH_MULTIPLIERS = {
+    'pessimistic': 0.5,
+    'realistic': 1.0,
+    'optimistic': 1.5
+}
+
+SCENARIO_EXPENSE_MULTIPLIERS = {
+    'pessimistic': 1.2,  # Higher expenses
+    'realistic': 1.0,
+    'optimistic': 0.9    # Lower expenses
+}
+
+YEARLY_OPERATIONS_COST = 180000  # Base yearly operational costs
+
+FORECAST_MONTHS = 12
+
+FORECAST_COLUMNS = ['total_members', 'membership_revenue', 'event_revenue', 'total_revenue']
+
+def growth_rates(growth_targets, multipliers):
+    """Monthly growth per scenario and country as a (scenarios, countries) array
+    
+    Compound countries get a fraction per month, additive countries new members per month.
+    """
+    targets = target_rates([float(growth_targets[country]) for country in COUNTRIES])
+    return np.outer(np.asarray(multipliers, dtype=float), targets)
+
+def target_rates(targets):
+    """Convert growth targets shaped (..., countries) to monthly rates: percentages become fractions"""
+    targets = np.asarray(targets, dtype=float)
+    return np.where(COMPOUND_GROWTH, targets / 100, targets)
+
+def project_members(starting_members, rates, months=FORECAST_MONTHS, churn=0.0):
+    """Project members for every scenario, country and month in one array operation
+    
+    starting_members has shape (countries,) or (scenarios, countries), rates shape
+    (scenarios, countries). churn is the fraction of members leaving each month, a scalar
+    or one value per scenario (and country). Returns a (scenarios, countries, months)
+    array of members at the end of each month.
+    """
+    rates = np.asarray(rates, dtype=float)[..., None]
+    start = np.broadcast_to(np.asarray(starting_members, dtype=float), rates.shape[:-1])[..., None]
+    churn = np.asarray(churn, dtype=float)
+    if churn.ndim == 1:
+        churn = churn[:, None]  # One rate per scenario applies to every country
+    retention = np.broadcast_to(1 - churn, rates.shape[:-1])[..., None]
+    steps = np.arange(1, months + 1)
+    
+    # Compound: m[t] = m[t-1] * (1 + rate) * retention
+    compound = start * ((1 + rates) * retention) ** steps
+    # Additive: m[t] = (m[t-1] + rate) * retention, summed as a geometric series
+    kept_additions = np.cumsum(retention ** (steps - 1), axis=-1)
+    additive = start * retention ** steps + rates * retention * kept_additions
+    return np.where(COMPOUND_GROWTH[:, None], compound, additive)
+
+def project_revenue(members, annual_fee, event_fee, num_events):
+    """Monthly totals from projected members as (total_members, membership, event) arrays
+    
+    Fees and event counts may be scalars or one value per scenario.
+    """
+    total_members = members.sum(axis=-2)
+    annual_fee, event_fee, num_events = (
+        np.asarray(value, dtype=float)[..., None] for value in (annual_fee, event_fee, num_events)
+    )
+    membership_revenue = total_members * (annual_fee / 12)
+    event_revenue = total_members * event_fee * (num_events / 12)
+    return total_members, membership_revenue, event_revenue
+
+def project_expenses(yearly_revenue, total_members, marketing_percentage, base_salary, num_employees,
+                     num_events, event_fee, multiplier=1.0):
+    """Yearly expenses per category; every argument may be a scalar or an array of variants"""
+    return {
+        'Marketing': (yearly_revenue * marketing_percentage / 100) * multiplier,
+        'Salaries': (base_salary * num_employees * 12) * multiplier,
+        'Events': (total_members * event_fee * num_events) * multiplier,
+        'Operations': YEARLY_OPERATIONS_COST * multiplier
+    }
+
+def forecast_months(months=FORECAST_MONTHS, start=None):
+    """Month-end dates of the forecast horizon"""
+    return pd.date_range(start if start is not None else pd.Timestamp.now(), periods=months, freq='ME')
+
+def forecast_scenarios(starting_members, growth_targets, annual_fee, event_fee, num_events,
+                       scenarios=tuple(SCENARIO_GROWTH_MULTIPLIERS), months=FORECAST_MONTHS, start=None):
+    """Revenue forecast frames for several growth scenarios, computed together
+    
+    Returns {scenario: DataFrame} indexed by month end with a members column per country
+    plus total_members, membership_revenue, event_revenue and total_revenue.
+    """
+    rates = growth_rates(growth_targets, [SCENARIO_GROWTH_MULTIPLIERS[scenario] for scenario in scenarios])
+    start_members = [float(starting_members.get(country, 0)) for country in COUNTRIES]
+    members = project_members(start_members, rates, months)
+    total_members, membership_revenue, event_revenue = project_revenue(
+        members, annual_fee, event_fee, num_events
+    )
+    index = forecast_months(months, start)
+    
+    frames = {}
+    for position, scenario in enumerate(scenarios):
+        frame = pd.DataFrame(
+            {f'{country}_members': members[position, column] for column, country in enumerate(COUNTRIES)},
+            index=index
+        )
+        frame['total_members'] = total_members[position]
+        frame['membership_revenue'] = membership_revenue[position]
+        frame['event_revenue'] = event_revenue[position]
+        frame['total_revenue'] = membership_revenue[position] + event_revenue[position]
+        frames[scenario] = frame
+    return frames
+
+def tidy_forecast(frames):
+    """Stack per-scenario forecast frames into one long frame with scenario and month columns"""
+    return pd.concat(frames, names=['scenario', 'month']).reset_index()
@@ -0,0 +1,378 @@
+import time
+import pandas as pd
+from sqlalchemy import text
+from utils.database import get_sqlalchemy_engine
+from utils.dialects import affected_rows, bulk_insert
+from utils.config import load_import_config
+from utils.validation import (
+    new_validation_report,
+    validate_chunk,
+    report_is_valid,
+    report_errors,
+    summarize_report
+)
+from utils.rollups import refresh_member_rollup, refresh_transaction_rollup
+from utils.cache import invalidate_metrics
+from utils.telemetry import observed, record_fallback
+
+# Columns written to each table, in COPY order
+TABLE_COLUMNS = {
+    'members': ['name', 'email', 'country', 'join_date', 'membership_type', 'active'],
+    'transactions': ['member_id', 'amount', 'transaction_type', 'transaction_date'],
+    'events': ['name', 'date', 'country', 'revenue', 'costs']
+}
+
+# Columns of the staging tables; transactions keep the member email until the merge resolves it
+STAGING_COLUMNS = {
+    **TABLE_COLUMNS,
+    'transactions': ['member_email', 'amount', 'transaction_type', 'transaction_date']
+}
+
+# Natural keys (in staging columns) used to match imported rows to existing rows in upsert mode
+MERGE_KEYS = {
+    'members': ['email'],
+    'transactions': ['member_email', 'amount', 'transaction_type', 'transaction_date'],
+    'events': ['name', 'date', 'country']
+}
+
+IMPORT_MODES = ['append', 'upsert']
+
+# Date column driving the rollup refresh for each table
+ROLLUP_DATE_COLUMNS = {
+    'members': 'join_date',
+    'transactions': 'transaction_date'
+}
+
+def iter_chunks(source, chunk_size):
+    """Yield DataFrame chunks from a CSV path/file object or an in-memory DataFrame"""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_size):
+            yield source.iloc[start:start + chunk_size].copy()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_size)
+
+def count_csv_rows(file):
+    """Count the data rows of a seekable CSV file object and rewind it"""
+    position = file.tell()
+    rows = sum(1 for _ in file) - 1  # Header line
+    file.seek(position)
+    return max(rows, 0)
+
+def prepare_chunk(table_name, chunk):
+    """Normalize a validated chunk into the staging columns"""
+    if table_name == 'members':
+        chunk['join_date'] = pd.to_datetime(chunk['join_date']).dt.date
+        if 'active' not in chunk.columns:
+            chunk['active'] = True
+    
+    elif table_name == 'transactions':
+        chunk['transaction_date'] = pd.to_datetime(chunk['transaction_date']).dt.date
+    
+    elif table_name == 'events':
+        chunk['date'] = pd.to_datetime(chunk['date']).dt.date
+    
+    return chunk[STAGING_COLUMNS[table_name]]
+
+def copy_rows(conn, table_name, frame):
+    """Bulk load rows with the backend's fastest path (COPY on PostgreSQL)"""
+    if frame.empty:
+        return
+    bulk_insert(conn, table_name, frame)
+
+def create_staging_table(conn, table_name):
+    """Create an empty temp table shaped like the staged columns plus the source row number"""
+    staging_table = f"staging_{table_name}"
+    columns = ', '.join(
+        "CAST(NULL AS VARCHAR(100)) as member_email" if column == 'member_email' else column
+        for column in STAGING_COLUMNS[table_name]
+    )
+    conn.execute(text(f"DROP TABLE IF EXISTS {staging_table}"))
+    conn.execute(text(f"""
+        CREATE TEMPORARY TABLE {staging_table} AS
+        SELECT CAST(NULL AS BIGINT) as import_row, {columns}
+        FROM {table_name}
+        WHERE 1 = 0
+    """))
+    return staging_table
+
+def unmatched_member_emails(conn, staging_table, limit):
+    """Report staged transaction emails without a member (capped) and the rows they cover"""
+    unmatched_filter = f"""
+        FROM {staging_table} staged
+        WHERE NOT EXISTS (SELECT 1 FROM members m WHERE m.email = staged.member_email)
+    """
+    unmatched = pd.read_sql(text(f"""
+        SELECT staged.member_email, COUNT(*) as row_count
+        {unmatched_filter}
+        GROUP BY staged.member_email
+        ORDER BY row_count DESC, staged.member_email
+        LIMIT :limit
+    """), conn, params={"limit": limit})
+    unmatched_rows = conn.execute(text(f"SELECT COUNT(*) {unmatched_filter}")).scalar()
+    return unmatched, unmatched_rows
+
+def merge_staging(conn, table_name, staging_table, batch_id, mode='upsert'):
+    """Move the staged rows into the target with set-based statements
+    
+    In upsert mode repeated keys within the import keep their last row and rows already
+    present are updated or skipped; transactions, which have no natural key, insert only
+    the copies of a row beyond those already present. Inserted and updated rows are
+    tagged with batch_id.
+    Returns inserted/updated/skipped counts.
+    """
+    columns = TABLE_COLUMNS[table_name]
+    keys = MERGE_KEYS[table_name]
+    values = [column for column in columns if column not in keys]
+    column_list = ', '.join(columns)
+    insert_list = f"{column_list}, import_batch_id"
+    select_list = f"{column_list}, CAST(:batch_id AS INTEGER)"
+    key_match = ' AND '.join(f"target.{key} = staged.{key}" for key in keys)
+    changed = ' OR '.join(f"target.{column} IS DISTINCT FROM staged.{column}" for column in values)
+    latest_rows = f"""
+        SELECT MAX(import_row) FROM {staging_table} GROUP BY {', '.join(keys)}
+    """
+    
+    staged = conn.execute(text(f"SELECT COUNT(*) FROM {staging_table}")).scalar()
+    
+    if table_name == 'transactions':
+        # Resolve emails with one join against the indexed members.email
+        source = f"""
+            SELECT staged.import_row, m.id as member_id, staged.amount,
+                   staged.transaction_type, staged.transaction_date
+            FROM {staging_table} staged
+            JOIN members m ON m.email = staged.member_email
+        """
+        if mode == 'upsert':
+            # Transactions are immutable and identical rows can be separate payments, so
+            # they match as a multiset: only copies beyond the identical rows already
+            # present are inserted, and re-running an import inserts nothing
+            source = f"""
+                SELECT * FROM (
+                    SELECT resolved.*, ROW_NUMBER() OVER (
+                        PARTITION BY member_id, amount, transaction_type, transaction_date
+                        ORDER BY import_row
+                    ) as occurrence
+                    FROM ({source}) resolved
+                ) numbered
+                WHERE numbered.occurrence > (
+                    SELECT COUNT(*) FROM transactions target
+                    WHERE target.member_id = numbered.member_id
+                    AND target.amount = numbered.amount
+                    AND target.transaction_type = numbered.transaction_type
+                    AND target.transaction_date = numbered.transaction_date
+                )
+            """
+        updated = 0
+        inserted = affected_rows(conn.execute(text(f"""
+            INSERT INTO transactions ({insert_list})
+            SELECT {select_list} FROM ({source}) resolved
+        """), {"batch_id": batch_id}))
+    
+    elif mode == 'append':
+        updated = 0
+        inserted = affected_rows(conn.execute(text(f"""
+            INSERT INTO {table_name} ({insert_list})
+            SELECT {select_list} FROM {staging_table}
+        """), {"batch_id": batch_id}))
+    
+    elif table_name == 'members':
+        # Single upsert keyed on the unique email
+        existing, to_update = conn.execute(text(f"""
+            SELECT COUNT(target.id), COUNT(target.id) FILTER (WHERE {changed})
+            FROM {staging_table} staged
+            LEFT JOIN members target ON {key_match}
+            WHERE staged.import_row IN ({latest_rows})
+        """)).one()
+        unique_rows = conn.execute(text(f"SELECT COUNT(DISTINCT email) FROM {staging_table}")).scalar()
+        
+        conn.execute(text(f"""
+            INSERT INTO members ({insert_list})
+            SELECT {select_list} FROM {staging_table}
+            WHERE import_row IN ({latest_rows})
+            ON CONFLICT (email) DO UPDATE SET
+                {', '.join(f"{column} = EXCLUDED.{column}" for column in values + ['import_batch_id'])}
+            WHERE {' OR '.join(f"members.{column} IS DISTINCT FROM EXCLUDED.{column}" for column in values)}
+        """), {"batch_id": batch_id})
+        inserted = unique_rows - existing
+        updated = to_update
+    
+    else:
+        # Events have no unique constraint: update changed events, then add the new ones
+        updated = affected_rows(conn.execute(text(f"""
+            UPDATE events AS target
+            SET {', '.join(f"{column} = staged.{column}" for column in values)},
+                import_batch_id = :batch_id
+            FROM {staging_table} staged
+            WHERE {key_match}
+            AND staged.import_row IN ({latest_rows})
+            AND ({changed})
+        """), {"batch_id": batch_id}))
+        inserted = affected_rows(conn.execute(text(f"""
+            INSERT INTO events ({insert_list})
+            SELECT {select_list} FROM {staging_table} staged
+            WHERE staged.import_row IN ({latest_rows})
+            AND NOT EXISTS (SELECT 1 FROM events target WHERE {key_match})
+        """), {"batch_id": batch_id}))
+    
+    return {
+        'inserted': inserted,
+        'updated': updated,
+        'skipped': staged - inserted - updated
+    }
+
+def validate_source(table_name, source, chunk_size=None, max_errors=None):
+    """Validate a whole CSV (or DataFrame) chunk by chunk without loading it
+    
+    Returns the validation report; see utils.validation for its helpers.
+    """
+    config = load_import_config()
+    report = new_validation_report(max_errors or config['max_errors'])
+    for chunk in iter_chunks(source, chunk_size or config['chunk_size']):
+        validate_chunk(table_name, chunk, report)
+    return report
+
+@observed
+def stream_import(table_name, source, chunk_size=None, progress_callback=None, total_rows=None,
+                  mode='append'):
+    """Validate and load a CSV (or DataFrame) chunk by chunk in a single transaction
+    
+    mode 'append' loads rows straight into the table; 'upsert' loads them into a staging
+    table and merges them on the table's natural key so re-running an import is safe.
+    Validation continues through the whole file after the first error so every error is
+    reported at once; nothing is committed unless all chunks are valid.
+    progress_callback receives a dict per chunk with rows processed so far and chunk throughput.
+    Imported rows are tagged with a new import_batches id so they can be checked incrementally.
+    Returns a summary with success flag, row counts, batch id, per-chunk timings, the capped
+    error table and any error message.
+    """
+    config = load_import_config()
+    chunk_size = chunk_size or config['chunk_size']
+    engine = get_sqlalchemy_engine()
+    report = new_validation_report(config['max_errors'])
+    summary = {
+        'success': False,
+        'rows_read': 0,
+        'rows_imported': 0,
+        'inserted': 0,
+        'updated': 0,
+        'skipped': 0,
+        'unmatched_emails': pd.DataFrame(columns=['member_email', 'row_count']),
+        'unmatched_rows': 0,
+        'import_batch_id': None,
+        'chunks': [],
+        'validation_errors': report_errors(report),
+        'error': None,
+        'elapsed': 0.0
+    }
+    started = time.perf_counter()
+    date_range = [None, None]
+    
+    try:
+        if mode not in IMPORT_MODES:
+            raise ValueError(f"Unknown import mode: {mode}")
+        
+        with engine.begin() as conn:
+            batch_id = conn.execute(
+                text("INSERT INTO import_batches (table_name, mode) VALUES (:table_name, :mode) RETURNING id"),
+                {"table_name": table_name, "mode": mode}
+            ).scalar()
+            
+            # Transactions always stage so member emails are resolved with a join
+            use_staging = mode == 'upsert' or table_name == 'transactions'
+            staging_table = create_staging_table(conn, table_name) if use_staging else None
+            
+            for number, chunk in enumerate(iter_chunks(source, chunk_size), start=1):
+                chunk_started = time.perf_counter()
+                rows_read = len(chunk)
+                
+                # Once any chunk fails, only keep validating so the report is complete
+                if validate_chunk(table_name, chunk, report) and report_is_valid(report):
+                    chunk = prepare_chunk(table_name, chunk)
+                    if staging_table:
+                        copy_rows(conn, staging_table, chunk.assign(import_row=chunk.index)[
+                            ['import_row'] + STAGING_COLUMNS[table_name]
+                        ])
+                    else:
+                        copy_rows(conn, table_name, chunk.assign(import_batch_id=batch_id))
+                else:
+                    chunk = chunk.iloc[0:0]
+                
+                date_column = ROLLUP_DATE_COLUMNS.get(table_name)
+                if date_column and not chunk.empty:
+                    chunk_min, chunk_max = chunk[date_column].min(), chunk[date_column].max()
+                    date_range[0] = chunk_min if date_range[0] is None else min(date_range[0], chunk_min)
+                    date_range[1] = chunk_max if date_range[1] is None else max(date_range[1], chunk_max)
+                
+                seconds = time.perf_counter() - chunk_started
+                summary['rows_read'] += rows_read
+                summary['rows_imported'] += len(chunk)
+                chunk_stats = {
+                    'chunk': number,
+                    'rows': len(chunk),
+                    'seconds': seconds,
+                    'rows_per_second': len(chunk) / seconds if seconds > 0 else 0.0,
+                    'rows_done': summary['rows_read'],
+                    'total_rows': total_rows
+                }
+                summary['chunks'].append(chunk_stats)
+                if progress_callback:
+                    progress_callback(chunk_stats)
+            
+            if report['rows_checked'] == 0 or not report_is_valid(report):
+                summary['validation_errors'] = report_errors(report)
+                raise ValueError(summarize_report(report, table_name))
+            
+            if staging_table:
+                if table_name == 'members':
+                    # Updated members leave their previous join month in the rollups too
+                    previous_range = conn.execute(text(f"""
+                        SELECT MIN(m.join_date), MAX(m.join_date)
+                        FROM members m
+                        JOIN {staging_table} staged ON staged.email = m.email
+                    """)).one()
+                
+                if table_name == 'transactions':
+                    summary['unmatched_emails'], summary['unmatched_rows'] = unmatched_member_emails(
+                        conn, staging_table, config['max_errors']
+                    )
+                
+                summary.update(merge_staging(conn, table_name, staging_table, batch_id, mode))
+                summary['skipped'] += summary['rows_read'] - summary['rows_imported']
+                summary['rows_imported'] = summary['inserted'] + summary['updated']
+                conn.execute(text(f"DROP TABLE {staging_table}"))
+                
+                if table_name == 'members' and summary['updated'] and previous_range[0] is not None:
+                    previous_start, previous_end = pd.to_datetime(list(previous_range)).date
+                    date_range[0] = min(date_range[0], previous_start)
+                    date_range[1] = max(date_range[1], previous_end)
+                    # Country or membership type changes move transactions between rollup groups
+                    refresh_transaction_rollup(conn)
+            else:
+                summary['inserted'] = summary['rows_imported']
+                summary['skipped'] = summary['rows_read'] - summary['rows_imported']
+            
+            conn.execute(
+                text("""
+                    UPDATE import_batches
+                    SET finished_at = CURRENT_TIMESTAMP, rows_imported = :rows_imported
+                    WHERE id = :batch_id
+                """),
+                {"rows_imported": summary['inserted'] + summary['updated'], "batch_id": batch_id}
+            )
+            
+            if table_name == 'members' and date_range[0] is not None:
+                refresh_member_rollup(conn, *date_range)
+            elif table_name == 'transactions' and date_range[0] is not None:
+                refresh_transaction_rollup(conn, *date_range)
+        
+        invalidate_metrics(table_name)
+        summary['import_batch_id'] = batch_id
+        summary['success'] = True
+    
+    except Exception as e:
+        record_fallback("Error importing data", e)
+        summary['error'] = str(e)
+        summary.update(rows_imported=0, inserted=0, updated=0, skipped=0)  # Rolled back
+    
+    summary['elapsed'] = time.perf_counter() - started
+    return summary
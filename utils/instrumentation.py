@@ -0,0 +1,179 @@
+import contextlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from sqlalchemy import event
+from utils.config import load_instrumentation_config
+from utils.telemetry import record_rows
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Shared helpers that run queries on behalf of the function worth reporting
+PASS_THROUGH_FUNCTIONS = {'get_db_data'}
+
+# The page render the current thread (or copied context) is executing, if any
+_current_render = ContextVar('current_render', default=None)
+
+_renders = deque(maxlen=load_instrumentation_config()['render_history'])
+_totals = {}
+_lock = threading.Lock()
+
+def fingerprint_sql(statement):
+    """Normalize a statement so executions differing only in literals group together"""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', statement)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", '?', sql)
+    sql = re.sub(r"\s+", ' ', sql).strip()
+    return re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", '(?)', sql)  # Collapse IN lists
+
+def find_caller():
+    """Get module.function of the innermost repo function that issued the query"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if (filename.startswith(REPO_ROOT) and filename != os.path.abspath(__file__)
+                and frame.f_code.co_name not in PASS_THROUGH_FUNCTIONS):
+            return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'unknown'
+
+def new_stats(sql):
+    return {'sql': sql, 'count': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0, 'callers': set()}
+
+def add_rows(total, rows):
+    """Add a row count to a total; unknown counts (None) make the total unknown"""
+    return None if total is None or rows is None else total + rows
+
+def sum_rows(records):
+    """Total rows of query records, None when a driver did not report any of them"""
+    total = 0
+    for record in records:
+        total = add_rows(total, record['rows'])
+    return total
+
+def add_to_stats(stats, record):
+    stats['count'] += 1
+    stats['seconds'] += record['seconds']
+    stats['max_seconds'] = max(stats['max_seconds'], record['seconds'])
+    stats['rows'] = add_rows(stats['rows'], record['rows'])
+    stats['callers'].add(record['caller'])
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info['query_started'].pop()
+    # Drivers without row counts for SELECTs (SQLite, DuckDB) report -1: not measured
+    if cursor.description is None:
+        rows = 0
+    else:
+        rows = cursor.rowcount if cursor.rowcount >= 0 else None
+    if rows is not None:
+        record_rows(rows)
+    if not load_instrumentation_config()['enabled']:
+        return
+    
+    record = {
+        'fingerprint': fingerprint_sql(statement),
+        'seconds': seconds,
+        'rows': rows,
+        'caller': find_caller()
+    }
+    
+    render = _current_render.get()
+    if render is not None:
+        render['queries'].append(record)
+    
+    with _lock:
+        stats = _totals.setdefault(record['fingerprint'], new_stats(record['fingerprint']))
+        add_to_stats(stats, record)
+
+def handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_started'):
+        connection.info['query_started'].pop()
+
+def install_instrumentation(engine):
+    """Time every statement executed on the engine"""
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+    event.listen(engine, 'handle_error', handle_error)
+
+def summarize_queries(queries):
+    """Aggregate query records per fingerprint, slowest total first"""
+    grouped = {}
+    for record in queries:
+        add_to_stats(grouped.setdefault(record['fingerprint'], new_stats(record['fingerprint'])), record)
+    
+    repeat_threshold = load_instrumentation_config()['repeat_threshold']
+    summary = [
+        {**stats, 'callers': sorted(stats['callers']), 'repeated': stats['count'] >= repeat_threshold}
+        for stats in grouped.values()
+    ]
+    return sorted(summary, key=lambda stats: stats['seconds'], reverse=True)
+
+def summarize_render(render):
+    """Condense a finished render into totals plus per-fingerprint statistics"""
+    queries = render['queries']
+    return {
+        'page': render['page'],
+        'started_at': render['started_at'],
+        'seconds': render['seconds'],
+        'query_count': len(queries),
+        'query_seconds': sum(record['seconds'] for record in queries),
+        'rows': sum_rows(queries),
+        'fingerprints': summarize_queries(queries)
+    }
+
+@contextlib.contextmanager
+def render_scope(page):
+    """Collect the queries issued while rendering a page (or any other unit of work)
+    
+    Queries are attributed through a context variable, so concurrent Streamlit sessions
+    each get their own render. The summary is kept in the recent render history.
+    """
+    render = {
+        'page': page,
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'seconds': 0.0,
+        'queries': []
+    }
+    token = _current_render.set(render)
+    started = time.perf_counter()
+    try:
+        yield render
+    finally:
+        render['seconds'] = time.perf_counter() - started
+        _current_render.reset(token)
+        with _lock:
+            _renders.append(summarize_render(render))
+
+def get_recent_renders():
+    """Get summaries of the most recent renders, newest first"""
+    with _lock:
+        return list(reversed(_renders))
+
+def get_query_totals():
+    """Get process-wide statistics per query fingerprint, slowest total first"""
+    with _lock:
+        totals = [{**stats, 'callers': sorted(stats['callers'])} for stats in _totals.values()]
+    return sorted(totals, key=lambda stats: stats['seconds'], reverse=True)
+
+def export_json():
+    """Export recent renders and process-wide totals as a JSON document"""
+    return json.dumps({
+        'exported_at': datetime.now().isoformat(timespec='seconds'),
+        'renders': get_recent_renders(),
+        'totals': get_query_totals()
+    }, indent=2)
+
+def reset_instrumentation():
+    """Forget the recorded renders and totals"""
+    with _lock:
+        _renders.clear()
+        _totals.clear()
@@ -1,10 +1,23 @@
+import logging
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
 from datetime import datetime, timedelta
 from utils.database import get_db_data
-from utils.config import load_config
+from utils.config import load_config, load_training_config
+from utils.model_registry import get_or_fit_model
+from utils.training import run_training_jobs
+from utils.telemetry import observed, record_fallback, log_event
+
+# Hyperparameters shared by every forecasting model (part of the model fingerprint)
+MODEL_PARAMS = {'n_estimators': 100, 'random_state': 42}
+
+def fit_random_forest(X, y):
+    """Fit a random forest with the shared forecasting hyperparameters"""
+    model = RandomForestRegressor(**MODEL_PARAMS, n_jobs=load_training_config()['model_n_jobs'])
+    model.fit(X, y)
+    return model
 
 def validate_data_requirements(data, min_rows=6, required_columns=None):
     """Validate if data meets minimum requirements for ML training"""
@@ -37,7 +50,7 @@ def get_default_predictions(forecast_months=12, trend='neutral'):
     }
     
     growth_rate = growth_rates[trend]
-    future_dates = pd.date_range(start=datetime.now(), periods=forecast_months, freq='M')
+    future_dates = pd.date_range(start=datetime.now(), periods=forecast_months, freq='ME')
     
     predictions = {}
     for country in base_members:
@@ -46,34 +59,78 @@ def get_default_predictions(forecast_months=12, trend='neutral'):
     
     return predictions, future_dates
 
+def build_windows(values, lookback):
+    """Flatten every lookback window of a 2D feature array, one row per target"""
+    # (n - lookback + 1, features, lookback) view; the last window has no target
+    windows = np.lib.stride_tricks.sliding_window_view(values, lookback, axis=0)[:-1]
+    return windows.transpose(0, 2, 1).reshape(len(windows), -1)
+
 def prepare_time_series_data(data, feature_columns, target_column, lookback=3):
     """Prepare time series data for ML model with validation"""
     if len(data) <= lookback:
         return None, None, "Insufficient data for time series preparation"
     
     try:
-        X, y = [], []
-        for i in range(len(data) - lookback):
-            feature_sequence = data[feature_columns].iloc[i:(i + lookback)].values.flatten()
-            target_value = data[target_column].iloc[i + lookback]
-            X.append(feature_sequence)
-            y.append(target_value)
-        return np.array(X), np.array(y), None
+        X = build_windows(data[feature_columns].to_numpy(), lookback)
+        y = data[target_column].to_numpy()[lookback:]
+        return X, y, None
     except Exception as e:
         return None, None, f"Error preparing time series data: {str(e)}"
 
+def prepare_grouped_time_series_data(data, group_column, feature_columns, target_column, lookback=3):
+    """Prepare time series windows for every series in a long-format frame in one pass"""
+    codes, groups = pd.factorize(data[group_column], sort=False)
+    order = np.argsort(codes, kind='stable')  # Keep row order within each series
+    codes = codes[order]
+    values = data[feature_columns].to_numpy()[order]
+    targets = data[target_column].to_numpy()[order]
+    
+    series = {}
+    errors = {}
+    if len(data) <= lookback:
+        return series, {group: "Insufficient data for time series preparation" for group in groups}
+    
+    X = build_windows(values, lookback)
+    window_codes = codes[:-lookback]
+    # Rows are grouped, so a window belongs to one series when its first row and target do
+    valid = window_codes == codes[lookback:]
+    
+    for code, group in enumerate(groups):
+        mask = valid & (window_codes == code)
+        if not mask.any():
+            errors[group] = "Insufficient data for time series preparation"
+            continue
+        series[group] = (X[mask], targets[lookback:][mask])
+    
+    return series, errors
+
+def forecast_country_members(country, X, y, future_dates, feature_count):
+    """Fit (or reuse) one country's growth model and roll it forward over the future dates"""
+    # Train model (reused while the country's history is unchanged)
+    model = get_or_fit_model(
+        f"member_growth_{country.lower()}", [X, y], MODEL_PARAMS,
+        lambda: fit_random_forest(X, y)
+    )
+    
+    # Slide the lookback window forward, carrying the last known new member count
+    future_features = []
+    latest_features = X[-1].reshape(-1, feature_count)
+    
+    for date in future_dates:
+        new_features = np.array([date.month, date.year, latest_features[-1][2]])
+        latest_features = np.vstack([latest_features[1:], new_features])
+        future_features.append(latest_features.flatten())
+    
+    return model.predict(np.array(future_features))
+
+@observed
 def predict_member_growth(historical_data=None, forecast_months=12):
     """Predict member growth using ML model with enhanced error handling"""
     try:
         if historical_data is None:
             query = """
-                SELECT 
-                    DATE_TRUNC('month', join_date) as month,
-                    country,
-                    COUNT(*) as new_members,
-                    COUNT(*) FILTER (WHERE active = TRUE) as active_members
-                FROM members
-                GROUP BY DATE_TRUNC('month', join_date), country
+                SELECT month, country, new_members, active_members
+                FROM monthly_member_rollup
                 ORDER BY month
             """
             historical_data = get_db_data(query)
@@ -86,7 +143,7 @@ def predict_member_growth(historical_data=None, forecast_months=12):
         )
         
         if not valid:
-            print(f"Warning: {message}")
+            record_fallback(message)
             return get_default_predictions(forecast_months)
         
         # Prepare features
@@ -100,124 +157,126 @@ def predict_member_growth(historical_data=None, forecast_months=12):
         future_dates = pd.date_range(
             start=pd.to_datetime(historical_data['month'].max()) + timedelta(days=32),
             periods=forecast_months,
-            freq='M'
+            freq='ME'
         )
         
+        # Build the training windows for every country in one call
+        series, errors = prepare_grouped_time_series_data(
+            historical_data, 'country', feature_columns, 'active_members', lookback
+        )
+        
+        # Train the per-country models concurrently
+        jobs = {}
         for country in ['Netherlands', 'Belgium', 'Germany']:
-            country_data = historical_data[historical_data['country'] == country].copy()
-            
-            valid, message = validate_data_requirements(country_data, min_rows=lookback + 1)
-            if not valid:
-                print(f"Warning for {country}: {message}")
+            if country not in series:
+                message = errors.get(country, "No data available")
+                log_event(logging.WARNING, message, country=country)
                 continue
             
-            X, y, error = prepare_time_series_data(
-                country_data, feature_columns, 'active_members', lookback
-            )
-            
-            if error:
-                print(f"Error for {country}: {error}")
-                continue
-            
-            # Train model
-            model = RandomForestRegressor(n_estimators=100, random_state=42)
-            model.fit(X, y)
-            
-            # Prepare forecast data
-            future_features = []
-            latest_features = X[-1].reshape(-1, len(feature_columns))
-            
-            for date in future_dates:
-                new_features = np.array([date.month, date.year, latest_features[-1][2]])
-                future_features.append(new_features)
-                latest_features = np.vstack([latest_features[1:], new_features])
-            
-            future_features = np.array(future_features)
-            predictions[country] = model.predict(future_features)
+            X, y = series[country]
+            jobs[country] = (forecast_country_members, (country, X, y, future_dates, len(feature_columns)))
+        
+        predictions, job_errors, timings = run_training_jobs(jobs)
+        for country, error in job_errors.items():
+            log_event(logging.ERROR, "Country model failed", country=country, error=error)
         
         if not predictions:
+            record_fallback("No country could be forecast")
             return get_default_predictions(forecast_months)
         
         return predictions, future_dates
         
     except Exception as e:
-        print(f"Error in member growth prediction: {str(e)}")
+        record_fallback("Error in member growth prediction", e)
         return get_default_predictions(forecast_months)
 
+CHURN_COLUMNS = ['id', 'join_date', 'transaction_count', 'avg_transaction', 'active']
+CHURN_FEATURES = ['membership_duration', 'transaction_count', 'avg_transaction']
+
+# Per-member aggregates; {where} optionally restricts the members read
+CHURN_DATA_QUERY = """
+    SELECT 
+        m.id,
+        m.join_date,
+        COUNT(t.id) as transaction_count,
+        AVG(t.amount) as avg_transaction,
+        m.active
+    FROM members m
+    LEFT JOIN transactions t ON m.id = t.member_id
+    {where}
+    GROUP BY m.id, m.join_date, m.active
+    ORDER BY m.id
+"""
+
+def prepare_churn_features(member_data):
+    """Build the churn feature matrix for a frame of per-member aggregates"""
+    membership_duration = (datetime.now() - pd.to_datetime(member_data['join_date'])).dt.days
+    return member_data.assign(membership_duration=membership_duration)[CHURN_FEATURES].fillna(0)
+
+def fit_churn_model(member_data):
+    """Fit (or reuse) the churn scaler and model on per-member aggregates"""
+    X = prepare_churn_features(member_data)
+    y = member_data['active']
+    
+    def fit():
+        scaler = StandardScaler()
+        return scaler, fit_random_forest(scaler.fit_transform(X), y)
+    
+    # Reused while member data is unchanged
+    return get_or_fit_model("churn", [member_data[CHURN_COLUMNS]], MODEL_PARAMS, fit)
+
+def score_churn(scaler, model, member_data):
+    """Score churn probabilities for a frame of per-member aggregates"""
+    return 1 - model.predict(scaler.transform(prepare_churn_features(member_data)))
+
+@observed
 def predict_churn_probability(member_data=None):
-    """Predict churn probability with enhanced error handling"""
+    """Predict churn probability with enhanced error handling
+    
+    Feature importance is attached once as result.attrs['feature_importance'].
+    """
     try:
         if member_data is None:
-            query = """
-                SELECT 
-                    m.id,
-                    m.join_date,
-                    COUNT(t.id) as transaction_count,
-                    AVG(t.amount) as avg_transaction,
-                    m.active
-                FROM members m
-                LEFT JOIN transactions t ON m.id = t.member_id
-                GROUP BY m.id
-            """
-            member_data = get_db_data(query)
+            member_data = get_db_data(CHURN_DATA_QUERY.format(where=""))
         
         # Validate data
         valid, message = validate_data_requirements(
             member_data,
             min_rows=10,
-            required_columns=['id', 'join_date', 'transaction_count', 'avg_transaction', 'active']
+            required_columns=CHURN_COLUMNS
         )
         
         if not valid:
-            print(f"Warning: {message}")
+            record_fallback(message)
             return None
         
-        # Feature engineering
-        member_data['membership_duration'] = (
-            datetime.now() - pd.to_datetime(member_data['join_date'])
-        ).dt.days
-        
-        # Prepare features
-        features = ['membership_duration', 'transaction_count', 'avg_transaction']
-        X = member_data[features].fillna(0)
-        y = member_data['active']
-        
-        # Scale features
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        
-        # Train model
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
-        model.fit(X_scaled, y)
-        
-        # Calculate feature importance
-        feature_importance = dict(zip(features, model.feature_importances_))
+        scaler, model = fit_churn_model(member_data)
         
         # Predict probabilities
-        churn_probabilities = 1 - model.predict(X_scaled)
-        
-        return pd.DataFrame({
+        result = pd.DataFrame({
             'member_id': member_data['id'],
-            'churn_probability': churn_probabilities,
-            'feature_importance': [feature_importance] * len(churn_probabilities)
+            'churn_probability': score_churn(scaler, model, member_data)
         })
+        result.attrs['feature_importance'] = dict(zip(CHURN_FEATURES, model.feature_importances_))
+        return result
         
     except Exception as e:
-        print(f"Error in churn prediction: {str(e)}")
+        record_fallback("Error in churn prediction", e)
         return None
 
+@observed
 def predict_revenue(historical_data=None, forecast_months=12):
     """Predict future revenue with enhanced error handling"""
     try:
         if historical_data is None:
             query = """
                 SELECT 
-                    DATE_TRUNC('month', transaction_date) as month,
-                    SUM(amount) as revenue,
-                    COUNT(DISTINCT member_id) as active_members,
-                    COUNT(*) as transaction_count
-                FROM transactions
-                GROUP BY DATE_TRUNC('month', transaction_date)
+                    month,
+                    SUM(revenue - expenses) as revenue,
+                    SUM(active_members) as active_members,
+                    SUM(transaction_count) as transaction_count
+                FROM monthly_transaction_rollup
+                GROUP BY month
                 ORDER BY month
             """
             historical_data = get_db_data(query)
@@ -230,7 +289,7 @@ def predict_revenue(historical_data=None, forecast_months=12):
         )
         
         if not valid:
-            print(f"Warning: {message}")
+            record_fallback(message)
             default_predictions, future_dates = get_default_predictions(forecast_months)
             total_members = sum(default_predictions.values())
             config = load_config()
@@ -249,21 +308,22 @@ def predict_revenue(historical_data=None, forecast_months=12):
         )
         
         if error:
-            print(f"Warning: {error}")
+            record_fallback(error)
             default_predictions, future_dates = get_default_predictions(forecast_months)
             total_members = sum(default_predictions.values())
             config = load_config()
             return (total_members * config['annual_fee'] / 12), future_dates
         
-        # Train model
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
-        model.fit(X, y)
+        # Train model (reused while the revenue history is unchanged)
+        model = get_or_fit_model(
+            "revenue", [X, y], MODEL_PARAMS, lambda: fit_random_forest(X, y)
+        )
         
         # Prepare forecast data
         future_dates = pd.date_range(
             start=pd.to_datetime(historical_data['month'].max()) + timedelta(days=32),
             periods=forecast_months,
-            freq='M'
+            freq='ME'
         )
         
         future_features = []
@@ -276,8 +336,8 @@ def predict_revenue(historical_data=None, forecast_months=12):
                 latest_features[-1][2],  # Use last active_members
                 latest_features[-1][3]   # Use last transaction_count
             ])
-            future_features.append(new_features)
             latest_features = np.vstack([latest_features[1:], new_features])
+            future_features.append(latest_features.flatten())
         
         future_features = np.array(future_features)
         predictions = model.predict(future_features)
@@ -285,7 +345,7 @@ def predict_revenue(historical_data=None, forecast_months=12):
         return predictions, future_dates
         
     except Exception as e:
-        print(f"Error in revenue prediction: {str(e)}")
+        record_fallback("Error in revenue prediction", e)
         default_predictions, future_dates = get_default_predictions(forecast_months)
         total_members = sum(default_predictions.values())
         config = load_config()
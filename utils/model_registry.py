@@ -0,0 +1,106 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+import logging
+import joblib
+import numpy as np
+import pandas as pd
+from utils.config import load_model_registry_config
+from utils.telemetry import increment, log_event
+
+# Latest fitted model per name loaded in this process: name -> (fingerprint, model)
+_models = {}
+_registry_lock = threading.Lock()
+_stats = {'memory_hits': 0, 'disk_hits': 0, 'fits': 0}
+
+def fingerprint(name, data, params):
+    """Hash the training data and hyperparameters that determine a fitted model"""
+    digest = hashlib.sha256()
+    digest.update(name.encode())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    
+    for item in data:
+        if isinstance(item, (pd.DataFrame, pd.Series)):
+            labels = item.columns if isinstance(item, pd.DataFrame) else [item.name]
+            digest.update(','.join(map(str, labels)).encode())
+            digest.update(pd.util.hash_pandas_object(item, index=False).to_numpy().tobytes())
+        else:
+            array = np.ascontiguousarray(item)
+            digest.update(f"{array.dtype}{array.shape}".encode())
+            digest.update(array.tobytes())
+    
+    return digest.hexdigest()[:20]
+
+def model_path(directory, name, key):
+    return os.path.join(directory, f"{name}-{key}.joblib")
+
+def prune_models(directory, name, keep):
+    """Remove all but the most recent fitted versions of a model"""
+    paths = sorted(glob.glob(model_path(directory, name, '*')), key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def get_or_fit_model(name, data, params, fit):
+    """Return a fitted model for the data fingerprint, fitting and persisting it only when missing
+    
+    data: sequence of arrays/frames the model is trained on (only used for the fingerprint)
+    fit: zero-argument callable returning the fitted model (or a tuple such as scaler and model)
+    """
+    config = load_model_registry_config()
+    if not config['enabled']:
+        return fit()
+    
+    key = fingerprint(name, data, params)
+    with _registry_lock:
+        loaded = _models.get(name)
+        if loaded is not None and loaded[0] == key:
+            _stats['memory_hits'] += 1
+            return loaded[1]
+    
+    directory = config['directory']
+    path = model_path(directory, name, key)
+    
+    if os.path.exists(path):
+        try:
+            model = joblib.load(path)
+            with _registry_lock:
+                _models[name] = (key, model)
+                _stats['disk_hits'] += 1
+            return model
+        except Exception as e:
+            increment('club_model_registry_errors_total', {'model': name, 'operation': 'load'})
+            log_event(logging.WARNING, "Refitting model, could not load persisted model",
+                      model=name, error=str(e), error_type=type(e).__name__)
+    
+    model = fit()
+    with _registry_lock:
+        _models[name] = (key, model)
+        _stats['fits'] += 1
+    
+    try:
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(model, temp_path)
+        os.replace(temp_path, path)  # Atomic so concurrent readers never see partial files
+        prune_models(directory, name, config['keep_per_model'])
+    except Exception as e:
+        increment('club_model_registry_errors_total', {'model': name, 'operation': 'save'})
+        log_event(logging.WARNING, "Could not persist model",
+                  model=name, error=str(e), error_type=type(e).__name__)
+    
+    return model
+
+def get_registry_stats():
+    """Get model registry hit and fit counters"""
+    with _registry_lock:
+        return {**_stats, 'loaded_models': len(_models)}
+
+def clear_loaded_models():
+    """Forget models loaded in this process (persisted files are kept)"""
+    with _registry_lock:
+        _models.clear()
@@ -0,0 +1,139 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from utils.config import load_simulation_config
+from utils.forecast_kernel import COUNTRIES, growth_rates, project_members, project_revenue, forecast_months
+from utils.telemetry import observed
+
+# Sampled per simulated path; growth multipliers also per country. The ranges mirror the
+# pessimistic/optimistic multipliers of the fixed scenarios.
+DEFAULT_DISTRIBUTIONS = {
+    'growth_multiplier': {'distribution': 'triangular', 'low': 0.5, 'mode': 1.0, 'high': 1.5},
+    'monthly_churn': {'distribution': 'uniform', 'low': 0.0, 'high': 0.02},
+    'event_attendance': {'distribution': 'triangular', 'low': 0.6, 'mode': 0.9, 'high': 1.0},
+    'expense_multiplier': {'distribution': 'triangular', 'low': 0.9, 'mode': 1.0, 'high': 1.2}
+}
+
+PERCENTILES = (5, 50, 95)
+
+SIMULATED_METRICS = ['members', 'revenue', 'cumulative_cashflow']
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def sample(rng, spec, size):
+    """Draw values from a distribution spec like {'distribution': 'uniform', 'low': 0, 'high': 1}
+    
+    Normal and lognormal draws are clipped to the optional 'min' and 'max' of the spec.
+    """
+    kind = spec['distribution']
+    if kind == 'fixed':
+        return np.full(size, float(spec['value']))
+    if kind == 'uniform':
+        return rng.uniform(spec['low'], spec['high'], size)
+    if kind == 'triangular':
+        return rng.triangular(spec['low'], spec['mode'], spec['high'], size)
+    if kind == 'normal':
+        values = rng.normal(spec['mean'], spec['std'], size)
+    elif kind == 'lognormal':
+        values = rng.lognormal(spec['mean'], spec['sigma'], size)
+    else:
+        raise ValueError(f"Unknown distribution: {kind}")
+    return np.clip(values, spec.get('min', -np.inf), spec.get('max', np.inf))
+
+def triangular_between(low, high, mode):
+    """Triangular distribution spec over a range, peaking at mode (clipped into the range)"""
+    if low >= high:
+        return {'distribution': 'fixed', 'value': low}
+    return {'distribution': 'triangular', 'low': low, 'mode': min(max(mode, low), high), 'high': high}
+
+def simulate_chunk(seed, paths, inputs, distributions):
+    """Simulate a batch of paths and return (paths, months) arrays per metric
+    
+    Module-level so process pools can run it.
+    """
+    rng = np.random.default_rng(seed)
+    growth = sample(rng, distributions['growth_multiplier'], (paths, len(COUNTRIES)))
+    churn = sample(rng, distributions['monthly_churn'], paths)
+    attendance = sample(rng, distributions['event_attendance'], paths)
+    expense_multiplier = sample(rng, distributions['expense_multiplier'], paths)
+    
+    rates = growth_rates(inputs['growth_targets'], [1.0]) * growth
+    members = project_members(inputs['starting_members'], rates, inputs['months'], churn)
+    total_members, membership_revenue, event_revenue = project_revenue(
+        members, inputs['annual_fee'], inputs['event_fee'] * attendance, inputs['num_events']
+    )
+    revenue = membership_revenue + event_revenue
+    
+    # Same cash flow as calculate_cashflow: yearly expenses spread evenly over the months
+    monthly_expenses = inputs['yearly_expenses'] * expense_multiplier / 12
+    return {
+        'members': total_members,
+        'revenue': revenue,
+        'cumulative_cashflow': np.cumsum(revenue - monthly_expenses[:, None], axis=1)
+    }
+
+def get_simulation_pool():
+    """Return the shared process pool for simulation chunks, creating it on first use
+    
+    Starting worker processes costs more than simulating tens of thousands of paths, so
+    the pool outlives a single call (e.g. a slider move).
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=load_simulation_config()['max_workers'])
+    return _pool
+
+def percentile_bands(values, index):
+    """P5/P50/P95 over the paths for every month"""
+    bands = np.percentile(values, PERCENTILES, axis=0)
+    return pd.DataFrame({f'p{percentile}': band for percentile, band in zip(PERCENTILES, bands)}, index=index)
+
+@observed
+def simulate_forecast(state, growth_targets, annual_fee, event_fee, num_events, yearly_expenses,
+                      months=12, paths=None, distributions=None, seed=None, chunk_size=None, executor=None):
+    """Monte Carlo forecast of members, revenue and cumulative cash flow from a ClubState
+    
+    Paths are simulated in chunks of chunk_size so the (paths, countries, months)
+    intermediates stay bounded; with executor='process' the chunks run across processes.
+    Every chunk gets its own child seed, so a seed and chunk size give the same bands
+    inline or across processes, and slider changes are compared on the same random draws.
+    Returns {metric: DataFrame of p5/p50/p95 per month} plus 'paths' and 'seconds'.
+    """
+    config = load_simulation_config()
+    paths = paths or config['paths']
+    chunk_size = chunk_size or config['chunk_size']
+    executor = executor or config['executor']
+    distributions = {**DEFAULT_DISTRIBUTIONS, **(distributions or {})}
+    started = time.perf_counter()
+    
+    inputs = {
+        'starting_members': state.starting_members,
+        'growth_targets': growth_targets,
+        'annual_fee': annual_fee,
+        'event_fee': event_fee,
+        'num_events': num_events,
+        'yearly_expenses': yearly_expenses,
+        'months': months
+    }
+    sizes = [min(chunk_size, paths - offset) for offset in range(0, paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed if seed is not None else config['seed']).spawn(len(sizes))
+    
+    if executor == 'process' and len(sizes) > 1:
+        pool = get_simulation_pool()
+        chunks = list(pool.map(simulate_chunk, seeds, sizes, [inputs] * len(sizes), [distributions] * len(sizes)))
+    else:
+        chunks = [simulate_chunk(chunk_seed, size, inputs, distributions) for chunk_seed, size in zip(seeds, sizes)]
+    
+    index = forecast_months(months)
+    result = {
+        metric: percentile_bands(np.concatenate([chunk[metric] for chunk in chunks]), index)
+        for metric in SIMULATED_METRICS
+    }
+    result['paths'] = paths
+    result['seconds'] = time.perf_counter() - started
+    return result
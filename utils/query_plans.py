@@ -0,0 +1,126 @@
+import json
+import logging
+from datetime import date, timedelta
+import pandas as pd
+from sqlalchemy import text
+from utils.database import get_sqlalchemy_engine
+from utils.telemetry import log_event, observed, record_fallback
+
+# Hot dashboard queries with representative parameters
+CANNED_QUERIES = {
+    'calculate_monthly_revenue': ("""
+        SELECT COALESCE(SUM(revenue - expenses), 0)
+        FROM monthly_transaction_rollup
+        WHERE month >= DATE_TRUNC('month', CURRENT_DATE)
+    """, {}),
+    'refresh_transaction_rollup': ("""
+        SELECT
+            CAST(DATE_TRUNC('month', t.transaction_date) AS DATE) as month,
+            COALESCE(m.country, 'Unknown') as country,
+            COALESCE(m.membership_type, 'Unknown') as membership_type,
+            COALESCE(SUM(t.amount) FILTER (WHERE t.amount > 0), 0) as revenue,
+            COUNT(DISTINCT t.member_id) as active_members
+        FROM transactions t
+        LEFT JOIN members m ON m.id = t.member_id
+        WHERE t.transaction_date >= :start AND t.transaction_date < :end
+        GROUP BY 1, 2, 3
+    """, {"start": date.today().replace(day=1), "end": date.today() + timedelta(days=31)}),
+    'refresh_member_rollup': ("""
+        SELECT
+            CAST(DATE_TRUNC('month', join_date) AS DATE) as month,
+            country,
+            COUNT(*) as new_members,
+            COUNT(*) FILTER (WHERE active = TRUE) as active_members
+        FROM members
+        WHERE join_date >= :start AND join_date < :end
+        GROUP BY 1, 2
+    """, {"start": date.today().replace(day=1), "end": date.today() + timedelta(days=31)}),
+    'get_financial_summary': ("""
+        SELECT
+            DATE_TRUNC('month', transaction_date) as month,
+            transaction_type,
+            SUM(amount) as total_amount
+        FROM transactions
+        WHERE transaction_date BETWEEN :start_date AND :end_date
+        GROUP BY DATE_TRUNC('month', transaction_date), transaction_type
+        ORDER BY month, transaction_type
+    """, {"start_date": date.today() - timedelta(days=90), "end_date": date.today()}),
+    'get_members_by_country': ("""
+        SELECT id, name, email, join_date, membership_type
+        FROM members
+        WHERE country = :country AND active = TRUE
+        ORDER BY join_date DESC
+    """, {"country": "Netherlands"}),
+    'predict_churn_probability': ("""
+        SELECT
+            m.id,
+            m.join_date,
+            COUNT(t.id) as transaction_count,
+            AVG(t.amount) as avg_transaction,
+            m.active
+        FROM members m
+        LEFT JOIN transactions t ON m.id = t.member_id
+        GROUP BY m.id, m.join_date, m.active
+    """, {}),
+}
+
+def explain_query(conn, query, params=None):
+    """Get the JSON query plan for a query without executing it"""
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {query}"), params or {}).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+def find_sequential_scans(plan):
+    """Walk a plan tree and collect the sequential scan nodes"""
+    scans = []
+    if plan.get('Node Type') == 'Seq Scan':
+        scans.append({
+            'relation': plan.get('Relation Name'),
+            'estimated_rows': plan.get('Plan Rows', 0),
+            'filter': plan.get('Filter')
+        })
+    for child in plan.get('Plans', []):
+        scans.extend(find_sequential_scans(child))
+    return scans
+
+@observed
+def check_query_plans(queries=None):
+    """EXPLAIN every canned query and report the ones doing sequential scans"""
+    queries = queries or CANNED_QUERIES
+    engine = get_sqlalchemy_engine()
+    results = []
+    
+    if engine.dialect.name != 'postgresql':
+        # The canned queries and the JSON plan format are PostgreSQL's
+        log_event(logging.WARNING, "Query plan checks need PostgreSQL", dialect=engine.dialect.name)
+        return pd.DataFrame(results)
+    
+    with engine.connect() as conn:
+        for name, (query, params) in queries.items():
+            try:
+                plan = explain_query(conn, query, params)
+                scans = find_sequential_scans(plan)
+                results.append({
+                    'query': name,
+                    'total_cost': plan.get('Total Cost', 0),
+                    'sequential_scans': ', '.join(scan['relation'] for scan in scans),
+                    'estimated_scan_rows': sum(scan['estimated_rows'] for scan in scans),
+                    'uses_indexes': not scans
+                })
+            except Exception as e:
+                record_fallback(f"Error explaining {name}", e)
+                results.append({
+                    'query': name,
+                    'total_cost': None,
+                    'sequential_scans': f"EXPLAIN failed: {str(e)}",
+                    'estimated_scan_rows': None,
+                    'uses_indexes': False
+                })
+    
+    return pd.DataFrame(results)
+
+if __name__ == "__main__":
+    # Small tables are legitimately scanned sequentially; look at estimated_scan_rows
+    report = check_query_plans()
+    print(report.to_string(index=False))
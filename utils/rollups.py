@@ -0,0 +1,214 @@
+import argparse
+import pandas as pd
+from sqlalchemy import text
+from utils.database import get_sqlalchemy_engine
+from utils.cache import invalidate_metrics
+from utils.dialects import advisory_lock, month_start, row_lock
+from utils.telemetry import observed, record_fallback
+
+# Arbitrary key for the advisory lock serializing rollup refreshes
+ROLLUP_LOCK_KEY = 7950002
+
+ROLLUP_TABLES = """
+    CREATE TABLE IF NOT EXISTS monthly_transaction_rollup (
+        month DATE NOT NULL,
+        country VARCHAR(50) NOT NULL,
+        membership_type VARCHAR(20) NOT NULL,
+        revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+        expenses DECIMAL(14,2) NOT NULL DEFAULT 0,
+        paying_members INTEGER NOT NULL DEFAULT 0,
+        active_members INTEGER NOT NULL DEFAULT 0,
+        transaction_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (month, country, membership_type)
+    )
+""", """
+    CREATE TABLE IF NOT EXISTS monthly_member_rollup (
+        month DATE NOT NULL,
+        country VARCHAR(50) NOT NULL,
+        new_members INTEGER NOT NULL DEFAULT 0,
+        active_members INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (month, country)
+    )
+"""
+
+def month_bounds(start_date, end_date=None):
+    """Get the first day of the start month and of the month after the end month"""
+    start = pd.Timestamp(start_date).to_period('M')
+    end = pd.Timestamp(end_date if end_date is not None else start_date).to_period('M')
+    return start.start_time.date(), (end + 1).start_time.date()
+
+def lock_rollups(conn, shared=False):
+    """Serialize full refreshes against each other and against single-row deltas
+    
+    Deltas take the lock shared, so single-row writers never wait on each other.
+    """
+    advisory_lock(conn, ROLLUP_LOCK_KEY, shared)
+
+def add_transaction_to_rollup(conn, transaction_id, member_id, amount, transaction_date):
+    """Add one newly inserted transaction to its month's rollup row
+    
+    The member row is locked so concurrent writes for the same member agree on whether
+    this is their first (paying) transaction of the month.
+    """
+    lock_rollups(conn, shared=True)
+    member = conn.execute(
+        text(f"SELECT country, membership_type FROM members WHERE id = :member_id {row_lock(conn)}"),
+        {"member_id": member_id}
+    ).first()
+    
+    start, end = month_bounds(transaction_date)
+    earlier = conn.execute(
+        text("""
+            SELECT 
+                COUNT(*) as transactions,
+                COUNT(*) FILTER (WHERE amount > 0) as payments
+            FROM transactions
+            WHERE member_id = :member_id
+            AND transaction_date >= :start AND transaction_date < :end
+            AND id <> :transaction_id
+        """),
+        {"member_id": member_id, "start": start, "end": end, "transaction_id": transaction_id}
+    ).first()
+    
+    # Transactions without a member count towards no member totals, as in COUNT(DISTINCT)
+    counted = member_id is not None
+    conn.execute(
+        text("""
+            INSERT INTO monthly_transaction_rollup
+                (month, country, membership_type, revenue, expenses,
+                 paying_members, active_members, transaction_count)
+            VALUES (:month, :country, :membership_type, :revenue, :expenses,
+                    :paying_members, :active_members, 1)
+            ON CONFLICT (month, country, membership_type) DO UPDATE SET
+                revenue = monthly_transaction_rollup.revenue + EXCLUDED.revenue,
+                expenses = monthly_transaction_rollup.expenses + EXCLUDED.expenses,
+                paying_members = monthly_transaction_rollup.paying_members + EXCLUDED.paying_members,
+                active_members = monthly_transaction_rollup.active_members + EXCLUDED.active_members,
+                transaction_count = monthly_transaction_rollup.transaction_count + EXCLUDED.transaction_count
+        """),
+        {
+            "month": start,
+            "country": member.country if member and member.country else 'Unknown',
+            "membership_type": member.membership_type if member and member.membership_type else 'Unknown',
+            "revenue": amount if amount > 0 else 0,
+            "expenses": -amount if amount < 0 else 0,
+            "paying_members": int(counted and amount > 0 and earlier.payments == 0),
+            "active_members": int(counted and earlier.transactions == 0)
+        }
+    )
+
+def add_members_to_rollup(conn, join_date, country, new_members, active_members):
+    """Add member count changes to the rollup row of a join month and country"""
+    lock_rollups(conn, shared=True)
+    conn.execute(
+        text("""
+            INSERT INTO monthly_member_rollup (month, country, new_members, active_members)
+            VALUES (:month, :country, :new_members, :active_members)
+            ON CONFLICT (month, country) DO UPDATE SET
+                new_members = monthly_member_rollup.new_members + EXCLUDED.new_members,
+                active_members = monthly_member_rollup.active_members + EXCLUDED.active_members
+        """),
+        {
+            "month": month_bounds(join_date)[0],
+            "country": country,
+            "new_members": new_members,
+            "active_members": active_members
+        }
+    )
+
+def refresh_transaction_rollup(conn, start_date=None, end_date=None):
+    """Recompute transaction rollup rows for the months spanned by the dates (all months when None)
+    
+    Meant for bulk imports and repairs; single-row writes use add_transaction_to_rollup.
+    """
+    lock_rollups(conn)
+    
+    if start_date is None:
+        params = {}
+        delete_filter = ""
+        source_filter = ""
+    else:
+        start, end = month_bounds(start_date, end_date)
+        params = {"start": start, "end": end}
+        delete_filter = "WHERE month >= :start AND month < :end"
+        source_filter = "WHERE t.transaction_date >= :start AND t.transaction_date < :end"
+    
+    conn.execute(text(f"DELETE FROM monthly_transaction_rollup {delete_filter}"), params)
+    conn.execute(text(f"""
+        INSERT INTO monthly_transaction_rollup
+            (month, country, membership_type, revenue, expenses,
+             paying_members, active_members, transaction_count)
+        SELECT 
+            {month_start('t.transaction_date', conn)} as month,
+            COALESCE(m.country, 'Unknown') as country,
+            COALESCE(m.membership_type, 'Unknown') as membership_type,
+            COALESCE(SUM(t.amount) FILTER (WHERE t.amount > 0), 0) as revenue,
+            COALESCE(SUM(ABS(t.amount)) FILTER (WHERE t.amount < 0), 0) as expenses,
+            COUNT(DISTINCT t.member_id) FILTER (WHERE t.amount > 0) as paying_members,
+            COUNT(DISTINCT t.member_id) as active_members,
+            COUNT(*) as transaction_count
+        FROM transactions t
+        LEFT JOIN members m ON m.id = t.member_id
+        {source_filter}
+        GROUP BY 1, 2, 3
+    """), params)
+
+def refresh_member_rollup(conn, start_date=None, end_date=None):
+    """Recompute member rollup rows for the join months spanned by the dates (all months when None)
+    
+    Meant for bulk imports and repairs; single-row writes use add_members_to_rollup.
+    """
+    lock_rollups(conn)
+    
+    if start_date is None:
+        params = {}
+        delete_filter = ""
+        source_filter = ""
+    else:
+        start, end = month_bounds(start_date, end_date)
+        params = {"start": start, "end": end}
+        delete_filter = "WHERE month >= :start AND month < :end"
+        source_filter = "WHERE join_date >= :start AND join_date < :end"
+    
+    conn.execute(text(f"DELETE FROM monthly_member_rollup {delete_filter}"), params)
+    conn.execute(text(f"""
+        INSERT INTO monthly_member_rollup (month, country, new_members, active_members)
+        SELECT 
+            {month_start('join_date', conn)} as month,
+            country,
+            COUNT(*) as new_members,
+            COUNT(*) FILTER (WHERE active = TRUE) as active_members
+        FROM members
+        {source_filter}
+        GROUP BY 1, 2
+    """), params)
+
+def rebuild_rollups_on(conn):
+    """Rebuild every rollup table from the raw tables on an open connection"""
+    refresh_member_rollup(conn)
+    refresh_transaction_rollup(conn)
+
+@observed
+def rebuild_rollups():
+    """Rebuild every rollup table from scratch, e.g. to repair drift"""
+    engine = get_sqlalchemy_engine()
+    try:
+        with engine.begin() as conn:
+            rebuild_rollups_on(conn)
+        invalidate_metrics()
+        return True
+    except Exception as e:
+        record_fallback("Error rebuilding rollups", e)
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the monthly rollup tables")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild all rollups from raw data")
+    args = parser.parse_args()
+    
+    if args.rebuild:
+        from utils.database import init_db
+        init_db()
+        print("Rollups rebuilt" if rebuild_rollups() else "Rollup rebuild failed")
+    else:
+        parser.print_help()
@@ -0,0 +1,208 @@
+import logging
+import threading
+from sqlalchemy import text, inspect
+from utils.database import get_sqlalchemy_engine
+from utils.dialects import advisory_lock, translate_ddl
+from utils.rollups import ROLLUP_TABLES, rebuild_rollups_on
+from utils.telemetry import increment, log_event
+
+# Ordered schema migrations: (version, description, statements)
+# A statement is either PostgreSQL text, translated for SQLite and DuckDB by
+# utils.dialects.translate_ddl, or a callable taking the open connection
+MIGRATIONS = [
+    (1, "Create members, transactions and events tables", [
+        """
+        CREATE TABLE IF NOT EXISTS members (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            email VARCHAR(100) UNIQUE NOT NULL,
+            country VARCHAR(50) NOT NULL,
+            join_date DATE NOT NULL,
+            membership_type VARCHAR(20) NOT NULL,
+            active BOOLEAN DEFAULT TRUE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS transactions (
+            id SERIAL PRIMARY KEY,
+            member_id INTEGER REFERENCES members(id),
+            amount DECIMAL(10,2) NOT NULL,
+            transaction_type VARCHAR(50) NOT NULL,
+            transaction_date DATE NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS events (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            date DATE NOT NULL,
+            country VARCHAR(50) NOT NULL,
+            revenue DECIMAL(10,2) NOT NULL,
+            costs DECIMAL(10,2) NOT NULL
+        )
+        """
+    ]),
+    (2, "Add indexes and constraints for dashboard aggregations", [
+        # Monthly revenue and financial summaries filter on transaction_date and sum amount
+        "CREATE INDEX IF NOT EXISTS idx_transactions_date_amount ON transactions (transaction_date, amount)",
+        # Churn features join members to their transactions
+        "CREATE INDEX IF NOT EXISTS idx_transactions_member_id ON transactions (member_id)",
+        # Member lists and distribution only look at active members per country
+        """
+        CREATE INDEX IF NOT EXISTS idx_members_active_country
+        ON members (country, join_date)
+        WHERE active = TRUE
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_members_join_date ON members (join_date)",
+        "CREATE INDEX IF NOT EXISTS idx_events_date ON events (date)",
+        # NOT VALID keeps existing rows untouched while enforcing the rules for new ones
+        """
+        ALTER TABLE members ADD CONSTRAINT chk_members_membership_type
+        CHECK (membership_type IN ('Standard', 'Premium')) NOT VALID
+        """,
+        """
+        ALTER TABLE events ADD CONSTRAINT chk_events_amounts
+        CHECK (revenue >= 0 AND costs >= 0) NOT VALID
+        """,
+        "ANALYZE members",
+        "ANALYZE transactions",
+        "ANALYZE events"
+    ]),
+    (3, "Add monthly rollup tables", [
+        *ROLLUP_TABLES,
+        rebuild_rollups_on
+    ]),
+    (4, "Add batch churn score tables", [
+        """
+        CREATE TABLE IF NOT EXISTS churn_scoring_runs (
+            id SERIAL PRIMARY KEY,
+            started_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP,
+            members_scored INTEGER NOT NULL DEFAULT 0,
+            feature_importance TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS member_churn_scores (
+            member_id INTEGER PRIMARY KEY REFERENCES members(id),
+            churn_probability DOUBLE PRECISION NOT NULL,
+            run_id INTEGER NOT NULL REFERENCES churn_scoring_runs(id),
+            scored_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_member_churn_scores_probability
+        ON member_churn_scores (churn_probability DESC)
+        """
+    ]),
+    (5, "Track import batches and consistency runs", [
+        """
+        CREATE TABLE IF NOT EXISTS import_batches (
+            id SERIAL PRIMARY KEY,
+            table_name VARCHAR(50) NOT NULL,
+            mode VARCHAR(20) NOT NULL,
+            started_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP,
+            rows_imported INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        "ALTER TABLE members ADD COLUMN IF NOT EXISTS import_batch_id INTEGER REFERENCES import_batches(id)",
+        "ALTER TABLE transactions ADD COLUMN IF NOT EXISTS import_batch_id INTEGER REFERENCES import_batches(id)",
+        "ALTER TABLE events ADD COLUMN IF NOT EXISTS import_batch_id INTEGER REFERENCES import_batches(id)",
+        # Incremental consistency checks only read the rows of one batch; manual entries stay NULL
+        """
+        CREATE INDEX IF NOT EXISTS idx_members_import_batch
+        ON members (import_batch_id)
+        WHERE import_batch_id IS NOT NULL
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_transactions_import_batch
+        ON transactions (import_batch_id)
+        WHERE import_batch_id IS NOT NULL
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_events_import_batch
+        ON events (import_batch_id)
+        WHERE import_batch_id IS NOT NULL
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS consistency_runs (
+            id SERIAL PRIMARY KEY,
+            mode VARCHAR(20) NOT NULL,
+            import_batch_id INTEGER REFERENCES import_batches(id),
+            started_at TIMESTAMP NOT NULL,
+            finished_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            rows_checked INTEGER NOT NULL DEFAULT 0,
+            issue_count INTEGER NOT NULL DEFAULT 0,
+            issues TEXT,
+            timings TEXT
+        )
+        """
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Arbitrary key for the advisory lock serializing migrations across processes
+MIGRATION_LOCK_KEY = 7950001
+
+_schema_checked = False
+_schema_lock = threading.Lock()
+
+def get_schema_version(conn):
+    """Get the currently applied schema version, 0 for an empty database"""
+    if not inspect(conn).has_table('schema_version'):
+        return 0
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar()
+
+def apply_migrations():
+    """Apply all pending migrations in one transaction and return their versions"""
+    engine = get_sqlalchemy_engine()
+    applied = []
+    
+    with engine.begin() as conn:
+        advisory_lock(conn, MIGRATION_LOCK_KEY)
+        
+        current_version = get_schema_version(conn)
+        if current_version >= SCHEMA_VERSION:
+            return applied
+        
+        if current_version == 0:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description VARCHAR(200) NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """))
+        
+        for version, description, statements in MIGRATIONS:
+            if version <= current_version:
+                continue
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    for translated in translate_ddl(statement, conn):
+                        conn.execute(text(translated))
+            conn.execute(
+                text("INSERT INTO schema_version (version, description) VALUES (:version, :description)"),
+                {"version": version, "description": description}
+            )
+            applied.append(version)
+    
+    return applied
+
+def ensure_schema():
+    """Bring the schema up to date once per process"""
+    global _schema_checked
+    if _schema_checked:
+        return
+    
+    with _schema_lock:
+        if not _schema_checked:
+            applied = apply_migrations()
+            if applied:
+                log_event(logging.INFO, "Applied schema migrations", versions=applied)
+                increment('club_schema_migrations_total', amount=len(applied))
+            _schema_checked = True
@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from utils.config import load_sensitivity_config
+from utils.forecast_kernel import (
+    FORECAST_MONTHS,
+    target_rates,
+    project_members,
+    project_revenue,
+    project_expenses
+)
+from utils.telemetry import observed
+
+# Sweepable scenario inputs and their labels
+SWEEP_PARAMETERS = {
+    'annual_fee': "Annual Membership Fee (€)",
+    'event_fee': "Event Fee per Member (€)",
+    'num_events': "Number of Events per Year",
+    'marketing_percentage': "Marketing Budget (%)",
+    'nl_growth': "Netherlands Monthly Growth (%)",
+    'be_growth': "Belgium Monthly Growth (%)",
+    'de_growth': "Germany Monthly New Members",
+    'base_salary': "Monthly Salary per Employee (€)",
+    'num_employees': "Number of Employees"
+}
+
+# Outcomes over the forecast horizon
+OUTCOMES = {
+    'total_revenue': "Revenue",
+    'total_expenses': "Expenses",
+    'cumulative_cashflow': "Cumulative Cash Flow"
+}
+
+def evaluate(state, parameters, months=FORECAST_MONTHS):
+    """Revenue, expenses and cumulative cash flow over the horizon for arrays of parameter values
+    
+    state is the ClubState every combination starts from, so sweeps never query per
+    combination. parameters maps every SWEEP_PARAMETERS name to a scalar or an array;
+    arrays are evaluated element-wise in one vectorized pass. Returns a dict of outcome arrays.
+    """
+    values = dict(zip(parameters, np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in parameters.values())
+    )))
+    rates = target_rates(np.stack([values['nl_growth'], values['be_growth'], values['de_growth']], axis=-1))
+    members = project_members(state.starting_members, rates, months)
+    _, membership_revenue, event_revenue = project_revenue(
+        members, values['annual_fee'], values['event_fee'], values['num_events']
+    )
+    expenses = project_expenses(
+        state.yearly_revenue, state.expense_members, values['marketing_percentage'],
+        values['base_salary'], values['num_employees'], values['num_events'], values['event_fee']
+    )
+    
+    # Yearly expenses spread evenly over the months, as in calculate_cashflow
+    total_revenue = (membership_revenue + event_revenue).sum(axis=-1)
+    total_expenses = sum(expenses.values()) * months / 12
+    return {
+        'total_revenue': total_revenue,
+        'total_expenses': total_expenses,
+        'cumulative_cashflow': total_revenue - total_expenses
+    }
+
+def evaluate_chunk(state, base, axes, start, stop, months):
+    """Evaluate grid combinations start..stop, derived from their flat index
+    
+    Only the chunk's combinations are materialized. Module-level so process pools can run it.
+    """
+    names = list(axes)
+    positions = np.unravel_index(np.arange(start, stop), [len(axes[name]) for name in names])
+    swept = {name: np.asarray(axes[name], dtype=float)[position] for name, position in zip(names, positions)}
+    outcomes = evaluate(state, {**base, **swept}, months)
+    return pd.DataFrame({**swept, **outcomes})
+
+@observed
+def run_sweep(state, base, axes, months=FORECAST_MONTHS, chunk_size=None, executor=None):
+    """Evaluate every combination of the swept parameter values
+    
+    base holds a value for every SWEEP_PARAMETERS name; axes maps the swept names to
+    their values. Combinations are evaluated in chunks, concurrently unless executor is
+    'inline'. Returns one row per combination with the swept values and OUTCOMES.
+    """
+    config = load_sensitivity_config()
+    chunk_size = chunk_size or config['chunk_size']
+    executor = executor or config['executor']
+    combinations = int(np.prod([len(values) for values in axes.values()]))
+    if combinations > config['max_combinations']:
+        raise ValueError(f"{combinations:,} combinations exceed the limit of {config['max_combinations']:,}")
+    
+    bounds = [(start, min(start + chunk_size, combinations)) for start in range(0, combinations, chunk_size)]
+    if executor == 'inline' or len(bounds) == 1:
+        chunks = [evaluate_chunk(state, base, axes, start, stop, months) for start, stop in bounds]
+    else:
+        pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        with pool_class(max_workers=min(config['max_workers'], len(bounds))) as pool:
+            futures = [
+                pool.submit(evaluate_chunk, state, base, axes, start, stop, months) for start, stop in bounds
+            ]
+            chunks = [future.result() for future in futures]
+    
+    return pd.concat(chunks, ignore_index=True)
+
+def tornado(state, base, ranges, outcome, months=FORECAST_MONTHS):
+    """Swing of an outcome when each parameter moves alone to the low and high end of its range
+    
+    ranges maps parameter names to (low, high). Returns one row per parameter, the
+    widest swing last (the top bar of a horizontal bar chart).
+    """
+    names = list(ranges)
+    # Row 0 is the base case, then a low and a high row per parameter
+    parameters = {name: np.full(1 + 2 * len(names), float(value)) for name, value in base.items()}
+    for position, name in enumerate(names):
+        parameters[name][1 + 2 * position] = ranges[name][0]
+        parameters[name][2 + 2 * position] = ranges[name][1]
+    values = evaluate(state, parameters, months)[outcome]
+    
+    table = pd.DataFrame({
+        'parameter': names,
+        'low': [ranges[name][0] for name in names],
+        'high': [ranges[name][1] for name in names],
+        'outcome_low': values[1::2],
+        'outcome_high': values[2::2]
+    })
+    table['base_outcome'] = values[0]
+    table['swing'] = (table['outcome_high'] - table['outcome_low']).abs()
+    return table.sort_values('swing', ignore_index=True)
+
+def heatmap(results, x, y, outcome):
+    """Outcome over two swept parameters, averaged over any other swept parameters"""
+    return results.pivot_table(index=y, columns=x, values=outcome, aggfunc='mean')
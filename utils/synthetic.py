@@ -0,0 +1,211 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from utils.database import get_sqlalchemy_engine
+from utils.importer import copy_rows
+from utils.dialects import sync_id_sequence
+from utils.rollups import rebuild_rollups
+
+COUNTRY_WEIGHTS = {
+    'Netherlands': 0.5,
+    'Belgium': 0.3,
+    'Germany': 0.2
+}
+
+MEMBERSHIP_WEIGHTS = {
+    'Standard': 0.75,
+    'Premium': 0.25
+}
+
+# Relative activity per calendar month (Jan-Dec): quiet summers and Decembers
+MONTHLY_SEASONALITY = np.array([1.2, 1.1, 1.1, 1.0, 0.9, 0.8, 0.6, 0.6, 1.3, 1.3, 1.1, 0.7])
+
+# Monthly probability that a member cancels, per membership type
+CHURN_HAZARD = {
+    'Standard': 0.02,
+    'Premium': 0.01
+}
+
+MEMBERSHIP_FEE = 795.0
+EVENT_FEE = 50.0
+EVENT_FEES_PER_MONTH = 0.3  # Average event fees per active member per month
+EVENTS_PER_MONTH = 1.5  # Average events per country per month
+MONTHLY_GROWTH = 0.02  # Month-over-month growth in new members
+
+DEFAULT_MEMBERS = 100000
+DEFAULT_MONTHS = 36
+DEFAULT_CHUNK_SIZE = 50000
+
+def month_starts(end_date, months):
+    """Get the first day of each of the last `months` months up to end_date"""
+    end_month = np.datetime64(pd.Timestamp(end_date).date(), 'M')
+    return np.arange(end_month - (months - 1), end_month + 1).astype('datetime64[D]')
+
+def season_of(dates):
+    """Look up the seasonality weight of each date"""
+    return MONTHLY_SEASONALITY[dates.astype('datetime64[M]').astype(int) % 12]
+
+def generate_members(rng, count, first_id, end_date, months):
+    """Generate members with growing, seasonal join dates and a churn date per member
+    
+    Members whose churn date lies before end_date are inactive. The churn date is kept
+    in the frame so their transactions stop there; it is not written to the database.
+    """
+    starts = month_starts(end_date, months)
+    end = np.datetime64(pd.Timestamp(end_date).date(), 'D')
+    
+    weights = (1 + MONTHLY_GROWTH) ** np.arange(months) * season_of(starts)
+    join_month = starts[rng.choice(months, size=count, p=weights / weights.sum())]
+    join_date = np.minimum(join_month + rng.integers(0, 28, size=count), end)
+    
+    ids = np.arange(first_id, first_id + count)
+    membership_type = rng.choice(list(MEMBERSHIP_WEIGHTS), size=count, p=list(MEMBERSHIP_WEIGHTS.values()))
+    hazard = np.where(membership_type == 'Premium', CHURN_HAZARD['Premium'], CHURN_HAZARD['Standard'])
+    churn_date = join_date + (rng.geometric(hazard) * 30.4).astype('timedelta64[D]')
+    
+    return pd.DataFrame({
+        'id': ids,
+        'name': 'Member ' + pd.Series(ids).astype(str),
+        'email': 'member' + pd.Series(ids).astype(str) + '@example.com',
+        'country': rng.choice(list(COUNTRY_WEIGHTS), size=count, p=list(COUNTRY_WEIGHTS.values())),
+        'join_date': join_date,
+        'membership_type': membership_type,
+        'active': churn_date > end,
+        'churn_date': churn_date
+    })
+
+def generate_transactions(rng, members, end_date):
+    """Generate yearly membership fees and seasonal event fees for each member's tenure"""
+    end = np.datetime64(pd.Timestamp(end_date).date(), 'D')
+    join_date = members['join_date'].to_numpy().astype('datetime64[D]')
+    last_date = np.minimum(members['churn_date'].to_numpy().astype('datetime64[D]'), end)
+    tenure_days = np.maximum((last_date - join_date).astype(int), 0)
+    member_ids = members['id'].to_numpy()
+    
+    # One membership fee per started year: join date, then every anniversary
+    fee_counts = tenure_days // 365 + 1
+    fee_owner = np.repeat(np.arange(len(members)), fee_counts)
+    fee_year = np.arange(fee_counts.sum()) - np.repeat(np.cumsum(fee_counts) - fee_counts, fee_counts)
+    fee_date = join_date[fee_owner] + (fee_year * 365).astype('timedelta64[D]')
+    
+    # Event fees: Poisson over the tenure, thinned by the month's seasonality
+    peak = MONTHLY_SEASONALITY.max()
+    rate = EVENT_FEES_PER_MONTH * peak / MONTHLY_SEASONALITY.mean()
+    event_counts = rng.poisson(rate * tenure_days / 30.4)
+    event_owner = np.repeat(np.arange(len(members)), event_counts)
+    event_date = join_date[event_owner] + (rng.random(len(event_owner)) * tenure_days[event_owner]).astype('timedelta64[D]')
+    keep = rng.random(len(event_date)) < season_of(event_date) / peak
+    event_owner, event_date = event_owner[keep], event_date[keep]
+    
+    is_fee = np.repeat([True, False], [len(fee_owner), len(event_owner)])
+    return pd.DataFrame({
+        'member_id': np.concatenate([member_ids[fee_owner], member_ids[event_owner]]),
+        'amount': np.where(is_fee, MEMBERSHIP_FEE, EVENT_FEE),
+        'transaction_type': pd.Categorical.from_codes(
+            np.where(is_fee, 0, 1), categories=['membership_fee', 'event_fee']
+        ),
+        'transaction_date': np.concatenate([fee_date, event_date])
+    })
+
+def generate_events(rng, end_date, months):
+    """Generate seasonal events per country and month with attendance-based revenue"""
+    starts = month_starts(end_date, months)
+    countries = np.array(list(COUNTRY_WEIGHTS))
+    
+    # Every country for every month, then a seasonal Poisson number of events in each
+    month_grid = np.tile(starts, len(countries))
+    country_grid = np.repeat(countries, len(starts))
+    counts = rng.poisson(EVENTS_PER_MONTH * season_of(month_grid))
+    
+    event_month = np.repeat(month_grid, counts)
+    country = np.repeat(country_grid, counts)
+    attendees = rng.integers(20, 100, size=len(country))
+    revenue = attendees * EVENT_FEE
+    
+    events = pd.DataFrame({
+        'date': event_month + rng.integers(0, 28, size=len(country)).astype('timedelta64[D]'),
+        'country': country,
+        'revenue': revenue.astype(float),
+        'costs': np.round(revenue * rng.uniform(0.4, 0.6, size=len(country)), 2)
+    })
+    events = events.sort_values(['country', 'date'], ignore_index=True)
+    events.insert(0, 'name', events['country'] + ' Event ' + (events.groupby('country').cumcount() + 1).astype(str))
+    return events
+
+def generate_sample_data(members=DEFAULT_MEMBERS, months=DEFAULT_MONTHS, seed=None,
+                         chunk_size=DEFAULT_CHUNK_SIZE, end_date=None, progress_callback=None):
+    """Generate synthetic members, transactions and events and bulk load them chunk by chunk
+    
+    The same seed always produces the same data. Members get explicit ids after the
+    current maximum, so their transactions are generated without reading them back.
+    progress_callback receives a dict per loaded chunk. Returns a summary with row counts
+    and elapsed seconds.
+    """
+    rng = np.random.default_rng(seed)
+    end_date = pd.Timestamp(end_date or pd.Timestamp.today()).date()
+    engine = get_sqlalchemy_engine()
+    started = time.perf_counter()
+    summary = {'members': 0, 'transactions': 0, 'events': 0}
+    
+    with engine.begin() as conn:
+        if conn.dialect.name == 'postgresql':
+            # Keep concurrent inserts from taking the ids reserved below
+            conn.execute(text("LOCK TABLE members IN SHARE ROW EXCLUSIVE MODE"))
+        first_id = conn.execute(text("SELECT COALESCE(MAX(id), 0) + 1 FROM members")).scalar()
+        
+        for offset in range(0, members, chunk_size):
+            count = min(chunk_size, members - offset)
+            member_chunk = generate_members(rng, count, first_id + offset, end_date, months)
+            transaction_chunk = generate_transactions(rng, member_chunk, end_date)
+            
+            copy_rows(conn, 'members', member_chunk.drop(columns='churn_date'))
+            copy_rows(conn, 'transactions', transaction_chunk)
+            
+            summary['members'] += count
+            summary['transactions'] += len(transaction_chunk)
+            if progress_callback:
+                progress_callback({**summary, 'seconds': time.perf_counter() - started})
+        
+        events = generate_events(rng, end_date, months)
+        copy_rows(conn, 'events', events)
+        summary['events'] = len(events)
+        
+        sync_id_sequence(conn, 'members')
+    
+    if engine.dialect.name == 'postgresql':
+        with engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            for table in ['members', 'transactions', 'events']:
+                conn.execute(text(f"ANALYZE {table}"))
+    
+    rebuild_rollups()
+    summary['seconds'] = time.perf_counter() - started
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load seeded synthetic club data for performance testing")
+    parser.add_argument("--members", type=int, default=DEFAULT_MEMBERS, help="number of members to generate")
+    parser.add_argument("--months", type=int, default=DEFAULT_MONTHS, help="months of history")
+    parser.add_argument("--seed", type=int, default=42, help="random seed; the same seed gives the same data")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="members per bulk load")
+    parser.add_argument("--end-date", help="last day of generated history (default: today)")
+    args = parser.parse_args()
+    
+    from utils.database import init_db
+    init_db()
+    
+    summary = generate_sample_data(
+        members=args.members,
+        months=args.months,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        end_date=args.end_date,
+        progress_callback=lambda progress: print(
+            f"{progress['members']:,} members, {progress['transactions']:,} transactions "
+            f"({progress['seconds']:.1f}s)"
+        )
+    )
+    print(f"Loaded {summary['members']:,} members, {summary['transactions']:,} transactions and "
+          f"{summary['events']:,} events in {summary['seconds']:.1f}s")
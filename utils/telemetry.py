@@ -0,0 +1,245 @@
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.config import load_telemetry_config
+
+# Histogram buckets for function durations, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+logger = logging.getLogger('business_club')
+
+# The observed function call the current thread (or copied context) is executing, if any
+_current_call = ContextVar('current_call', default=None)
+
+# Open fallback scopes (see fallback_scope) of the current thread or copied context
+_fallback_scopes = ContextVar('fallback_scopes', default=())
+
+_counters = {}
+_histograms = {}
+_metrics_lock = threading.Lock()
+_configured = False
+_configure_lock = threading.Lock()
+_last_flush = 0.0
+
+class JsonFormatter(logging.Formatter):
+    """Format log records as one JSON object per line, merging structured fields"""
+    
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **getattr(record, 'fields', {})
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serve the metrics in Prometheus text format on /metrics"""
+    
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = render_metrics().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass  # Scrapes would flood the JSON log
+
+def configure_telemetry():
+    """Attach the JSON log handler and start the metrics endpoint once per process"""
+    global _configured
+    if _configured:
+        return
+    
+    with _configure_lock:
+        if _configured:
+            return
+        config = load_telemetry_config()
+        
+        handler = logging.FileHandler(config['log_file']) if config['log_file'] else logging.StreamHandler()
+        handler.setFormatter(JsonFormatter())
+        logger.addHandler(handler)
+        logger.setLevel(config['log_level'])
+        logger.propagate = False
+        
+        if config['metrics_port']:
+            try:
+                server = ThreadingHTTPServer((config['metrics_host'], config['metrics_port']), MetricsHandler)
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+            except OSError as e:
+                # Another process (e.g. a second Streamlit worker) already serves the port
+                log_event(logging.WARNING, "Metrics endpoint not started", error=str(e))
+        _configured = True
+
+def log_event(level, message, **fields):
+    """Write one structured log line, tagged with the current observed function"""
+    configure_telemetry()
+    call = _current_call.get()
+    if call is not None:
+        fields.setdefault('function', call['function'])
+    logger.log(level, message, extra={'fields': fields})
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def increment(name, labels=None, amount=1):
+    """Add to a counter"""
+    with _metrics_lock:
+        key = (name, label_key(labels or {}))
+        _counters[key] = _counters.get(key, 0) + amount
+
+def observe(name, value, labels=None):
+    """Record a value in a histogram"""
+    with _metrics_lock:
+        key = (name, label_key(labels or {}))
+        histogram = _histograms.setdefault(key, {'buckets': [0] * len(DURATION_BUCKETS), 'sum': 0.0, 'count': 0})
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                histogram['buckets'][index] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+def format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{str(value)}"' for key, value in pairs) + '}'
+
+def render_metrics():
+    """Render every counter and histogram in Prometheus text exposition format"""
+    lines = []
+    with _metrics_lock:
+        for name in sorted({name for name, _ in _counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (metric, labels), value in sorted(_counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+        
+        for name in sorted({name for name, _ in _histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, labels), histogram in sorted(_histograms.items()):
+                if metric != name:
+                    continue
+                for bound, count in zip(DURATION_BUCKETS, histogram['buckets']):
+                    lines.append(f"{name}_bucket{format_labels(labels, le=bound)} {count}")
+                lines.append(f"{name}_bucket{format_labels(labels, le='+Inf')} {histogram['count']}")
+                lines.append(f"{name}_sum{format_labels(labels)} {histogram['sum']}")
+                lines.append(f"{name}_count{format_labels(labels)} {histogram['count']}")
+    return '\n'.join(lines) + '\n'
+
+def write_metrics(path=None):
+    """Atomically write the metrics to a file, e.g. for the node exporter textfile collector"""
+    path = path or load_telemetry_config()['metrics_file']
+    if not path:
+        return
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'w') as file:
+        file.write(render_metrics())
+    os.replace(temporary_path, path)
+
+def flush_metrics():
+    """Write the metrics file at most once per flush interval"""
+    global _last_flush
+    config = load_telemetry_config()
+    now = time.monotonic()
+    if not config['metrics_file'] or now - _last_flush < config['metrics_flush_seconds']:
+        return
+    _last_flush = now
+    try:
+        write_metrics(config['metrics_file'])
+    except OSError as e:
+        log_event(logging.WARNING, "Could not write metrics file", error=str(e))
+
+def record_rows(count):
+    """Add rows fetched to the current observed call"""
+    call = _current_call.get()
+    if call is not None:
+        call['rows'] += count
+
+@contextlib.contextmanager
+def fallback_scope():
+    """Track whether anything run inside the block fell back to default values
+    
+    Yields a dict whose 'fallback' flag record_fallback sets, also from nested calls
+    and from work run in a copy of the context (e.g. on a thread pool).
+    """
+    scope = {'fallback': False}
+    token = _fallback_scopes.set(_fallback_scopes.get() + (scope,))
+    try:
+        yield scope
+    finally:
+        _fallback_scopes.reset(token)
+
+def record_fallback(message, error=None):
+    """Mark the current observed call and open fallback scopes as returning a default value and log why"""
+    call = _current_call.get()
+    if call is not None:
+        call['fallback'] = True
+    for scope in _fallback_scopes.get():
+        scope['fallback'] = True
+    log_event(
+        logging.ERROR if error is not None else logging.WARNING,
+        message,
+        fallback_used=True,
+        error=str(error) if error is not None else None,
+        error_type=type(error).__name__ if error is not None else None
+    )
+
+def observed(func):
+    """Log a structured line and update metrics for every call of func
+    
+    Each call logs its duration, rows fetched by its queries and whether it fell back to
+    default values (see record_fallback), and feeds the call counter, fallback counter
+    and duration histogram.
+    """
+    name = f"{func.__module__}.{func.__name__}"
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        call = {'function': name, 'rows': 0, 'fallback': False}
+        token = _current_call.set(call)
+        started = time.perf_counter()
+        error = None
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            _current_call.reset(token)
+            outcome = 'error' if error is not None else 'fallback' if call['fallback'] else 'ok'
+            
+            increment('club_function_calls_total', {'function': name, 'outcome': outcome})
+            increment('club_function_rows_total', {'function': name}, call['rows'])
+            if call['fallback']:
+                increment('club_function_fallbacks_total', {'function': name})
+            observe('club_function_duration_seconds', seconds, {'function': name})
+            
+            log_event(
+                logging.ERROR if error is not None else logging.INFO,
+                "function call",
+                function=name,
+                duration_ms=round(seconds * 1000, 3),
+                rows=call['rows'],
+                fallback_used=call['fallback'],
+                error=str(error) if error is not None else None
+            )
+            flush_metrics()
+    
+    return wrapper
@@ -0,0 +1,52 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from utils.config import load_training_config
+
+_last_run = {}
+_stats_lock = threading.Lock()
+
+def timed_job(func, args):
+    """Run one training job and measure its wall time"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+def run_training_jobs(jobs, max_workers=None, executor=None):
+    """Run independent training jobs concurrently
+    
+    jobs: dict of job name -> (function, args); functions must be module-level for process pools
+    Returns (results, errors, timings) dicts keyed by job name.
+    """
+    config = load_training_config()
+    executor = executor or config['executor']
+    max_workers = max(1, min(max_workers or config['max_workers'], len(jobs) or 1))
+    pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    
+    results, errors, timings = {}, {}, {}
+    started = time.perf_counter()
+    
+    with pool_class(max_workers=max_workers) as pool:
+        futures = {name: pool.submit(timed_job, func, args) for name, (func, args) in jobs.items()}
+        for name, future in futures.items():
+            try:
+                results[name], timings[name] = future.result()
+            except Exception as e:
+                errors[name] = str(e)
+    
+    with _stats_lock:
+        _last_run.clear()
+        _last_run.update({
+            'executor': executor,
+            'max_workers': max_workers,
+            'wall_time': time.perf_counter() - started,
+            'job_times': dict(timings),
+            'errors': dict(errors)
+        })
+    
+    return results, errors, timings
+
+def get_training_stats():
+    """Get worker settings and per-job timings of the most recent training run"""
+    with _stats_lock:
+        return dict(_last_run)
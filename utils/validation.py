@@ -0,0 +1,140 @@
+import pandas as pd
+
+VALID_COUNTRIES = ['Netherlands', 'Belgium', 'Germany']
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+
+def is_email(values):
+    return values.astype('string').str.match(EMAIL_PATTERN).fillna(False).astype(bool)
+
+def is_date(values):
+    return pd.to_datetime(values, errors='coerce').notna()
+
+def is_present(values):
+    return values.notna() & (values.astype('string').str.strip() != '').fillna(False)
+
+def is_one_of(options):
+    return lambda values: values.isin(options)
+
+def is_positive(values):
+    return pd.to_numeric(values, errors='coerce') > 0
+
+def is_non_negative(values):
+    return pd.to_numeric(values, errors='coerce') >= 0
+
+# Per table: required columns and (column, rule, check) triples; a check returns True for valid rows
+VALIDATION_RULES = {
+    'members': {
+        'required': ['name', 'email', 'country', 'join_date', 'membership_type'],
+        'rules': [
+            ('name', 'missing_value', is_present),
+            ('email', 'invalid_email', is_email),
+            ('country', 'invalid_country', is_one_of(VALID_COUNTRIES)),
+            ('join_date', 'invalid_date', is_date),
+            ('membership_type', 'invalid_membership_type', is_one_of(['Standard', 'Premium']))
+        ]
+    },
+    'transactions': {
+        'required': ['member_email', 'amount', 'transaction_type', 'transaction_date'],
+        'rules': [
+            ('member_email', 'missing_value', is_present),
+            ('amount', 'not_positive', is_positive),
+            ('transaction_type', 'invalid_transaction_type', is_one_of(['membership_fee', 'event_fee'])),
+            ('transaction_date', 'invalid_date', is_date)
+        ]
+    },
+    'events': {
+        'required': ['name', 'date', 'country', 'revenue', 'costs'],
+        'rules': [
+            ('name', 'missing_value', is_present),
+            ('date', 'invalid_date', is_date),
+            ('country', 'invalid_country', is_one_of(VALID_COUNTRIES)),
+            ('revenue', 'negative_amount', is_non_negative),
+            ('costs', 'negative_amount', is_non_negative)
+        ]
+    }
+}
+
+ERROR_COLUMNS = ['row', 'column', 'rule', 'value']
+
+def new_validation_report(max_errors=1000):
+    """Create an empty report that accumulates validation results across chunks"""
+    return {
+        'rows_checked': 0,
+        'error_count': 0,
+        'rule_counts': {},
+        'missing_columns': [],
+        'errors': [],
+        'errors_kept': 0,
+        'max_errors': max_errors
+    }
+
+def validate_chunk(table_name, chunk, report):
+    """Evaluate every rule for a chunk in one vectorized pass and add the failures to the report
+    
+    Rows are identified by the chunk's index, which stays continuous across CSV chunks.
+    Returns True when the chunk has no errors.
+    """
+    if table_name not in VALIDATION_RULES:
+        raise ValueError(f"Unknown import type: {table_name}")
+    
+    table_rules = VALIDATION_RULES[table_name]
+    report['rows_checked'] += len(chunk)
+    
+    missing = [col for col in table_rules['required'] if col not in chunk.columns]
+    if missing:
+        report['missing_columns'] = sorted(set(report['missing_columns']) | set(missing))
+        return False
+    
+    chunk_errors = 0
+    for column, rule, check in table_rules['rules']:
+        failed = ~check(chunk[column])
+        failures = int(failed.sum())
+        if not failures:
+            continue
+        
+        chunk_errors += failures
+        key = f"{column}: {rule}"
+        report['rule_counts'][key] = report['rule_counts'].get(key, 0) + failures
+        
+        # Only keep detail rows up to the cap so huge files cannot blow up memory
+        room = report['max_errors'] - report['errors_kept']
+        if room > 0:
+            failing = chunk.loc[failed, column].head(room)
+            report['errors'].append(pd.DataFrame({
+                'row': failing.index,
+                'column': column,
+                'rule': rule,
+                'value': failing.astype('string').to_numpy()
+            }))
+            report['errors_kept'] += len(failing)
+    
+    report['error_count'] += chunk_errors
+    return chunk_errors == 0
+
+def report_is_valid(report):
+    return not report['missing_columns'] and report['error_count'] == 0
+
+def report_errors(report):
+    """Get the capped error table (row, column, rule, value) of a report"""
+    if not report['errors']:
+        return pd.DataFrame(columns=ERROR_COLUMNS)
+    return pd.concat(report['errors'], ignore_index=True).sort_values('row', kind='stable').reset_index(drop=True)
+
+def summarize_report(report, table_name=None):
+    """Get a short human-readable summary of a report"""
+    if report['rows_checked'] == 0:
+        return "No data provided"
+    if report['missing_columns']:
+        required = VALIDATION_RULES[table_name]['required'] if table_name else report['missing_columns']
+        return f"Missing required columns. Required: {', '.join(required)}"
+    if report['error_count'] == 0:
+        return "Data validation passed"
+    
+    counts = '; '.join(f"{key} ({count:,} rows)" for key, count in report['rule_counts'].items())
+    return f"{report['error_count']:,} errors in {report['rows_checked']:,} rows checked: {counts}"
+
+def validate_frame(table_name, data, max_errors=1000):
+    """Validate a whole DataFrame and return its report"""
+    report = new_validation_report(max_errors)
+    validate_chunk(table_name, data, report)
+    return report